@@ -19,15 +19,23 @@ import logging
 import collections
 import tempfile
 import errno
+import struct
 
-from cpy2py.utility.compat import BytesFile
 from cpy2py.utility.utils import random_str
 from cpy2py.kernel import state
+from cpy2py.ipyc.polling import poll_readable
 
 
 class DuplexSocketIPyC(object):
-    def __init__(self, family=socket.AF_UNIX, address=None, is_master=True):
+    """
+    Duplex socket exporting file-like interface
+
+    :param busy_poll: seconds to poll for data before blocking, see :py:mod:`~cpy2py.ipyc.polling`
+    :type busy_poll: float
+    """
+    def __init__(self, family=socket.AF_UNIX, address=None, is_master=True, busy_poll=0.0):
         self.is_master = is_master
+        self.busy_poll = busy_poll
         self.family = family
         if self.is_master:
             self.server_socket = self._create_server_socket(family=family, address=address)
@@ -94,13 +102,15 @@ class DuplexSocketIPyC(object):
 
     @property
     def reader(self):
-        return BufferedSocketFile(self.client_socket)
+        return BufferedSocketFile(self.client_socket, busy_poll=self.busy_poll)
 
     @property
     def connector(self):
         """Pickle'able connector as ``(factory, args, kwargs)``"""
         # socket.AF_* is enum in Py3
-        return self.__class__, (), {'family': int(self.family), 'address': self.address, 'is_master': False}
+        return self.__class__, (), {
+            'family': int(self.family), 'address': self.address, 'is_master': False, 'busy_poll': self.busy_poll
+        }
 
     def __repr__(self):
         return '%s(family=%r, address=%r, is_master=%s)' % (
@@ -119,64 +129,138 @@ class BufferedSocketFile(object):
     :py:mod:`~cpy2py.ipyc` classes, e.g. :py:exc:`EOFError` when the socket
     is closed.
 
-    On the other hand, it boxes pickles to reduce IO operations. Every pickle
-    is digested as one message (this is provided by :py:mod:`pickle`). Each
-    message is prepended by a head signaling its length.
-    Messages are sent and received as one entity. The file interfaces provide
-    data not from the raw socket, but from per-message buffers.
+    On the other hand, it boxes writes to reduce IO operations. Every write,
+    e.g. a frame of :py:mod:`~cpy2py.ipyc.framing`, is digested as one
+    message. Each message is prepended by a head signaling its length.
+    Messages are sent with a single system call where supported. The file
+    interfaces provide data not from the raw socket, but from a receive
+    buffer reused for all messages. It is filled with as much data as is
+    available, possibly several messages at once.
+
+    If `busy_poll` is set, the socket is polled for up to `busy_poll`
+    seconds before blocking whenever the buffer runs empty.
 
     The message format is::
 
-       b'%(length)08X%(message)s'
+       struct.pack('!Q', len(message)) + message
 
-    i.e. size as an 8-character hex, followed by the message encoded in ASCII.
-    The header is sufficient for 4294967295 characters, or almost 4GB of data.
+    i.e. size as an 8-byte unsigned integer in network byte order, followed
+    by the message.
     """
-    def __init__(self, client_socket):
+    #: initial size of the receive buffer
+    min_buffer_size = 64 * 1024
+    #: size above which an idle receive buffer is shrunk again
+    max_idle_buffer_size = 1024 * 1024
+
+    def __init__(self, client_socket, busy_poll=0.0):
         self.client_socket = client_socket
-        self._read_buffer = None
-        self._read_buffer_left = 0
+        self.busy_poll = busy_poll
+        self._buffer = bytearray(self.min_buffer_size)
+        # the buffer holds received data in [start, end) and the current message in [start, message_end)
+        self._buffer_start = 0
+        self._buffer_end = 0
+        self._message_end = 0
 
     def read(self, size=None):
-        if self._read_buffer_left <= 0:
+        if size == 0:
+            return b''
+        if self._buffer_start >= self._message_end:
             self._read_message()
-        if size is None or size <= 0:
-            self._read_buffer_left = 0
+        if size is None or size < 0:
+            end = self._message_end
         else:
-            self._read_buffer_left -= size
-        return self._read_buffer.read(size)
+            end = min(self._buffer_start + size, self._message_end)
+        return self._consume(end)
 
     def readline(self):
         """Read an entire line"""
-        if self._read_buffer_left <= 0:
+        if self._buffer_start >= self._message_end:
             self._read_message()
-        msg = self._read_buffer.readline()
-        self._read_buffer_left -= len(msg)
-        return msg
+        end = self._buffer.find(b'\n', self._buffer_start, self._message_end)
+        return self._consume(self._message_end if end == -1 else end + 1)
+
+    def _consume(self, end):
+        data = _copy_bytes(self._buffer, self._buffer_start, end)
+        self._buffer_start = end
+        return data
 
     def _read_message(self):
         """
         Read one message from the socket
         """
+        if self._buffer_start == self._buffer_end and len(self._buffer) > self.max_idle_buffer_size:
+            self._buffer = bytearray(self.min_buffer_size)
+            self._buffer_start = self._buffer_end = 0
         try:
-            msg_len = b''
-            while len(msg_len) < 8:
-                msg_len += self.client_socket.recv(8 - len(msg_len))
-            msg_len = int(msg_len, 16)
-            msg_read = 0
-            msg_buffer = []
-            while msg_read < msg_len:
-                msg_buffer.append(self.client_socket.recv(min(msg_len - msg_read, 4096)))
-                msg_read += len(msg_buffer[-1])
-            self._read_buffer = BytesFile(b''.join(msg_buffer))
-            self._read_buffer_left = len(self._read_buffer.getvalue())
+            self._receive(_HEADER.size)
+            msg_len, = _HEADER.unpack_from(self._buffer, self._buffer_start)
+            self._buffer_start += _HEADER.size
+            self._receive(msg_len)
         except socket.error as err:
             if err.errno == errno.EBADF:
                 raise EOFError
             raise
+        self._message_end = self._buffer_start + msg_len
+
+    def _receive(self, size):
+        """Receive data until at least `size` bytes are buffered"""
+        if self._buffer_end - self._buffer_start >= size:
+            return
+        if self._buffer_start + size > len(self._buffer):
+            # move pending data to the front, allocating a larger buffer if needed
+            pending = self._buffer_end - self._buffer_start
+            if size > len(self._buffer):
+                buffer = bytearray(max(size, 2 * len(self._buffer)))
+            else:
+                buffer = self._buffer
+            buffer[:pending] = self._buffer[self._buffer_start:self._buffer_end]
+            self._buffer, self._buffer_start, self._buffer_end = buffer, 0, pending
+        while self._buffer_end - self._buffer_start < size:
+            if self.busy_poll > 0:
+                poll_readable(self.client_socket.fileno(), self.busy_poll)
+            received = _recv_into(self.client_socket, self._buffer, self._buffer_end)
+            if not received:
+                raise EOFError
+            self._buffer_end += received
 
     def _write_message(self, message):
-        self.client_socket.sendall(('%08X' % len(message)).encode('ascii'))
-        self.client_socket.sendall(message)
+        _send_message(self.client_socket, _HEADER.pack(len(message)), message)
 
     write = _write_message
+
+
+_HEADER = struct.Struct('!Q')
+
+try:
+    memoryview
+except NameError:  # py2.6
+    def _recv_into(sock, buffer, offset):
+        data = sock.recv(len(buffer) - offset)
+        buffer[offset:offset + len(data)] = data
+        return len(data)
+
+    def _copy_bytes(buffer, start, end):
+        return bytes(buffer[start:end])
+else:
+    def _recv_into(sock, buffer, offset):
+        return sock.recv_into(memoryview(buffer)[offset:])
+
+    def _copy_bytes(buffer, start, end):
+        return memoryview(buffer)[start:end].tobytes()
+
+if hasattr(socket.socket, 'sendmsg'):
+    def _send_message(sock, header, message):
+        sent = sock.sendmsg((header, message))
+        if sent < len(header):
+            sock.sendall(header[sent:])
+            sock.sendall(message)
+        elif sent < len(header) + len(message):
+            sock.sendall(memoryview(message)[sent - len(header):])
+else:
+    def _send_message(sock, header, message):
+        # copying small messages is cheaper than a second system call
+        if len(message) < BufferedSocketFile.min_buffer_size:
+            sock.sendall(header + message)
+        else:
+            sock.sendall(header)
+            sock.sendall(message)
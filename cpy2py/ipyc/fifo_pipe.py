@@ -18,12 +18,19 @@ import tempfile
 import time
 
 from cpy2py.utility.compat import inf
+from cpy2py.ipyc.polling import PollingReader
 
 
 class DuplexFifoIPyC(object):
-    """Duplex FIFO exporting file-like interface"""
-    def __init__(self, fifo_dir_path=None, is_master=True):
+    """
+    Duplex FIFO exporting file-like interface
+
+    :param busy_poll: seconds to poll for data before blocking, see :py:mod:`~cpy2py.ipyc.polling`
+    :type busy_poll: float
+    """
+    def __init__(self, fifo_dir_path=None, is_master=True, busy_poll=0.0):
         self.is_master = is_master
+        self.busy_poll = busy_poll
         self._fifo_dir_path = fifo_dir_path
         if fifo_dir_path is None:
             self._fifo_dir_path = tempfile.mkdtemp()
@@ -77,12 +84,16 @@ class DuplexFifoIPyC(object):
 
     @property
     def reader(self):
+        if self.busy_poll > 0:
+            return PollingReader(self._fifo_read, self.busy_poll)
         return self._fifo_read
 
     @property
     def connector(self):
         """Pickle'able connector as (factory, args, kwargs)"""
-        return self.__class__, (), {'fifo_dir_path': self._fifo_dir_path, 'is_master': False}
+        return self.__class__, (), {
+            'fifo_dir_path': self._fifo_dir_path, 'is_master': False, 'busy_poll': self.busy_poll
+        }
 
     def __repr__(self):
         return '%s(fifo_dir_path=%r, is_master=%s)' % (self.__class__.__name__, self._fifo_dir_path, self.is_master)
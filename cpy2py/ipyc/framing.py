@@ -0,0 +1,279 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Multiplexing of messages over the file-like interface of an IPyC
+
+Each message is sent as a stream of one or more frames. Frames of different
+streams are interleaved: a thread sending a large message yields to other
+threads after every frame. Small messages thus overtake large transfers,
+instead of waiting for them to complete. Messages may additionally have a
+priority, giving their frames precedence over those of other messages.
+
+The frame format is::
+
+    struct.pack('!IIB', stream_id, len(chunk), final) + chunk
+
+where `final` is ``1`` for the last frame of a stream and ``0`` otherwise.
+Every frame is written with a single call to the underlying file.
+"""
+import collections
+import itertools
+import struct
+import threading
+
+from cpy2py.utility.compat import range
+
+_FRAME = struct.Struct('!IIB')
+
+
+class _TurnLock(object):
+    """
+    Lock handed over to waiting threads by priority, then order of arrival
+
+    :param levels: number of priorities, with ``0`` the highest
+    :type levels: int
+    """
+    def __init__(self, levels=1):
+        self._mutex = threading.Lock()
+        self._waiting = [collections.deque() for _ in range(levels)]
+        self._busy = False
+
+    def acquire(self, priority=0):
+        with self._mutex:
+            if not self._busy:
+                self._busy = True
+                return
+            turn = threading.Lock()
+            turn.acquire()
+            self._waiting[priority].append(turn)
+        turn.acquire()
+
+    def release(self):
+        with self._mutex:
+            for waiting in self._waiting:
+                if waiting:
+                    # hand over without unlocking, so that nobody can cut in line
+                    waiting.popleft().release()
+                    return
+            self._busy = False
+
+    def waiting(self):
+        """Number of threads waiting for the lock"""
+        return sum(len(waiting) for waiting in self._waiting)
+
+
+class FrameWriter(object):
+    """
+    Thread-safe sender of messages as interleaved frames
+
+    :param writer: file-like object to write frames to
+    :param chunk_size: maximum size of the payload of each frame
+    :type chunk_size: int
+    :param levels: number of message priorities, with ``0`` the highest
+    :type levels: int
+
+    When several threads send concurrently, frames of higher priority
+    messages are written first. Frames of the same priority are written in
+    order of arrival.
+    """
+    def __init__(self, writer, chunk_size=64 * 1024, levels=1):
+        self.writer = writer
+        self.chunk_size = chunk_size
+        self._stream_ids = itertools.count()
+        self._turn = _TurnLock(levels)
+
+    def send(self, message, priority=0):
+        """Send a message, interleaved with concurrently sent messages"""
+        stream_id = next(self._stream_ids) & 0xFFFFFFFF
+        chunk_size = self.chunk_size
+        if len(message) <= chunk_size:
+            self._write(_FRAME.pack(stream_id, len(message), 1) + message, priority)
+            return
+        for offset in range(0, len(message), chunk_size):
+            chunk = message[offset:offset + chunk_size]
+            # take a new turn for every frame to let others send in between
+            self._write(_FRAME.pack(stream_id, len(chunk), offset + chunk_size >= len(message)) + chunk, priority)
+
+    def _write(self, frame, priority):
+        self._turn.acquire(priority)
+        try:
+            self.writer.write(frame)
+        finally:
+            self._turn.release()
+
+    def close(self):
+        """Wait until all sent messages are written"""
+        # messages are written by their senders before send returns
+
+
+class QueuedFrameWriter(FrameWriter):
+    """
+    Frame writer sending from a dedicated thread, coalescing frames
+
+    :param writer: file-like object to write frames to
+    :param chunk_size: maximum size of the payload of each frame
+    :type chunk_size: int
+    :param levels: number of message priorities, with ``0`` the highest
+    :type levels: int
+    :param on_error: callback receiving an error of the writer thread
+
+    Messages are queued by :py:meth:`send`, which returns immediately.
+    A writer thread combines queued frames into a single write of up to
+    :py:attr:`coalesce_size` bytes. It takes frames by priority, and
+    alternates between messages of the same priority frame by frame.
+    Use :py:meth:`close` to wait until all queued messages are written.
+
+    An error writing frames discards all queued messages. The error is
+    passed to `on_error`, and raised by the next :py:meth:`send`.
+    """
+    #: maximum number of bytes combined into a single write
+    coalesce_size = 256 * 1024
+    #: seconds after which an idle writer thread stops
+    idle_time = 10.0
+
+    def __init__(self, writer, chunk_size=64 * 1024, levels=1, on_error=None):
+        FrameWriter.__init__(self, writer, chunk_size=chunk_size, levels=levels)
+        self.on_error = on_error
+        # priority => [stream_id, message, offset]
+        self._lanes = [collections.deque() for _ in range(levels)]
+        mutex = threading.Lock()
+        # signal for the writer thread that frames are queued
+        self._queued = threading.Condition(mutex)
+        # signal for closing threads that the writer thread is done
+        self._stopped = threading.Condition(mutex)
+        self._thread = None
+        self._closing = False
+        self._error = None
+
+    def send(self, message, priority=0):
+        """Queue a message for sending"""
+        stream_id = next(self._stream_ids) & 0xFFFFFFFF
+        with self._queued:
+            if self._error is not None:
+                raise self._error  # pylint: disable=raising-bad-type
+            self._lanes[priority].append([stream_id, message, 0])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_queued, name='cpy2py frame writer')
+                self._thread.daemon = True
+                self._thread.start()
+            else:
+                self._queued.notify()
+
+    def _next_frame(self):
+        """Take the next frame from the queue, if any"""
+        for lane in self._lanes:
+            if lane:
+                stream = lane.popleft()
+                stream_id, message, offset = stream
+                chunk = message[offset:offset + self.chunk_size]
+                final = offset + self.chunk_size >= len(message)
+                if not final:
+                    stream[2] += self.chunk_size
+                    lane.append(stream)
+                return _FRAME.pack(stream_id, len(chunk), final) + chunk
+        return None
+
+    def close(self):
+        """Wait until all queued messages are written and stop the writer thread"""
+        with self._queued:
+            thread = self._thread
+            # the writer thread may close the writer via `on_error`
+            if thread is None or thread is threading.current_thread():
+                return
+            self._closing = True
+            self._queued.notify()
+            while self._thread is thread:
+                self._stopped.wait()
+            failed = self._error is not None
+        # a failed writer thread may still be busy with `on_error`
+        if not failed:
+            thread.join()
+
+    def _stop_thread(self):
+        """Mark the writer thread as stopped, must be called with :py:attr:`_queued`"""
+        self._thread = None
+        self._closing = False
+        self._stopped.notify_all()
+
+    def _write_queued(self):
+        while True:
+            with self._queued:
+                frame = self._next_frame()
+                if frame is None:
+                    if not self._closing:
+                        self._queued.wait(self.idle_time)
+                        frame = self._next_frame()
+                    if frame is None:
+                        self._stop_thread()
+                        return
+                frames, size = [frame], len(frame)
+                while size < self.coalesce_size:
+                    frame = self._next_frame()
+                    if frame is None:
+                        break
+                    frames.append(frame)
+                    size += len(frame)
+            try:
+                self.writer.write(frames[0] if len(frames) == 1 else b''.join(frames))
+            except Exception as err:  # pylint: disable=broad-except
+                with self._queued:
+                    self._error = err
+                    for lane in self._lanes:
+                        lane.clear()
+                    self._stop_thread()
+                if self.on_error is not None:
+                    self.on_error(err)
+                return
+
+
+class FrameReader(object):
+    """
+    Receiver of messages sent as interleaved frames
+
+    :param reader: file-like object to read frames from
+
+    Messages are received in the order in which their last frame arrives.
+    Only a single thread may receive from a reader.
+    """
+    def __init__(self, reader):
+        self.reader = reader
+        # stream_id => chunks received so far
+        self._streams = {}
+
+    def recv(self):
+        """Receive the next complete message"""
+        while True:
+            stream_id, length, final = _FRAME.unpack(self._read(_FRAME.size))
+            chunk = self._read(length)
+            if final:
+                chunks = self._streams.pop(stream_id, None)
+                if chunks is None:
+                    return chunk
+                chunks.append(chunk)
+                return b''.join(chunks)
+            self._streams.setdefault(stream_id, []).append(chunk)
+
+    def _read(self, size):
+        """Read exactly `size` bytes"""
+        data = self.reader.read(size)
+        if len(data) == size:
+            return data
+        chunks, received = [data], len(data)
+        while received < size:
+            data = self.reader.read(size - received)
+            if not data:
+                raise EOFError
+            chunks.append(data)
+            received += len(data)
+        return b''.join(chunks)
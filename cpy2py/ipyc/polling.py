@@ -0,0 +1,75 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Busy polling of IPyC connections
+
+A blocking read puts a thread to sleep until data arrives, and waking it up
+again takes time. When replies arrive within microseconds, polling the
+connection for a short period before blocking avoids this latency - at the
+cost of keeping a CPU core busy while waiting.
+
+Each poll is a non-blocking system call, during which other threads of
+the interpreter may run. Between polls, the thread yields the CPU to
+other processes; otherwise, a peer sharing the same core could not send
+the awaited reply until the polling period is over.
+"""
+import errno
+import select
+import os
+import time
+
+# give up the CPU between polls, in case the sender waits for it
+_yield = getattr(os, 'sched_yield', lambda: None)
+
+
+def poll_readable(fileno, busy_poll):
+    """
+    Poll a file descriptor until it is readable or `busy_poll` seconds have passed
+
+    :returns: whether the file descriptor is readable
+    """
+    poll_until = time.time() + busy_poll
+    while True:
+        try:
+            if select.select((fileno,), (), (), 0)[0]:
+                return True
+        except (select.error, OSError, ValueError) as err:
+            if getattr(err, 'errno', None) == errno.EINTR:
+                continue
+            # let the subsequent read report a closed connection
+            return True
+        if time.time() > poll_until:
+            return False
+        _yield()
+
+
+class PollingReader(object):
+    """
+    Reader of a file polling for data before blocking
+
+    :param file_obj: unbuffered file to read from
+    :param busy_poll: seconds to poll before blocking
+    :type busy_poll: float
+    """
+    def __init__(self, file_obj, busy_poll):
+        self.file_obj = file_obj
+        self.busy_poll = busy_poll
+
+    def read(self, size=-1):
+        poll_readable(self.file_obj.fileno(), self.busy_poll)
+        return self.file_obj.read(size)
+
+    def readline(self):
+        poll_readable(self.file_obj.fileno(), self.busy_poll)
+        return self.file_obj.readline()
@@ -0,0 +1,137 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Several IPyC connections used as parallel channels
+
+A :py:class:`~.PooledIPyC` bundles several connections of the same type.
+Each thread sends all its messages via the same channel, assigned round
+robin on its first message; messages of one thread thus keep their order.
+Threads on different channels do not contend for the same connection.
+Messages received on any channel are delivered in order of arrival.
+"""
+import itertools
+import threading
+
+from cpy2py.utility.compat import range
+from cpy2py.utility.thread_tools import FifoQueue
+from cpy2py.ipyc.fifo_pipe import DuplexFifoIPyC
+from cpy2py.ipyc.framing import FrameWriter, FrameReader
+
+
+class PooledIPyC(object):
+    """
+    Duplex connection over several IPyC channels
+
+    :param ipyc: the type of IPyC for each channel
+    :param channels: the number of channels
+    :type channels: int
+    :param connectors: connectors of the channels of the master, for use in the slave
+    :param ipyc_kwargs: keyword arguments for creating each channel
+    :type ipyc_kwargs: dict or None
+    """
+    def __init__(self, ipyc=DuplexFifoIPyC, channels=2, is_master=True, connectors=None, ipyc_kwargs=None):
+        self.is_master = is_master
+        if connectors is not None:
+            self.channels = [factory(*args, **kwargs) for factory, args, kwargs in connectors]
+        else:
+            self.channels = [ipyc(**(ipyc_kwargs or {})) for _ in range(channels)]
+
+    @property
+    def inherit_fds(self):
+        """File descriptors the twinterpreter must inherit"""
+        return tuple(fileno for channel in self.channels for fileno in getattr(channel, 'inherit_fds', ()))
+
+    def open(self):
+        """Open connections"""
+        for channel in self.channels:
+            channel.open()
+
+    def close(self):
+        """Close connections"""
+        return all([channel.close() is not False for channel in self.channels])
+
+    def connect(self, levels=1, frame_writer=FrameWriter):
+        """
+        Create a sender and receiver of messages over all channels
+
+        :param levels: number of message priorities, see :py:class:`~cpy2py.ipyc.framing.FrameWriter`
+        :type levels: int
+        :param frame_writer: type of :py:class:`~cpy2py.ipyc.framing.FrameWriter` for each channel
+        :rtype: :py:class:`~.ChannelPool`
+        """
+        return ChannelPool(
+            [frame_writer(channel.writer, levels=levels) for channel in self.channels],
+            [FrameReader(channel.reader) for channel in self.channels],
+        )
+
+    @property
+    def connector(self):
+        """Pickle'able connector as (factory, args, kwargs)"""
+        return self.__class__, (), {
+            'connectors': [channel.connector for channel in self.channels], 'is_master': False
+        }
+
+    def __repr__(self):
+        return '%s(channels=%r, is_master=%s)' % (self.__class__.__name__, self.channels, self.is_master)
+
+
+class ChannelPool(object):
+    """
+    Sender and receiver of messages over several channels
+
+    :param writers: a :py:class:`~cpy2py.ipyc.framing.FrameWriter` per channel
+    :param readers: a :py:class:`~cpy2py.ipyc.framing.FrameReader` per channel
+
+    A thread per channel receives messages, which are handed to
+    :py:meth:`recv` in order of arrival. Only a single thread may receive.
+    """
+    def __init__(self, writers, readers):
+        self._writers = writers
+        self._next_writer = itertools.count()
+        self._affinity = threading.local()
+        self._received = FifoQueue()
+        for reader in readers:
+            thread = threading.Thread(target=self._receive_messages, args=(reader,))
+            thread.daemon = True
+            thread.start()
+
+    def _receive_messages(self, reader):
+        while True:
+            try:
+                message = reader.recv()
+            except Exception as err:  # pylint: disable=broad-except
+                # the connection is unusable, pass on the reason to the receiver
+                self._received.put((False, err))
+                return
+            self._received.put((True, message))
+
+    def send(self, message, priority=0):
+        """Send a message via the channel of the current thread"""
+        try:
+            writer = self._affinity.writer
+        except AttributeError:
+            writer = self._affinity.writer = self._writers[next(self._next_writer) % len(self._writers)]
+        writer.send(message, priority)
+
+    def close(self):
+        """Wait until all sent messages are written"""
+        for writer in self._writers:
+            writer.close()
+
+    def recv(self):
+        """Receive the next message from any channel"""
+        success, message = self._received.get()
+        if success:
+            return message
+        raise message
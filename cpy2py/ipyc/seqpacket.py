@@ -0,0 +1,217 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Duplex connection via an inherited pair of packet sockets
+
+A :py:class:`~.SeqPacketIPyC` creates a connected pair of
+``SOCK_SEQPACKET`` unix sockets. The twinterpreter inherits one end when it
+is spawned, so there is no address in the filesystem and no handshake to
+accept a connection.
+
+The kernel preserves the boundaries of packets. Each write is sent as one
+packet if possible, and as several fragments otherwise::
+
+    flag + fragment
+
+where `flag` is ``b'\\x00'`` for the last fragment of a write and
+``b'\\x01'`` if more fragments follow.
+
+:note: This requires a platform with ``SOCK_SEQPACKET`` unix sockets, such
+       as Linux.
+"""
+import errno
+import os
+import socket
+
+from cpy2py.utility.compat import range
+from cpy2py.ipyc.polling import poll_readable
+from cpy2py.ipyc.duplex_socket import _recv_into, _copy_bytes
+
+# bytearray, so that indexing gives an int in py2 and py3
+_FINAL = bytearray(b'\x00')
+_MORE = bytearray(b'\x01')
+
+
+class SeqPacketIPyC(object):
+    """
+    Duplex packet socket exporting file-like interface
+
+    :param fileno: file descriptor of the inherited end, for use in the slave
+    :type fileno: int or None
+    :param busy_poll: seconds to poll for data before blocking, see :py:mod:`~cpy2py.ipyc.polling`
+    :type busy_poll: float
+    """
+    def __init__(self, fileno=None, is_master=True, busy_poll=0.0):
+        if not hasattr(socket, 'SOCK_SEQPACKET') or not hasattr(socket, 'AF_UNIX'):
+            raise OSError(errno.EPROTONOSUPPORT, '%s requires SOCK_SEQPACKET unix sockets' % self.__class__.__name__)
+        self.is_master = is_master
+        self.busy_poll = busy_poll
+        if is_master:
+            self.client_socket, self._peer_socket = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            self.fileno = self._peer_socket.fileno()
+        else:
+            self.client_socket, self._peer_socket = None, None
+            self.fileno = fileno
+
+    @property
+    def inherit_fds(self):
+        """File descriptors the twinterpreter must inherit"""
+        return (self.fileno,) if self._peer_socket is not None else ()
+
+    def open(self):
+        """Open connections"""
+        if self.is_master:
+            # the twinterpreter owns the other end now - keeping it would hide EOF
+            if self._peer_socket is not None:
+                self._peer_socket.close()
+                self._peer_socket = None
+        else:
+            # fromfd duplicates the descriptor, the original is no longer needed
+            self.client_socket = socket.fromfd(self.fileno, socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            os.close(self.fileno)
+
+    def close(self):
+        """Close connections"""
+        try:
+            self.client_socket.shutdown(socket.SHUT_RDWR)
+        except socket.error as err:
+            if err.errno not in (errno.ENOTCONN, errno.EBADF):
+                raise
+        self.client_socket.close()
+        if self._peer_socket is not None:
+            self._peer_socket.close()
+            self._peer_socket = None
+
+    @property
+    def writer(self):
+        return PacketSocketFile(self.client_socket)
+
+    @property
+    def reader(self):
+        return PacketSocketFile(self.client_socket, busy_poll=self.busy_poll)
+
+    @property
+    def connector(self):
+        """Pickle'able connector as ``(factory, args, kwargs)``"""
+        return self.__class__, (), {'fileno': self.fileno, 'is_master': False, 'busy_poll': self.busy_poll}
+
+    def __repr__(self):
+        return '%s(fileno=%r, is_master=%s)' % (self.__class__.__name__, self.fileno, self.is_master)
+
+
+class PacketSocketFile(object):
+    """
+    File-like interface to a packet socket
+
+    Every :py:meth:`write` is delivered as one message. Reads never extend
+    beyond the end of the current message, similar to
+    :py:class:`~cpy2py.ipyc.duplex_socket.BufferedSocketFile`.
+
+    Writes larger than :py:attr:`packet_size` are split into fragments.
+    The packet size is also limited by the send buffer of the socket,
+    since the kernel rejects any packet that does not fit into it.
+    """
+    #: maximum payload of a single packet
+    packet_size = 128 * 1024
+
+    def __init__(self, client_socket, busy_poll=0.0):
+        self.client_socket = client_socket
+        self.busy_poll = busy_poll
+        self._packet_size = min(
+            self.packet_size,
+            # the kernel reserves some of the send buffer for bookkeeping
+            client_socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) // 2
+        )
+        # a packet larger than the buffer would be silently truncated
+        self._packet = bytearray(self.packet_size + len(_FINAL))
+        self._message = self._packet
+        self._message_start = 0
+        self._message_end = 0
+
+    def read(self, size=None):
+        if size == 0:
+            return b''
+        if self._message_start >= self._message_end:
+            self._read_message()
+        if size is None or size < 0:
+            end = self._message_end
+        else:
+            end = min(self._message_start + size, self._message_end)
+        return self._consume(end)
+
+    def readline(self):
+        """Read an entire line"""
+        if self._message_start >= self._message_end:
+            self._read_message()
+        end = self._message.find(b'\n', self._message_start, self._message_end)
+        return self._consume(self._message_end if end == -1 else end + 1)
+
+    def _consume(self, end):
+        data = _copy_bytes(self._message, self._message_start, end)
+        self._message_start = end
+        return data
+
+    def _read_message(self):
+        """Read all fragments of one message from the socket"""
+        received = self._receive_packet()
+        if self._packet[0] == _FINAL[0]:
+            self._message, self._message_start, self._message_end = self._packet, 1, received
+            return
+        message = self._packet[1:received]
+        while True:
+            received = self._receive_packet()
+            message += self._packet[1:received]
+            if self._packet[0] == _FINAL[0]:
+                break
+        self._message, self._message_start, self._message_end = message, 0, len(message)
+
+    def _receive_packet(self):
+        if self.busy_poll > 0:
+            poll_readable(self.client_socket.fileno(), self.busy_poll)
+        try:
+            received = _recv_into(self.client_socket, self._packet, 0)
+        except socket.error as err:
+            if err.errno == errno.EBADF:
+                raise EOFError
+            raise
+        if not received:
+            raise EOFError
+        return received
+
+    def write(self, message):
+        packet_size = self._packet_size
+        if len(message) <= packet_size:
+            _send_packet(self.client_socket, _FINAL, message)
+            return
+        message = _view(message)
+        for offset in range(0, len(message), packet_size):
+            _send_packet(
+                self.client_socket,
+                _FINAL if offset + packet_size >= len(message) else _MORE,
+                message[offset:offset + packet_size]
+            )
+
+
+if hasattr(socket.socket, 'sendmsg'):
+    _view = memoryview
+
+    def _send_packet(sock, flag, payload):
+        sock.sendmsg((flag, payload))
+else:
+    # fragments are copied for sending anyway, slicing directly is cheapest
+    def _view(message):
+        return message
+
+    def _send_packet(sock, flag, payload):
+        sock.sendall(flag + payload)
@@ -0,0 +1,180 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Accounting of twin objects and proxies alive in twinterpreters
+
+A :py:class:`~.Snapshot` counts the twin objects of every twinterpreter,
+grouped by twinterpreter, kind and class. There are three kinds:
+
+``native``
+    native instances alive in the twinterpreter
+
+``pinned``
+    native instances kept alive for proxies of a peer twinterpreter
+
+``proxy``
+    proxies to native instances of a peer twinterpreter
+
+Comparing two snapshots shows which objects have been created or kept
+alive in between:
+
+.. code:: python
+
+    from cpy2py.kernel import accounting
+
+    before = accounting.take_snapshot()
+    run_task()
+    print(accounting.take_snapshot().diff(before).report())
+
+:note: Sizes are shallow sizes of each object and its ``__dict__``, as
+       reported by :py:func:`sys.getsizeof`. They are zero in interpreters
+       that do not support it, such as PyPy.
+"""
+import collections
+import sys
+import time
+
+from cpy2py.kernel import state
+from cpy2py.proxy import tracker
+
+#: Objects of a kind and class with their total size in bytes and the age in seconds of the oldest
+Usage = collections.namedtuple('Usage', ('count', 'size', 'oldest'))
+
+
+def approximate_size(obj):
+    """Approximate size of an object and its ``__dict__`` in bytes"""
+    size = sys.getsizeof(obj, 0)
+    try:
+        size += sys.getsizeof(obj.__dict__, 0)
+    except AttributeError:
+        pass
+    return size
+
+
+def _class_name(instance):
+    return '%s.%s' % instance.__import_mod_name__
+
+
+def _active_instances(twin_id):
+    instances = tracker.__active_instances__.get(twin_id, {})
+    while True:
+        try:
+            return list(instances.values())
+        except RuntimeError:
+            # proxies are created or deleted concurrently
+            continue
+
+
+def local_usage():
+    """
+    Count the twin objects alive in this twinterpreter
+
+    :returns: the objects of every ``(twin_id, kind, other_id, class_name)``
+    :rtype: dict[tuple[str, str, str, str], tuple[int, int, float or None]]
+
+    The `other_id` is the peer holding pinned instances, the twinterpreter
+    of proxied instances, and the own twinterpreter for native instances.
+    Only pinned instances have an age.
+    """
+    counts = collections.defaultdict(lambda: [0, 0, None])
+    now = time.time()
+    for twin_id in list(tracker.__active_instances__):
+        kind = 'native' if twin_id == state.TWIN_ID else 'proxy'
+        for instance in _active_instances(twin_id):
+            usage = counts[state.TWIN_ID, kind, twin_id, _class_name(instance)]
+            usage[0] += 1
+            usage[1] += approximate_size(instance)
+    for peer_id, server in list(state.KERNEL_SERVERS.items()):
+        for lease in server.request_handler.held_leases():
+            usage = counts[state.TWIN_ID, 'pinned', peer_id, _class_name(lease.instance)]
+            usage[0] += 1
+            usage[1] += approximate_size(lease.instance)
+            usage[2] = max(usage[2] or 0.0, now - lease.created)
+    return dict((key, tuple(value)) for key, value in counts.items())
+
+
+def take_snapshot():
+    """
+    Count the twin objects alive in this and all connected twinterpreters
+
+    :rtype: :py:class:`~.Snapshot`
+
+    Use it in the master to inspect all twinterpreters.
+    """
+    usage = local_usage()
+    for kernel in list(state.KERNEL_INTERFACE.values()):
+        usage.update(kernel.dispatch_call(local_usage))
+    return Snapshot(usage)
+
+
+class Snapshot(object):
+    """
+    Twin objects alive in several twinterpreters at one point in time
+
+    :param usage: the objects of every ``(twin_id, kind, other_id, class_name)``
+    :type usage: dict[tuple[str, str, str, str], tuple[int, int, float or None]]
+    :param timestamp: when the objects were counted
+    :type timestamp: float or None
+    """
+    def __init__(self, usage, timestamp=None):
+        self.usage = dict((key, Usage(*value)) for key, value in usage.items())
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def totals(self, kind=None):
+        """Objects of all classes in every twinterpreter, optionally only of one `kind`"""
+        totals = {}
+        for (twin_id, this_kind, _, _), usage in self.usage.items():
+            if kind is not None and this_kind != kind:
+                continue
+            count, size, _ = totals.get(twin_id, (0, 0, None))
+            totals[twin_id] = Usage(count + usage.count, size + usage.size, None)
+        return totals
+
+    def diff(self, earlier):
+        """
+        Change of objects since an `earlier` snapshot
+
+        :type earlier: :py:class:`~.Snapshot`
+        :rtype: :py:class:`~.Snapshot`
+
+        Counts and sizes are the difference to `earlier`, ages those of this
+        snapshot. Groups without any change in count or size are omitted.
+        """
+        usage = {}
+        for key in set(self.usage) | set(earlier.usage):
+            now, then = self.usage.get(key, Usage(0, 0, None)), earlier.usage.get(key, Usage(0, 0, None))
+            if now.count != then.count or now.size != then.size:
+                usage[key] = (now.count - then.count, now.size - then.size, now.oldest)
+        return Snapshot(usage, self.timestamp)
+
+    def report(self, limit=None):
+        """
+        Format the objects as a table, ordered by size and count
+
+        :param limit: maximum number of groups to report
+        :type limit: int or None
+        """
+        rows = sorted(
+            self.usage.items(), key=lambda item: (abs(item[1].size), abs(item[1].count), item[0]), reverse=True
+        )
+        lines = ['%-12s %-7s %-12s %10s %12s %10s  %s' % ('twin', 'kind', 'other', 'count', 'size', 'oldest', 'class')]
+        for (twin_id, kind, other_id, class_name), usage in rows[:limit]:
+            lines.append('%-12s %-7s %-12s %10d %12d %10s  %s' % (
+                twin_id, kind, other_id, usage.count, usage.size,
+                '-' if usage.oldest is None else '%.1f' % usage.oldest, class_name
+            ))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return '<%s of %d groups at %.1f>' % (self.__class__.__name__, len(self.usage), self.timestamp)
@@ -0,0 +1,201 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Detection of garbage cycles spanning several twinterpreters
+
+A native instance referencing a proxy, whose native instance in turn
+references a proxy of the first, is never released: each twinterpreter
+keeps its instance alive for the other. Such cycles are invisible to the
+garbage collector of each individual twinterpreter.
+
+:py:func:`~.find_cycles` inspects the object graph of every connected
+twinterpreter. It reports each native instance that is held by other
+twinterpreters, but only reachable via proxies held by other such
+instances. :py:func:`~.collect_cycles` additionally releases them, so that
+regular garbage collection can reclaim them.
+
+.. code:: python
+
+    from cpy2py.kernel import cycles
+
+    cycles.collect_cycles()
+
+:note: The inspection is a snapshot of each twinterpreter. Run it while
+       no requests are in flight, e.g. from the master between tasks.
+
+:note: Only references visible to :py:mod:`gc` are considered. An instance
+       referenced only by a C extension may be reported as garbage.
+"""
+import gc
+import types
+
+from cpy2py.kernel import state
+from cpy2py.kernel.lease import Lease
+from cpy2py.proxy import tracker
+from cpy2py.proxy.proxy import InstanceProxy
+from cpy2py.proxy.remote import RemoteObjectProxy
+
+
+#: objects shared by the entire interpreter, which are never part of a cycle
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.CodeType)
+#: references to native instances of other twinterpreters
+_PROXY_TYPES = (InstanceProxy, RemoteObjectProxy)
+
+
+def _request_handlers():
+    return [server.request_handler for server in list(state.KERNEL_SERVERS.values())]
+
+
+def _held_instances():
+    """Mapping of ``{instance_id: instance}`` of all native instances held by other twinterpreters"""
+    held = {}
+    for handler in _request_handlers():
+        held.update(handler.held_instances())
+    return held
+
+
+def _explore(held):
+    """Explore the object graph reachable from `held`, stopping at proxies"""
+    objects, referents = {}, {}
+    stack = list(held.values())
+    while stack:
+        obj = stack.pop()
+        if id(obj) in objects:
+            continue
+        objects[id(obj)] = obj
+        if isinstance(obj, _PROXY_TYPES):
+            referents[id(obj)] = ()
+            continue
+        children = [
+            child for child in gc.get_referents(obj)
+            if gc.is_tracked(child) and not isinstance(child, _OPAQUE_TYPES)
+        ]
+        referents[id(obj)] = [id(child) for child in children]
+        stack.extend(children)
+    return objects, referents
+
+
+def _externally_referenced(objects, own_containers):
+    """Identifiers of all `objects` referenced from outside of them"""
+    ignored = set(id(container) for container in own_containers)
+    referenced = set()
+    candidates = gc.get_objects()
+    ignored.add(id(candidates))
+    for referrer in candidates:
+        if id(referrer) in objects or id(referrer) in ignored or isinstance(referrer, Lease):
+            continue
+        if isinstance(referrer, types.FrameType) and referrer.f_globals is globals():
+            continue
+        for referent in gc.get_referents(referrer):
+            if id(referent) in objects:
+                referenced.add(id(referent))
+    del candidates
+    return referenced
+
+
+def _reachable(start, referents):
+    """Identifiers of all objects reachable from the identifiers `start`"""
+    reached, stack = set(start), list(start)
+    while stack:
+        for child in referents[stack.pop()]:
+            if child not in reached:
+                reached.add(child)
+                stack.append(child)
+    return reached
+
+
+def local_graph():
+    """
+    Inspect the references of this twinterpreter to other twinterpreters
+
+    :returns: the references of every unrooted native instance held by other
+              twinterpreters, and all references rooted in this twinterpreter
+    :rtype: tuple[dict[int, list[tuple[str, int]]], set[tuple[str, int]]]
+
+    References are given as ``(twin_id, instance_id)``. An instance is
+    rooted if it is reachable from anything but other held instances.
+    """
+    gc.collect()
+    held = _held_instances()
+    objects, referents = _explore(held)
+    rooted = _reachable(_externally_referenced(objects, (held, objects, referents)), referents)
+    unrooted = {}
+    for instance_id, instance in held.items():
+        if id(instance) not in rooted:
+            unrooted[instance_id] = [
+                (objects[child].__twin_id__, objects[child].__instance_id__)
+                for child in _reachable((id(instance),), referents) if isinstance(objects[child], _PROXY_TYPES)
+            ]
+    roots = set()
+    for twin_id, instances in list(tracker.__active_instances__.items()):
+        if twin_id == state.TWIN_ID:
+            continue
+        for instance_id in list(instances.keys()):
+            proxy = instances.get(instance_id)
+            if proxy is not None and (id(proxy) not in objects or id(proxy) in rooted):
+                roots.add((twin_id, instance_id))
+    return unrooted, roots
+
+
+def release_instances(instance_ids):
+    """Stop keeping native instances alive for any other twinterpreter"""
+    for handler in _request_handlers():
+        for instance_id in instance_ids:
+            handler.release_instance(instance_id)
+
+
+def find_cycles():
+    """
+    Find native instances only kept alive by cycles across twinterpreters
+
+    :returns: the garbage instances as ``(twin_id, instance_id)``
+    :rtype: list[tuple[str, int]]
+
+    This inspects this twinterpreter and every twinterpreter connected to
+    it. Use it in the master to inspect all twinterpreters.
+    """
+    graphs = {state.TWIN_ID: local_graph()}
+    for twin_id, kernel in list(state.KERNEL_INTERFACE.items()):
+        graphs[twin_id] = kernel.dispatch_call(local_graph)
+    references, roots = {}, set()
+    for twin_id, (unrooted, twin_roots) in graphs.items():
+        roots.update(twin_roots)
+        for instance_id, children in unrooted.items():
+            references[twin_id, instance_id] = children
+    alive, stack = set(roots), list(roots)
+    while stack:
+        for child in references.get(stack.pop(), ()):
+            if child not in alive:
+                alive.add(child)
+                stack.append(child)
+    return sorted(reference for reference in references if reference not in alive)
+
+
+def collect_cycles():
+    """
+    Release native instances only kept alive by cycles across twinterpreters
+
+    :returns: the released instances as ``(twin_id, instance_id)``
+    :rtype: list[tuple[str, int]]
+    """
+    garbage = find_cycles()
+    by_twin = {}
+    for twin_id, instance_id in garbage:
+        by_twin.setdefault(twin_id, []).append(instance_id)
+    for twin_id, instance_ids in by_twin.items():
+        if twin_id == state.TWIN_ID:
+            release_instances(instance_ids)
+        else:
+            state.get_kernel(twin_id).dispatch_call(release_instances, instance_ids)
+    return garbage
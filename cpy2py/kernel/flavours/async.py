@@ -20,10 +20,12 @@ that this comes at the cost of starting a new thread per request.
 """
 from __future__ import print_function
 import threading
+import time
 
 from cpy2py.utility.exceptions import format_exception
 from cpy2py.ipyc import exceptions
 from cpy2py.kernel import state
+from cpy2py.kernel.priority import INTERACTIVE
 from cpy2py.kernel.flavours.single import SingleThreadKernelClient, SingleThreadKernelServer
 
 
@@ -46,29 +48,97 @@ class AsyncKernelServer(SingleThreadKernelServer):
         while not self._terminate.is_set():
             if __debug__:
                 self._logger.warning('<%s> [%s] Server Listening', state.TWIN_ID, self.peer_id)
-            request_id, directive = self._server_recv()
+            request_id, directive, priority = self._server_recv()
             if self._except_callback is not None:
                 raise self._except_callback  # pylint: disable=raising-bad-type
-            self._dispatch_request_handling(request_id, directive)
+            self._dispatch_request_handling(request_id, directive, priority)
 
-    def _dispatch_request_handling(self, request_id, directive):
-        thread = threading.Thread(target=self._request_thread_main, args=(request_id, directive))
+    def _dispatch_request_handling(self, request_id, directive, priority):
+        thread = threading.Thread(target=self._request_thread_main, args=(request_id, directive, priority))
         thread.daemon = True
         thread.start()
 
-    def _request_thread_main(self, request_id, directive):
+    def _request_thread_main(self, request_id, directive, priority):
         try:
-            self.request_handler.serve_request(request_id, directive)
+            self.request_handler.serve_request(request_id, directive, priority)
         except Exception as err:  # pylint: disable=broad-except
             self._except_callback = err
 
 
+class ReplySlot(object):
+    """
+    Reusable slot of a thread waiting for replies
+
+    The :py:attr:`signal` is locked while no reply is available. Delivering
+    a reply releases it, and waiting for the reply locks it again.
+    """
+    __slots__ = ('signal', 'reply')
+
+    def __init__(self):
+        self.signal = threading.Lock()
+        self.signal.acquire()
+        self.reply = None
+
+    def deliver(self, reply):
+        """Deliver a reply and wake up the waiting thread"""
+        self.reply = reply
+        self.signal.release()
+
+    def wait(self, spin_time=0.0):
+        """Wait for a reply, polling for up to `spin_time` seconds before blocking"""
+        if spin_time > 0:
+            spin_until = time.time() + spin_time
+            while time.time() < spin_until:
+                if self.signal.acquire(False):
+                    return self.reply
+                # let other threads, e.g. the receiver, run
+                time.sleep(0)
+        self.signal.acquire()
+        return self.reply
+
+
+_reply_slots = threading.local()
+
+
+def _reply_slot():
+    """Get the reply slot of the current thread"""
+    try:
+        slot = _reply_slots.slot
+    except AttributeError:
+        slot = _reply_slots.slot = ReplySlot()
+    else:
+        # reset a slot left signalled by a request that failed to send
+        slot.signal.acquire(False)
+    return slot
+
+
 class AsyncKernelClient(SingleThreadKernelClient):
+    """
+    Asynchronous kernel client for sending requests to other interpreter in parallel
+
+    :param peer_id: id of the kernel/twinterpreter this kernel is peered with
+    :type peer_id: str
+    :param ipyc: :py:mod:`~IPyC` for outgoing requests
+    :type ipyc: :py:class:`~DuplexFifoIPyC`
+    :param pickle_protocol: protocol number for :py:mod:`pickle`
+    :type pickle_protocol: int
+
+    Threads waiting for a reply may poll for up to :py:attr:`spin_time`
+    seconds before blocking, which avoids the latency of waking up a
+    blocked thread. Polling is only done while recent replies have taken
+    less than :py:attr:`spin_time` on average. Since polling competes with
+    the receiving thread for the GIL, it is disabled by default.
+    """
+    #: seconds to poll for a reply before blocking
+    spin_time = 0.0
+
     def __init__(self, peer_id, ipyc, pickle_protocol=2):
         SingleThreadKernelClient.__init__(self, peer_id=peer_id, ipyc=ipyc, pickle_protocol=pickle_protocol)
         self._request_send_lock = threading.RLock()
-        # request_id => (signal, reply)
+        # request_id => reply slot
         self._requests = {}
+        # moving average of the time to receive a reply
+        self._reply_time = 0.0
         self._terminate = threading.Event()
         self._terminate.set()
         self._thread = threading.Thread(target=self._digest_replies)
@@ -82,10 +152,8 @@ class AsyncKernelClient(SingleThreadKernelClient):
                 if __debug__:
                     self._logger.warning('<%s> [%s] Client Listening', state.TWIN_ID, self.peer_id)
                 request_id, reply_body = self._client_recv()
-                request = self._requests.pop(request_id)
-                request[1] = reply_body
-                request[0].set()
-                del request_id, reply_body, request
+                self._requests.pop(request_id).deliver(reply_body)
+                del request_id, reply_body
         except (exceptions.IPyCTerminated, EOFError, ValueError):
             self._logger.warning('<%s> [%s] Client Released', state.TWIN_ID, self.peer_id)
             self.stop_local()
@@ -101,17 +169,27 @@ class AsyncKernelClient(SingleThreadKernelClient):
             format_exception(self._logger, 3)
             raise
 
-    def run_request(self, request_body):
+    def run_request(self, request_body, priority=INTERACTIVE):
         my_id = threading.current_thread().ident
+        my_slot = _reply_slot()
+        my_slot.reply = self.request_dispatcher.empty_reply
         with self._request_send_lock:
-            self._requests[my_id] = my_request = [threading.Event(), self.request_dispatcher.empty_reply]
-            self._client_send((my_id, request_body))
-        my_request[0].wait()
-        return my_request[1]
+            self._requests[my_id] = my_slot
+        # sending is thread-safe, and large requests must not block others
+        try:
+            self._client_send((my_id, request_body, priority), priority)
+        except Exception:
+            self._requests.pop(my_id, None)
+            raise
+        if self.spin_time <= 0:
+            return my_slot.wait()
+        start = time.time()
+        reply = my_slot.wait(self.spin_time if self._reply_time < self.spin_time else 0.0)
+        self._reply_time = 0.9 * self._reply_time + 0.1 * (time.time() - start)
+        return reply
 
-    def run_event(self, event_body):
-        with self._request_send_lock:
-            self._client_send((None, event_body))
+    def run_event(self, event_body, priority=INTERACTIVE):
+        self._client_send((None, event_body, priority), priority)
 
     def stop(self):
         with self._request_send_lock:
@@ -129,7 +207,7 @@ class AsyncKernelClient(SingleThreadKernelClient):
             self._terminate.set()
             while True:
                 try:
-                    self._requests.popitem()[1][0].set()
+                    self._requests.popitem()[1].deliver(self.request_dispatcher.empty_reply)
                 except KeyError:
                     break
 
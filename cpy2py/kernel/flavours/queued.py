@@ -0,0 +1,71 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Multithreaded Kernel Client and Server with writer threads
+
+Variant of the multithreaded kernel, sending messages from a dedicated
+writer thread. Callers serialize their messages and queue them without
+waiting for the connection. The writer thread combines queued messages
+into few writes, which reduces system calls when many threads send
+concurrently. For few concurrent threads, handing messages to the writer
+thread adds some latency instead.
+"""
+import functools
+
+from cpy2py.ipyc.framing import QueuedFrameWriter
+from cpy2py.kernel import state
+from cpy2py.kernel.flavours.async import AsyncKernelClient
+from cpy2py.kernel.flavours.threaded import MultiThreadKernelServer
+
+
+class QueuedKernelServer(MultiThreadKernelServer):
+    """
+    Multithreaded kernel server sending replies from a writer thread
+
+    :param peer_id: id of the kernel/twinterpreter this kernel is peered with
+    :type peer_id: str
+    :param ipyc: :py:mod:`~IPyC` for incoming requests
+    :type ipyc: :py:class:`~DuplexFifoIPyC`
+    :param pickle_protocol: protocol number for :py:mod:`pickle`
+    :type pickle_protocol: int
+    """
+    frame_writer_type = QueuedFrameWriter
+
+
+class QueuedKernelClient(AsyncKernelClient):
+    """
+    Asynchronous kernel client sending requests from a writer thread
+
+    :param peer_id: id of the kernel/twinterpreter this kernel is peered with
+    :type peer_id: str
+    :param ipyc: :py:mod:`~IPyC` for outgoing requests
+    :type ipyc: :py:class:`~DuplexFifoIPyC`
+    :param pickle_protocol: protocol number for :py:mod:`pickle`
+    :type pickle_protocol: int
+
+    If the writer thread fails, the client shuts down and releases all
+    outstanding requests.
+    """
+    frame_writer_type = QueuedFrameWriter
+
+    def __init__(self, peer_id, ipyc, pickle_protocol=2):
+        self.frame_writer_type = functools.partial(self.frame_writer_type, on_error=self._writer_failed)
+        AsyncKernelClient.__init__(self, peer_id=peer_id, ipyc=ipyc, pickle_protocol=pickle_protocol)
+
+    def _writer_failed(self, err):
+        self._logger.critical('<%s> [%s] TWIN KERNEL WRITER FAILED: %s', state.TWIN_ID, self.peer_id, err)
+        self.stop_local()
+
+SERVER = QueuedKernelServer
+CLIENT = QueuedKernelClient
@@ -29,19 +29,36 @@ import threading
 from cpy2py.kernel import state
 
 from cpy2py.utility.exceptions import format_exception
+from cpy2py.utility.compat import BytesFile
 from cpy2py.ipyc import exceptions
+from cpy2py.ipyc.framing import FrameWriter, FrameReader
 from cpy2py.kernel.exceptions import StopTwinterpreter
 from cpy2py.proxy import tracker
+from cpy2py.kernel import lease
+from cpy2py.kernel.priority import INTERACTIVE, LEVELS
 from cpy2py.kernel.requesthandler import RequestDispatcher, RequestHandler
 
 
-def _connect_ipyc(ipyc, pickle_protocol):
-    """Connect pickle/unpickle trackers to a duplex IPyC"""
-    pickler = tracker.twin_pickler(ipyc.writer, pickle_protocol)
-    send = pickler.dump
-    unpickler = tracker.twin_unpickler(ipyc.reader)
-    recv = unpickler.load
-    return send, recv
+def _connect_ipyc(ipyc, pickle_protocol, retain=None, frame_writer_type=FrameWriter):
+    """Connect pickle/unpickle trackers to a duplex IPyC, returning ``send, recv, close``"""
+    try:
+        # pools connect several channels
+        connect = ipyc.connect
+    except AttributeError:
+        frame_writer, frame_reader = frame_writer_type(ipyc.writer, levels=LEVELS), FrameReader(ipyc.reader)
+    else:
+        frame_writer = frame_reader = connect(levels=LEVELS, frame_writer=frame_writer_type)
+
+    # messages are serialized in full, so that they can be sent interleaved
+    # fresh picklers keep no objects alive or resend stale copies across messages
+    def send(obj, priority=INTERACTIVE):
+        buffer = BytesFile()
+        tracker.twin_pickler(buffer, pickle_protocol, retain=retain).dump(obj)
+        frame_writer.send(buffer.getvalue(), priority)
+
+    def recv():
+        return tracker.twin_unpickler(BytesFile(frame_reader.recv())).load()
+    return send, recv, frame_writer.close
 
 
 class SingleThreadKernelServer(object):
@@ -55,6 +72,9 @@ class SingleThreadKernelServer(object):
     :param pickle_protocol: protocol number for :py:mod:`pickle`
     :type pickle_protocol: int
     """
+    #: type of :py:class:`~cpy2py.ipyc.framing.FrameWriter` sending replies
+    frame_writer_type = FrameWriter
+
     def __new__(cls, peer_id, *args, **kwargs):  # pylint: disable=unused-argument
         assert peer_id not in state.KERNEL_SERVERS, 'Twinterpreters must have unique IDs'
         state.KERNEL_SERVERS[peer_id] = object.__new__(cls)
@@ -65,7 +85,9 @@ class SingleThreadKernelServer(object):
         self.peer_id = peer_id
         self._ipyc = ipyc
         self._ipyc.open()
-        self._server_send, self._server_recv = _connect_ipyc(ipyc, pickle_protocol)
+        self._server_send, self._server_recv, self._server_close = _connect_ipyc(
+            ipyc, pickle_protocol, lease.retainer(peer_id), self.frame_writer_type
+        )
         self._terminate = threading.Event()
         self._terminate.set()
         self.request_handler = RequestHandler(peer_id=self.peer_id, kernel_server=self)
@@ -108,6 +130,8 @@ class SingleThreadKernelServer(object):
         finally:
             self._terminate.set()
             self._logger.critical('<%s> [%s] TWIN KERNEL SHUTDOWN: %d', state.TWIN_ID, self.peer_id, exit_code)
+            # pending replies must be written before closing
+            self._server_close()
             self._ipyc.close()
             del state.KERNEL_SERVERS[self.peer_id]
         return exit_code
@@ -116,11 +140,11 @@ class SingleThreadKernelServer(object):
         while not self._terminate.is_set():
             if __debug__:
                 self._logger.warning('<%s> [%s] Server Listening', state.TWIN_ID, self.peer_id)
-            request_id, directive = self._server_recv()
-            self.request_handler.serve_request(request_id, directive)
+            request_id, directive, priority = self._server_recv()
+            self.request_handler.serve_request(request_id, directive, priority)
 
-    def send_reply(self, request_id, reply_body):
-        self._server_send((request_id, reply_body))
+    def send_reply(self, request_id, reply_body, priority=INTERACTIVE):
+        self._server_send((request_id, reply_body), priority)
 
     def stop(self):
         """Shutdown the local server"""
@@ -143,6 +167,9 @@ class SingleThreadKernelClient(object):
     :param pickle_protocol: protocol number for :py:mod:`pickle`
     :type pickle_protocol: int
     """
+    #: type of :py:class:`~cpy2py.ipyc.framing.FrameWriter` sending requests
+    frame_writer_type = FrameWriter
+
     def __new__(cls, peer_id, *args, **kwargs):  # pylint: disable=unused-argument
         assert peer_id not in state.KERNEL_CLIENTS, 'Twinterpreters must have unique IDs'
         state.KERNEL_CLIENTS[peer_id] = object.__new__(cls)
@@ -154,19 +181,22 @@ class SingleThreadKernelClient(object):
         # communication
         self._ipyc = ipyc
         self._ipyc.open()
-        self._client_send, self._client_recv = _connect_ipyc(ipyc, pickle_protocol)
+        self._client_send, self._client_recv, self._client_close = _connect_ipyc(
+            ipyc, pickle_protocol, lease.retainer(peer_id), self.frame_writer_type
+        )
         self.request_dispatcher = RequestDispatcher(peer_id=self.peer_id, kernel_client=self)
         state.KERNEL_INTERFACE[peer_id] = self.request_dispatcher
+        lease.ensure_renewer()
 
-    def run_request(self, request_body):
+    def run_request(self, request_body, priority=INTERACTIVE):
         my_id = threading.current_thread().ident
-        self._client_send((my_id, request_body))
+        self._client_send((my_id, request_body, priority), priority)
         request_id, reply_body = self._client_recv()
         assert request_id == my_id, 'kernel messages order'
         return reply_body
 
-    def run_event(self, event_body):
-        self._client_send((None, event_body))
+    def run_event(self, event_body, priority=INTERACTIVE):
+        self._client_send((None, event_body, priority), priority)
 
     def stop(self):
         """Shutdown all servers"""
@@ -177,6 +207,11 @@ class SingleThreadKernelClient(object):
 
     def stop_local(self):
         """Shutdown the local server"""
+        self.request_dispatcher.terminated = True
+        # identifiers of a restarted twin start anew, stale proxies must not be found
+        tracker.forget_twin(self.peer_id)
+        # pending messages, e.g. the shutdown of the peer, must be written before closing
+        self._client_close()
         self._ipyc.close()
         try:
             del state.KERNEL_CLIENTS[self.peer_id]
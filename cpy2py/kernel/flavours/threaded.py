@@ -22,7 +22,8 @@ threads.
 import threading
 import random
 
-from cpy2py.utility.thread_tools import FifoQueue, ItemError, ThreadGuard
+from cpy2py.utility.thread_tools import PriorityQueue, ItemError, ThreadGuard
+from cpy2py.kernel.priority import LEVELS
 from cpy2py.kernel.flavours.async import AsyncKernelClient, AsyncKernelServer
 
 
@@ -40,11 +41,12 @@ class MultiThreadKernelServer(AsyncKernelServer):
     def __init__(self, peer_id, ipyc, pickle_protocol=2):
         AsyncKernelServer.__init__(self, peer_id=peer_id, ipyc=ipyc, pickle_protocol=pickle_protocol)
         self._worker_threads = set()
-        self._work_queue = FifoQueue()
+        # requests of higher priority are served first
+        self._work_queue = PriorityQueue(LEVELS)
         self._idle_workers = ThreadGuard(0)
 
-    def _dispatch_request_handling(self, request_id, directive):
-        self._work_queue.put((request_id, directive))
+    def _dispatch_request_handling(self, request_id, directive, priority):
+        self._work_queue.put((priority, request_id, directive))
         if self._work_queue.qsize() > self._idle_workers:
             self._start_worker()
 
@@ -58,7 +60,7 @@ class MultiThreadKernelServer(AsyncKernelServer):
         while True:
             self._idle_workers += 1
             try:
-                request_id, directive = self._work_queue.get(True, 9 + 2 * random.random())
+                priority, request_id, directive = self._work_queue.get(True, 9 + 2 * random.random())
             except ItemError:
                 # avoid race condition by removing us FIRST, then checking if any are left
                 self._worker_threads.remove(threading.currentThread())
@@ -71,7 +73,7 @@ class MultiThreadKernelServer(AsyncKernelServer):
             finally:
                 self._idle_workers -= 1
             try:
-                self.request_handler.serve_request(request_id, directive)
+                self.request_handler.serve_request(request_id, directive, priority)
             except Exception as err:  # pylint: disable=broad-except
                 self._except_callback = err
 
@@ -0,0 +1,126 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Lease-based liveness of native instances held by other twinterpreters
+
+Every native instance referenced by a proxy in another twinterpreter is
+kept alive by a :py:class:`~.Lease` of the kernel serving that peer. The
+lease counts the proxies of the peer, which release their reference when
+they are deleted.
+
+If :py:data:`~cpy2py.kernel.state.LEASE_TIME` is set, each lease also
+expires unless renewed in time. A background thread of every
+twinterpreter renews the leases of all its proxies in bulk, three times
+per lease time. Leases whose proxies are gone, but whose release was never
+received - for example when a proxy is deleted during interpreter teardown
+- thus expire eventually instead of leaking the instance.
+
+Enable leases in the master before starting any twinterpreter; the
+setting is passed on to all twinterpreters on startup:
+
+.. code:: python
+
+    from cpy2py import kernel_state, TwinMaster
+
+    kernel_state.LEASE_TIME = 60.0
+    TwinMaster('pypy').start()
+
+:note: A lease time much shorter than the longest request blocking a
+       twinterpreter risks expiring leases whose renewal is still on the way.
+"""
+import threading
+import time
+
+from cpy2py.kernel import state
+from cpy2py.kernel.exceptions import TwinterpeterUnavailable
+from cpy2py.proxy import tracker
+
+
+class Lease(object):
+    """
+    Reference of a peer to a native instance
+
+    :param instance: the native instance kept alive
+    """
+    __slots__ = ('instance', 'count', 'created', 'expires')
+
+    def __init__(self, instance):
+        self.instance = instance
+        #: number of references held by the peer
+        self.count = 1
+        #: time at which the peer first referenced the instance
+        self.created = time.time()
+        self.expires = None
+        self.renew()
+
+    def renew(self):
+        """Extend the lease by :py:data:`~cpy2py.kernel.state.LEASE_TIME` from now"""
+        if state.LEASE_TIME is not None:
+            self.expires = time.time() + state.LEASE_TIME
+
+    def expired(self, now):
+        """Whether the lease has not been renewed in time"""
+        return self.expires is not None and self.expires < now
+
+
+def retainer(peer_id):
+    """Create a callback retaining native instances sent to `peer_id` until it holds a proxy"""
+    def retain(instance):
+        server = state.KERNEL_SERVERS.get(peer_id)
+        if server is not None:
+            server.request_handler.retain_instance(instance)
+    return retain
+
+
+def proxy_ids(twin_id):
+    """Instance identifiers of all proxies for instances native to `twin_id`"""
+    instances = tracker.__active_instances__.get(twin_id, {})
+    while True:
+        try:
+            return list(instances.keys())
+        except RuntimeError:
+            # proxies are created or deleted concurrently
+            continue
+
+
+def renew_all():
+    """Renew the leases of all proxies in this twinterpreter"""
+    for peer_id, kernel in list(state.KERNEL_INTERFACE.items()):
+        try:
+            kernel.renew_leases(proxy_ids(peer_id))
+        except TwinterpeterUnavailable:
+            pass
+
+
+#: thread renewing leases, if started
+_RENEWER = None
+_RENEWER_LOCK = threading.Lock()
+
+
+def _renew_periodically():
+    while state.LEASE_TIME is not None:
+        time.sleep(state.LEASE_TIME / 3.0)
+        renew_all()
+
+
+def ensure_renewer():
+    """Start renewing leases periodically, if enabled and not running yet"""
+    global _RENEWER  # pylint: disable=global-statement
+    if state.LEASE_TIME is None:
+        return
+    with _RENEWER_LOCK:
+        if _RENEWER is None or not _RENEWER.is_alive():
+            _RENEWER = threading.Thread(target=_renew_periodically, name='cpy2py lease renewer')
+            _RENEWER.daemon = True
+            _RENEWER.start()
@@ -0,0 +1,81 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Priority classes of requests between twinterpreters
+
+Every request belongs to one of three classes, from highest to lowest
+priority:
+
+:py:data:`~.CONTROL`
+    reference counting, lease renewal and shutdown of kernels
+
+:py:data:`~.INTERACTIVE`
+    regular requests, the default
+
+:py:data:`~.BULK`
+    requests transferring or processing large amounts of data
+
+Higher priorities are sent first when messages queue up for a connection,
+and served first by kernels handling requests in parallel. Requests are
+sent as :py:data:`~.BULK` inside a :py:class:`~.request_priority` context:
+
+.. code:: python
+
+    from cpy2py.kernel.priority import request_priority, BULK
+
+    with request_priority(BULK):
+        array = fetch_array()
+
+Requests made while serving a request inherit its priority.
+"""
+import threading
+
+#: kernel internal requests, such as reference counting
+CONTROL = 0
+#: regular requests
+INTERACTIVE = 1
+#: transfers of large amounts of data
+BULK = 2
+#: number of priority classes
+LEVELS = 3
+
+_local = threading.local()
+
+
+def current():
+    """Priority of requests made by the current thread"""
+    return getattr(_local, 'priority', INTERACTIVE)
+
+
+class request_priority(object):  # pylint: disable=invalid-name
+    """
+    Context in which the current thread makes requests at a priority
+
+    :param priority: one of :py:data:`~.CONTROL`, :py:data:`~.INTERACTIVE` or :py:data:`~.BULK`
+    :type priority: int
+    """
+    def __init__(self, priority):
+        if priority not in (CONTROL, INTERACTIVE, BULK):
+            raise ValueError('unknown priority %r' % priority)
+        self.priority = priority
+        self._previous = []
+
+    def __enter__(self):
+        self._previous.append(current())
+        _local.priority = self.priority
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.priority = self._previous.pop()
+        return False
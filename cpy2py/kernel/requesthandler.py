@@ -12,11 +12,16 @@
 # - # See the License for the specific language governing permissions and
 # - # limitations under the License.
 import logging
+import time
+import threading
 
 from cpy2py.kernel import state
 from cpy2py.ipyc import exceptions
 from cpy2py.utility.exceptions import format_exception, CPy2PyException
 from cpy2py.kernel.exceptions import StopTwinterpreter, TwinterpeterTerminated
+from cpy2py.kernel.lease import Lease
+from cpy2py.kernel.priority import CONTROL, INTERACTIVE, request_priority, current as current_priority
+from cpy2py.proxy import coherence, tracker
 
 
 # Message Enums
@@ -28,10 +33,14 @@ __E_CALL_METHOD__ = 12
 __E_GET_ATTRIBUTE__ = 21
 __E_SET_ATTRIBUTE__ = 22
 __E_DEL_ATTRIBUTE__ = 23
+__E_GET_ATTRIBUTES__ = 24
+__E_GET_CACHED_ATTRIBUTE__ = 25
+__E_SET_ATTRIBUTES__ = 26
 # instantiation/references
 __E_INSTANTIATE__ = 31
 __E_REF_INCR__ = 32
 __E_REF_DECR__ = 33
+__E_RENEW_LEASES__ = 34
 # twin reply type
 __E_SUCCESS__ = 101
 __E_EXCEPTION__ = 102
@@ -42,9 +51,13 @@ E_SYMBOL = {
     __E_GET_ATTRIBUTE__: '__E_GET_ATTRIBUTE__',
     __E_SET_ATTRIBUTE__: '__E_SET_ATTRIBUTE__',
     __E_DEL_ATTRIBUTE__: '__E_DEL_ATTRIBUTE__',
+    __E_GET_ATTRIBUTES__: '__E_GET_ATTRIBUTES__',
+    __E_GET_CACHED_ATTRIBUTE__: '__E_GET_CACHED_ATTRIBUTE__',
+    __E_SET_ATTRIBUTES__: '__E_SET_ATTRIBUTES__',
     __E_INSTANTIATE__: '__E_INSTANTIATE__',
     __E_REF_INCR__: '__E_REF_INCR__',
     __E_REF_DECR__: '__E_REF_DECR__',
+    __E_RENEW_LEASES__: '__E_RENEW_LEASES__',
     __E_SUCCESS__: '__E_SUCCESS__',
     __E_EXCEPTION__: '__E_EXCEPTION__',
 }
@@ -60,6 +73,17 @@ class TerminationEvent(object):
         raise StopTwinterpreter(message=state['message'], exit_code=state['exit_code'])
 
 
+#: requests for kernel internal bookkeeping
+_CONTROL_REQUESTS = frozenset((__E_REF_INCR__, __E_REF_DECR__, __E_RENEW_LEASES__))
+
+
+def _priority(request_type):
+    """Priority at which to send a request of the current thread"""
+    if isinstance(request_type, TerminationEvent) or request_type in _CONTROL_REQUESTS:
+        return CONTROL
+    return current_priority()
+
+
 class RequestHandler(object):
     """
     Handler for requests between kernels
@@ -73,8 +97,10 @@ class RequestHandler(object):
         self._logger = logging.getLogger('__cpy2py__.kernel.%s_to_%s.handler' % (state.TWIN_ID, peer_id))
         self.peer_id = peer_id
         self.kernel_server = kernel_server
-        # instance => ref_count
+        # instance_id => lease
         self._instances_keepalive = {}
+        # instances are retained when sent, concurrently to serving requests
+        self._keepalive_lock = threading.RLock()
         # directive lookup for methods
         self._directive_method = {
             __E_CALL_FUNC__: self._directive_call_func,
@@ -82,13 +108,26 @@ class RequestHandler(object):
             __E_GET_ATTRIBUTE__: self._directive_get_attribute,
             __E_SET_ATTRIBUTE__: self._directive_set_attribute,
             __E_DEL_ATTRIBUTE__: self._directive_del_attribute,
+            __E_GET_ATTRIBUTES__: self._directive_get_attributes,
+            __E_GET_CACHED_ATTRIBUTE__: self._directive_get_cached_attribute,
+            __E_SET_ATTRIBUTES__: self._directive_set_attributes,
             __E_INSTANTIATE__: self._directive_instantiate,
             __E_REF_INCR__: self._directive_ref_incr,
             __E_REF_DECR__: self._directive_ref_decr,
+            __E_RENEW_LEASES__: self._directive_renew_leases,
         }
 
-    def serve_request(self, request_id, directive):
-        """Serve a request from :py:meth:`_dispatch_request`"""
+    def serve_request(self, request_id, directive, priority=INTERACTIVE):
+        """
+        Serve a request from :py:meth:`_dispatch_request`
+
+        A `request_id` of :py:const:`None` marks a request without reply
+        from :py:meth:`_dispatch_event`. Its result is discarded, and any
+        exception is passed to :py:data:`~cpy2py.kernel.state.ONEWAY_ERROR_HOOK`.
+
+        The request is served and replied to at its `priority`, which also
+        applies to any requests made while serving it.
+        """
         # unpack request
         try:
             directive_type, directive_body = directive
@@ -102,19 +141,35 @@ class RequestHandler(object):
                 self._logger.warning(
                     '<%s> [%s] Directive %s', state.TWIN_ID, self.peer_id, E_SYMBOL[directive_type]
                 )
-            response = directive_method(directive_body)
+            with request_priority(priority):
+                response = directive_method(directive_body)
         # catch internal errors to reraise them
         except CPy2PyException:
             raise
         # send everything else back to calling scope
         except Exception as err:  # pylint: disable=broad-except
-            self.kernel_server.send_reply(request_id, (__E_EXCEPTION__, err))
-            self._logger.critical('<%s> [%s] TWIN KERNEL PAYLOAD EXCEPTION', state.TWIN_ID, self.peer_id)
-            format_exception(self._logger, 3)
+            if request_id is not None:
+                self.kernel_server.send_reply(request_id, (__E_EXCEPTION__, err), priority)
+                self._logger.critical('<%s> [%s] TWIN KERNEL PAYLOAD EXCEPTION', state.TWIN_ID, self.peer_id)
+                format_exception(self._logger, 3)
+            else:
+                self._oneway_error(directive, err)
             if isinstance(err, (KeyboardInterrupt, SystemExit)):
                 raise StopTwinterpreter(message=err.__class__.__name__, exit_code=1)
         else:
-            self.kernel_server.send_reply(request_id, (__E_SUCCESS__, response))
+            if request_id is not None:
+                self.kernel_server.send_reply(request_id, (__E_SUCCESS__, response), priority)
+
+    def _oneway_error(self, directive, err):
+        """Report the failure of a request without reply"""
+        if state.ONEWAY_ERROR_HOOK is not None:
+            try:
+                return state.ONEWAY_ERROR_HOOK(self.peer_id, directive, err)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.critical('<%s> [%s] TWIN KERNEL ONEWAY HOOK EXCEPTION', state.TWIN_ID, self.peer_id)
+                format_exception(self._logger, 3)
+        self._logger.critical('<%s> [%s] TWIN KERNEL ONEWAY PAYLOAD EXCEPTION', state.TWIN_ID, self.peer_id)
+        format_exception(self._logger, 3)
 
     @staticmethod
     def _directive_call_func(directive_body):
@@ -126,7 +181,11 @@ class RequestHandler(object):
     def _directive_call_method(directive_body):
         """Directive for :py:meth:`dispatch_method_call`"""
         instance, method_name, method_args, method_kwargs = directive_body
-        return getattr(instance, method_name)(*method_args, **method_kwargs)
+        try:
+            return getattr(instance, method_name)(*method_args, **method_kwargs)
+        finally:
+            if getattr(instance, '__twin_cached__', False):
+                coherence.invalidate(instance)
 
     @staticmethod
     def _directive_get_attribute(directive_body):
@@ -146,30 +205,112 @@ class RequestHandler(object):
         instance, attribute_name = directive_body
         return delattr(instance, attribute_name)
 
+    @staticmethod
+    def _directive_get_attributes(directive_body):
+        """Directive for :py:meth:`get_attributes`"""
+        instance, attribute_names = directive_body
+        attributes = {}
+        for attribute_name in attribute_names:
+            try:
+                attributes[attribute_name] = getattr(instance, attribute_name)
+            except AttributeError:
+                pass
+        return attributes
+
+    @staticmethod
+    def _directive_set_attributes(directive_body):
+        """Directive for :py:meth:`set_attributes`"""
+        instance, operations = directive_body
+        for operation in operations:
+            if len(operation) == 2:
+                setattr(instance, operation[0], operation[1])
+            else:
+                delattr(instance, operation[0])
+
+    def _directive_get_cached_attribute(self, directive_body):
+        """Directive for :py:meth:`get_cached_attribute`"""
+        instance, attribute_name = directive_body
+        # register before reading, so that any later modification is pushed
+        version = coherence.register(instance, self.peer_id)
+        return getattr(instance, attribute_name), version
+
     def _directive_instantiate(self, directive_body):
         """Directive for :py:meth:`instantiate_class`"""
         cls, cls_args, cls_kwargs = directive_body
         instance = cls(*cls_args, **cls_kwargs)
-        self._instances_keepalive[instance] = 1
+        self.retain_instance(instance)
         return instance.__instance_id__
 
     def _directive_ref_incr(self, directive_body):
         """Directive for :py:meth:`increment_instance_ref`"""
-        instance = directive_body[0]
-        try:
-            self._instances_keepalive[instance] += 1
-        except KeyError:
-            self._instances_keepalive[instance] = 1
-        return self._instances_keepalive[instance]
+        instance = tracker.get_instance(state.TWIN_ID, directive_body[0])
+        if instance is None:
+            raise ReferenceError('instance %d of %r has been released' % (directive_body[0], state.TWIN_ID))
+        return self.retain_instance(instance)
 
     def _directive_ref_decr(self, directive_body):
         """Directive for :py:meth:`decrement_instance_ref`"""
-        instance = directive_body[0]
-        self._instances_keepalive[instance] -= 1
-        response = self._instances_keepalive[instance]
-        if self._instances_keepalive[instance] <= 0:
-            del self._instances_keepalive[instance]
-        return response
+        released = []
+        with self._keepalive_lock:
+            for instance_id in directive_body[0]:
+                try:
+                    lease = self._instances_keepalive[instance_id]
+                except KeyError:
+                    # lease expired or collected already
+                    continue
+                lease.count -= 1
+                if lease.count <= 0:
+                    released.append(instance_id)
+        for instance_id in released:
+            self.release_instance(instance_id)
+
+    def _directive_renew_leases(self, directive_body):
+        """Directive for :py:meth:`renew_leases`"""
+        with self._keepalive_lock:
+            for instance_id in directive_body[0]:
+                try:
+                    self._instances_keepalive[instance_id].renew()
+                except KeyError:
+                    pass
+            now = time.time()
+            expired = [
+                instance_id for instance_id, lease in self._instances_keepalive.items() if lease.expired(now)
+            ]
+        if expired:
+            self._logger.warning(
+                '<%s> [%s] Expired %d leases without renewal', state.TWIN_ID, self.peer_id, len(expired)
+            )
+        for instance_id in expired:
+            self.release_instance(instance_id)
+
+    def retain_instance(self, instance):
+        """Keep an instance alive for one more reference of the peer, returning the number of references"""
+        with self._keepalive_lock:
+            try:
+                lease = self._instances_keepalive[instance.__instance_id__]
+            except KeyError:
+                lease = self._instances_keepalive[instance.__instance_id__] = Lease(instance)
+            else:
+                lease.count += 1
+                lease.renew()
+            return lease.count
+
+    def release_instance(self, instance_id):
+        """Stop keeping an instance alive for the peer, regardless of its references"""
+        with self._keepalive_lock:
+            lease = self._instances_keepalive.pop(instance_id, None)
+        if lease is not None and getattr(lease.instance, '__twin_cached__', False):
+            coherence.forget(lease.instance)
+
+    def held_instances(self):
+        """Mapping of ``{instance_id: instance}`` for all instances kept alive for the peer"""
+        with self._keepalive_lock:
+            return dict((instance_id, lease.instance) for instance_id, lease in self._instances_keepalive.items())
+
+    def held_leases(self):
+        """List of the :py:class:`~cpy2py.kernel.lease.Lease` of every instance kept alive for the peer"""
+        with self._keepalive_lock:
+            return list(self._instances_keepalive.values())
 
     def __repr__(self):
         return '<%s[%s]>' % (self.__class__.__name__, self.kernel_server)
@@ -204,11 +345,25 @@ class RequestDispatcher(object):
         self.peer_id = peer_id
         self.kernel_client = kernel_client
         self.exit_code = None
+        #: whether the kernel has been shut down
+        self.terminated = False
+        # instance ids of deleted proxies, released with the next message
+        self._released = []
+        self._released_lock = threading.RLock()
+
+    def _flush_released(self):
+        """Send all pending releases of deleted proxies"""
+        with self._released_lock:
+            if not self._released:
+                return
+            released, self._released = self._released, []
+        self.kernel_client.run_event((__E_REF_DECR__, (released,)), CONTROL)
 
     def _dispatch_request(self, request_type, *args):
         """Forward a request to peer and return the result"""
         try:
-            result_type, result_body = self.kernel_client.run_request((request_type, args))
+            self._flush_released()
+            result_type, result_body = self.kernel_client.run_request((request_type, args), _priority(request_type))
         except (exceptions.IPyCTerminated, IOError, ValueError):
             raise TwinterpeterTerminated(twin_id=self.peer_id)
         if result_type == __E_SUCCESS__:
@@ -220,9 +375,10 @@ class RequestDispatcher(object):
         raise RuntimeError
 
     def _dispatch_event(self, request_type, *args):
-        """Forward a request to peer and return the result"""
+        """Forward a request to peer without waiting for a result"""
         try:
-            self.kernel_client.run_event((request_type, args))
+            self._flush_released()
+            self.kernel_client.run_event((request_type, args), _priority(request_type))
         except (exceptions.IPyCTerminated, IOError, ValueError):
             raise TwinterpeterTerminated(twin_id=self.peer_id)
         return True
@@ -231,6 +387,10 @@ class RequestDispatcher(object):
         """Execute a function call and return the result"""
         return self._dispatch_request(__E_CALL_FUNC__, call, call_args, call_kwargs)
 
+    def dispatch_call_nowait(self, call, *call_args, **call_kwargs):
+        """Execute a function call without waiting for or receiving the result"""
+        self._dispatch_event(__E_CALL_FUNC__, call, call_args, call_kwargs)
+
     def dispatch_method_call(self, instance, method_name, *method_args, **methods_kwargs):
         """Execute a method call and return the result"""
         return self._dispatch_request(__E_CALL_METHOD__, instance, method_name, method_args, methods_kwargs)
@@ -247,17 +407,39 @@ class RequestDispatcher(object):
         """Delete an attribute of an instance"""
         return self._dispatch_request(__E_DEL_ATTRIBUTE__, instance, attribute_name)
 
+    def get_attributes(self, instance, attribute_names):
+        """Get several attributes of an instance as a mapping of ``{name: value}``, skipping missing ones"""
+        return self._dispatch_request(__E_GET_ATTRIBUTES__, instance, attribute_names)
+
+    def set_attributes(self, instance, operations):
+        """Set and delete attributes of an instance in order, from ``(name, value)`` or ``(name,)``"""
+        return self._dispatch_request(__E_SET_ATTRIBUTES__, instance, operations)
+
+    def get_cached_attribute(self, instance, attribute_name):
+        """Get an attribute of an instance and its version, registering for invalidations"""
+        return self._dispatch_request(__E_GET_CACHED_ATTRIBUTE__, instance, attribute_name)
+
     def instantiate_class(self, cls, *cls_args, **cls_kwargs):
         """Instantiate a class, increment its reference count, and return its id"""
         return self._dispatch_request(__E_INSTANTIATE__, cls, cls_args, cls_kwargs)
 
     def increment_instance_ref(self, instance):
         """Increment the reference count to an instance by one"""
-        return self._dispatch_request(__E_REF_INCR__, instance)
+        return self._dispatch_request(__E_REF_INCR__, instance.__instance_id__)
 
     def decrement_instance_ref(self, instance):
-        """Decrement the reference count to an instance by one"""
-        return self._dispatch_request(__E_REF_DECR__, instance)
+        """
+        Decrement the reference count to an instance by one
+
+        The release is sent along with the next message to the peer. This
+        is safe to call from any context, e.g. while a message is received.
+        """
+        with self._released_lock:
+            self._released.append(instance.__instance_id__)
+
+    def renew_leases(self, instance_ids):
+        """Renew the leases of instances without waiting, expiring all others due"""
+        return self._dispatch_event(__E_RENEW_LEASES__, instance_ids)
 
     def shutdown_peer(self, message='shutdown'):
         """Tell peer to shut down"""
@@ -30,6 +30,11 @@ do so via environment variables:
 .. envvar:: __CPY2PY_MASTER_ID__
 
    Identifier of the master interpreter. Do not set this explicitly.
+
+.. envvar:: __CPY2PY_LEASE_TIME__
+
+   Lease time of the master, passed on to twinterpreters. Do not set this
+   explicitly, but set :py:data:`LEASE_TIME` in the master.
 """
 import os
 import sys
@@ -50,6 +55,10 @@ TWIN_ID = os.environ.pop('__CPY2PY_TWIN_ID__', os.path.basename(sys.executable))
 MASTER_ID = os.environ.pop('__CPY2PY_MASTER_ID__', TWIN_ID)
 #: shared state of all twinterpreters
 TWIN_GROUP_STATE = None
+#: called as ``hook(peer_id, directive, exception)`` if a request without reply fails, default is to log it
+ONEWAY_ERROR_HOOK = None
+#: seconds until references of other twinterpreters expire if not renewed, or :py:const:`None` to never expire
+LEASE_TIME = float(os.environ.pop('__CPY2PY_LEASE_TIME__')) if '__CPY2PY_LEASE_TIME__' in os.environ else None
 
 
 def is_twinterpreter(kernel_id):
@@ -11,16 +11,14 @@
 # - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # - # See the License for the specific language governing permissions and
 # - # limitations under the License.
-import time
-
 from cpy2py.proxy import tracker
 from cpy2py.proxy.metaclass import TwinMeta
 from cpy2py.proxy.proxy import InstanceProxy
 
 
-def instance_id(instance):
+def instance_id(instance):  # pylint: disable=unused-argument
     """Create an instance identifier"""
-    return '%X%X' % (id(instance), int(time.time() * 1000))
+    return tracker.new_instance_id()
 
 
 DOCS = """
@@ -41,7 +39,7 @@ def new_twin_object(cls, *args, **kwargs):  # pylint: disable=unused-argument
     self = object.__new__(cls)
     object.__setattr__(self, '__instance_id__', instance_id(self))
     # register our reference for lookup
-    tracker.__active_instances__[self.__twin_id__, self.__instance_id__] = self
+    tracker.register_instance(self)
     return self
 
 # calling TwinMeta to set metaclass explicitly works for py2 and py3
@@ -0,0 +1,117 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Combining concurrent calls to a twinfunction into a single request
+
+Concurrent calls are collected into a batch for a short time window. The
+first call of a batch waits for further calls until either the window has
+passed or the batch is full. The entire batch is then sent as a single
+request, executed by the twin, and the results are handed back to each
+waiting caller.
+"""
+import threading
+
+
+def run_batch(func, calls, batch_call=None):
+    """
+    Execute a batch of calls to `func`
+
+    :param func: function to call
+    :param calls: arguments of each call as ``(args, kwargs)``
+    :type calls: list[tuple[tuple, dict]]
+    :param batch_call: function executing all `calls` at once
+    :returns: the result of each call as ``(success, result or exception)``
+    """
+    if batch_call is not None:
+        results = list(batch_call(calls))
+        if len(results) != len(calls):
+            error = ValueError('batch_call returned %d results for %d calls' % (len(results), len(calls)))
+            return [(False, error)] * len(calls)
+        return [(True, result) for result in results]
+    results = []
+    for args, kwargs in calls:
+        try:
+            results.append((True, func(*args, **kwargs)))
+        except Exception as err:  # pylint: disable=broad-except
+            results.append((False, err))
+    return results
+
+
+class _Batch(object):
+    """Calls collected for a single request"""
+    def __init__(self):
+        self.calls = []
+        self.results = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class CallBatcher(object):
+    """
+    Batching caller to a twinfunction
+
+    :param dispatch_call: the `dispatch_call` method of a kernel
+    :param func: the function to dispatch
+    :param max_size: maximum number of calls in a batch
+    :type max_size: int
+    :param max_delay: maximum time in seconds to wait for more calls
+    :type max_delay: float
+    :param batch_call: function executing all calls of a batch at once
+    :type batch_call: callable or None
+
+    If given, `batch_call` is called in the twin as ``batch_call(calls)``,
+    with `calls` a list of ``(args, kwargs)`` for each call. It must return
+    a sequence with the result of each call; otherwise, every call fails
+    with a :py:exc:`ValueError`.
+    """
+    def __init__(self, dispatch_call, func, max_size, max_delay, batch_call=None):
+        self.dispatch_call = dispatch_call
+        self.func = func
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.batch_call = batch_call
+        self._pending = None
+        self._pending_lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._pending_lock:
+            batch, leader = self._pending, False
+            if batch is None:
+                batch, leader = _Batch(), True
+                self._pending = batch
+            index = len(batch.calls)
+            batch.calls.append((args, kwargs))
+            if len(batch.calls) >= self.max_size:
+                self._pending = None
+                batch.full.set()
+        if leader:
+            batch.full.wait(self.max_delay)
+            with self._pending_lock:
+                if self._pending is batch:
+                    self._pending = None
+            self._run_batch(batch)
+        else:
+            batch.done.wait()
+        success, result = batch.results[index]
+        if success:
+            return result
+        raise result
+
+    def _run_batch(self, batch):
+        try:
+            batch.results = self.dispatch_call(run_batch, self.func, batch.calls, self.batch_call)
+        except Exception as err:  # pylint: disable=broad-except
+            batch.results = [(False, err)] * len(batch.calls)
+        finally:
+            batch.done.set()
@@ -0,0 +1,151 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Memoizing the results of twinfunctions in the calling interpreter
+
+A :py:class:`~.ResultCache` maps the arguments of a call to its result.
+Arguments are identified by their pickled representation, using the same
+pickler as for sending them to a twinterpreter. A call with arguments
+that pickle identically to a previous call is served locally, without
+sending a request.
+
+:note: Results are shared by all callers. Modifying a mutable result also
+       modifies the value returned by subsequent cached calls.
+"""
+import threading
+import time
+
+from cpy2py.utility.compat import pickle, BytesFile
+from cpy2py.proxy import tracker
+
+
+def call_key(args, kwargs):
+    """
+    Key identifying the arguments of a call
+
+    :returns: the pickled arguments or :py:const:`None` if they cannot be pickled
+    """
+    buffer = BytesFile()
+    try:
+        tracker.twin_pickler(buffer, 2).dump((args, sorted(kwargs.items())))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    return buffer.getvalue()
+
+
+class _Entry(object):
+    """Cached result in a doubly linked list, most recently used last"""
+    __slots__ = ('key', 'value', 'expires', 'prev', 'next')
+
+    def __init__(self, key, value, expires):
+        self.key, self.value, self.expires = key, value, expires
+        self.prev = self.next = self
+
+
+class ResultCache(object):
+    """
+    Least recently used cache for the results of calls
+
+    :param maxsize: maximum number of results to store, or :py:const:`None` for no limit
+    :type maxsize: int or None
+    :param ttl: time in seconds after which results expire, or :py:const:`None` for no expiry
+    :type ttl: float or None
+
+    The cache is thread-safe. Calls whose arguments cannot be pickled are
+    never cached. Exceptions raised by a call are not cached either.
+    """
+    def __init__(self, maxsize=128, ttl=None):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("'maxsize' must be None or positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._root = _Entry(None, None, None)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __call__(self, func, *args, **kwargs):
+        """Return the result of ``func(*args, **kwargs)``, calling it only if not cached"""
+        key = call_key(args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires is None or entry.expires > time.time():
+                    self._unlink(entry)
+                    self._link(entry)
+                    self.hits += 1
+                    return entry.value
+                self._remove(entry)
+            self.misses += 1
+        value = func(*args, **kwargs)
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        expires = None if self.ttl is None else time.time() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(self._entries[key])
+            entry = _Entry(key, value, expires)
+            self._entries[key] = entry
+            self._link(entry)
+            if self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._remove(self._root.next)
+
+    def invalidate(self, *args, **kwargs):
+        """
+        Remove the result of a call with specific arguments
+
+        :returns: whether a result was cached
+        """
+        key = call_key(args, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self._remove(entry)
+            return True
+
+    def clear(self):
+        """Remove all results"""
+        with self._lock:
+            self._entries.clear()
+            self._root.prev = self._root.next = self._root
+
+    def _link(self, entry):
+        """Add an entry as the most recently used"""
+        root = self._root
+        entry.prev, entry.next = root.prev, root
+        root.prev.next = entry
+        root.prev = entry
+
+    @staticmethod
+    def _unlink(entry):
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+
+    def _remove(self, entry):
+        self._unlink(entry)
+        del self._entries[entry.key]
+
+    def __repr__(self):
+        return '<%s, %d/%s results, %d hits, %d misses>' % (
+            self.__class__.__name__, len(self), self.maxsize, self.hits, self.misses
+        )
@@ -0,0 +1,136 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Coherent caching of mutable attributes on proxies
+
+Proxies of classes with ``__twin_cached__`` keep attribute values they have
+fetched. The native side records which twinterpreters hold cached values of
+an instance. Whenever the instance is modified, the native side pushes an
+invalidation to each of them and forgets about them until they fetch again.
+
+Each instance has a version which is incremented by every modification.
+Fetched values are tagged with the version they were read at; invalidations
+carry the new version. A proxy never stores a value older than the latest
+invalidation it has received, even if the reply for the value is received
+only after the invalidation.
+
+Modifications are detected when
+
+* assigning or deleting any attribute of the native instance,
+* calling any method of the instance via a proxy,
+* explicitly calling :py:func:`~.invalidate`.
+
+:note: In-place modifications of attribute values by the native
+       twinterpreter, e.g. ``self.items.append(item)`` in a method called
+       natively, cannot be detected. Call :py:func:`~.invalidate` after them.
+"""
+import threading
+
+from cpy2py.kernel import state
+from cpy2py.kernel.exceptions import TwinterpeterUnavailable
+from cpy2py.proxy import tracker
+
+#: instance_id => twinterpreters holding cached values of a native instance
+_HOLDERS = {}
+#: instance_id => version of a native instance
+_VERSIONS = {}
+_lock = threading.Lock()
+
+
+# native side
+def register(instance, peer_id):
+    """Register that `peer_id` caches values of `instance`, returning the current version"""
+    with _lock:
+        _HOLDERS.setdefault(instance.__instance_id__, set()).add(peer_id)
+        return _VERSIONS.setdefault(instance.__instance_id__, 0)
+
+
+def invalidate(instance):
+    """Invalidate all cached values of a native `instance`"""
+    instance_id = getattr(instance, '__instance_id__', None)
+    with _lock:
+        if instance_id not in _VERSIONS:
+            return
+        version = _VERSIONS[instance_id] = _VERSIONS[instance_id] + 1
+        holders = _HOLDERS.pop(instance_id, ())
+    for peer_id in holders:
+        try:
+            state.get_kernel(peer_id).dispatch_call_nowait(drop_cached, instance.__twin_id__, instance_id, version)
+        except TwinterpeterUnavailable:
+            pass
+
+
+def forget(instance):
+    """Remove all information on a native `instance`"""
+    with _lock:
+        _HOLDERS.pop(instance.__instance_id__, None)
+        _VERSIONS.pop(instance.__instance_id__, None)
+
+
+def coherent_setters(real_class):
+    """Wrap ``__setattr__`` and ``__delattr__`` of `real_class` to invalidate caches"""
+    for name in ('__setattr__', '__delattr__'):
+        setter = real_class.__dict__.get(name)
+        if setter is None and getattr(getattr(real_class, name), '__twin_coherent__', False):
+            continue  # inherited from a coherent class
+        type.__setattr__(real_class, name, _coherent_setter(real_class, name, setter))
+
+
+def _coherent_setter(real_class, name, setter):
+    def coherent_setter(self, *args):
+        if setter is None:
+            getattr(super(real_class, self), name)(*args)
+        else:
+            setter(self, *args)
+        invalidate(self)
+    coherent_setter.__name__ = name
+    coherent_setter.__twin_coherent__ = True
+    return coherent_setter
+
+
+# proxy side
+def fetch_cached(proxy, name):
+    """Fetch an attribute and store it on the `proxy`"""
+    value, version = proxy.__kernel__.get_cached_attribute(proxy, name)
+    with _lock:
+        floor, names = proxy.__dict__.setdefault('__twin_cache__', [0, set()])
+        if version >= floor:
+            # regular attribute lookup finds the value before trying __getattr__
+            proxy.__dict__[name] = value
+            names.add(name)
+    return value
+
+
+def clear_cached(proxy, version=None):
+    """Clear all values cached by the `proxy`, optionally rejecting values older than `version`"""
+    if version is None and '__twin_cache__' not in proxy.__dict__:
+        return
+    with _lock:
+        cache = proxy.__dict__.get('__twin_cache__')
+        if cache is None:
+            if version is None:
+                return
+            cache = proxy.__dict__['__twin_cache__'] = [0, set()]
+        if version is not None and version > cache[0]:
+            cache[0] = version
+        for name in cache[1]:
+            proxy.__dict__.pop(name, None)
+        cache[1].clear()
+
+
+def drop_cached(twin_id, instance_id, version):
+    """Clear all values of an instance cached by its proxy"""
+    proxy = tracker.get_instance(twin_id, instance_id)
+    if proxy is not None and proxy.__is_twin_proxy__:
+        clear_cached(proxy, version)
@@ -11,20 +11,80 @@
 # - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # - # See the License for the specific language governing permissions and
 # - # limitations under the License.
+import functools
+
 from cpy2py.utility.proxy import clone_function_meta
 from cpy2py.kernel import state
+from cpy2py.proxy.batching import CallBatcher
+from cpy2py.proxy.caching import ResultCache
+from cpy2py.proxy.remote import call_by_reference
+
+
+class _UnresolvedKernel(object):
+    """Placeholder for the kernel of a twinfunction that has not been called yet"""
+    terminated = True
 
 
-def twinfunction(twinterpreter_id):
+_UNRESOLVED_KERNEL = _UnresolvedKernel()
+
+
+def twinfunction(
+        twinterpreter_id, batch=None, batch_delay=0.001, batch_call=None, oneway=False, cache=None, cache_ttl=None,
+        return_proxy=False
+):
     """
     Decorator to make a function native to a twinterpreter
 
     :param twinterpreter_id: identifier for the twin which executes the function
     :type twinterpreter_id: str
+    :param batch: maximum number of concurrent calls to send as one request
+    :type batch: int, bool or None
+    :param batch_delay: maximum time in seconds to wait for concurrent calls
+    :type batch_delay: float
+    :param batch_call: function executing a batch of calls in the twin
+    :type batch_call: callable or None
+    :param oneway: whether to send calls without waiting for their result
+    :type oneway: bool
+    :param cache: maximum number of results to memoize
+    :type cache: int, bool or None
+    :param cache_ttl: time in seconds after which memoized results expire
+    :type cache_ttl: float or None
+    :param return_proxy: whether to keep results in the twin and return a proxy
+    :type return_proxy: bool
 
     :note: The resulting proxy object does only pass on function calls. Other
            operations, e.g. attribute assignment, only modify the proxy.
+
+    If `batch` is set, calls from concurrent threads are collected for up
+    to `batch_delay` seconds and executed by the twin in one request. This
+    increases throughput for many small calls, but adds up to `batch_delay`
+    of latency to each call. By default, the twin executes the calls of
+    a batch one by one; if `batch_call` is set, it is instead called as
+    ``batch_call(calls)`` with a list of ``(args, kwargs)`` and must return
+    the result of each call. See :py:class:`~cpy2py.proxy.batching.CallBatcher`.
+
+    If `oneway` is set, calls are sent to the twin without waiting for them
+    to finish and always return :py:const:`None`. Exceptions in the twin are
+    passed to :py:data:`~cpy2py.kernel.state.ONEWAY_ERROR_HOOK` of the twin.
+    This is useful for sinks such as logging, whose result is not needed.
+
+    If `cache` is set, results are memoized in the calling interpreter. Calls
+    whose arguments pickle identically to a previous call return the previous
+    result without contacting the twin. This is only correct for functions
+    whose result depends solely on their arguments. The
+    :py:class:`~cpy2py.proxy.caching.ResultCache` is available as the
+    ``cache`` attribute of the proxy, e.g. to ``invalidate`` the result of
+    specific arguments or to ``clear`` it entirely.
+
+    If `return_proxy` is set, results are kept in the twin and a
+    :py:class:`~cpy2py.proxy.remote.RemoteObjectProxy` is returned instead.
+    This avoids transmitting large results of which only parts are needed.
     """
+    if oneway and (batch or cache or return_proxy):
+        raise ValueError("twinfunction cannot use 'oneway' with 'batch', 'cache' or 'return_proxy'")
+    if batch and return_proxy:
+        raise ValueError("twinfunction cannot use both 'batch' and 'return_proxy'")
+
     def decorator(func):
         func.__twin_id__ = twinterpreter_id
         # native twin, never redirect
@@ -36,17 +96,46 @@ def twinfunction(twinterpreter_id):
         # -- the funtion is proxied by the function_dispatch_proxy
         # -- on the first call, function_runner_factory fetches the kernel
         # -- on subsequent calls, function_runner is used directly
+        # -- if the kernel is terminated, e.g. by restarting the twin, it is fetched again
 
         def function_runner_factory(*fargs, **fkwargs):
-            def function_runner(*args, **kwargs):
-                return function_runner.dispatch_call(function_dispatch_proxy, *args, **kwargs)
-            function_runner.dispatch_call = state.get_kernel(twinterpreter_id).dispatch_call
+            kernel = state.get_kernel(twinterpreter_id)
+            function_runner = dispatch_runner_factory(kernel)
+            if result_cache is not None:
+                function_runner = functools.partial(result_cache, function_runner)
+            function_dispatch_proxy.kernel = kernel
             function_dispatch_proxy.function_runner = function_runner
             return function_runner(*fargs, **fkwargs)
 
+        def dispatch_runner_factory(kernel):
+            if oneway:
+                def function_runner(*args, **kwargs):
+                    function_runner.dispatch_call(function_dispatch_proxy, *args, **kwargs)
+                function_runner.dispatch_call = kernel.dispatch_call_nowait
+            elif return_proxy:
+                def function_runner(*args, **kwargs):
+                    return call_by_reference(twinterpreter_id, function_dispatch_proxy, *args, **kwargs)
+            elif batch:
+                function_runner = CallBatcher(
+                    kernel.dispatch_call, function_dispatch_proxy,
+                    max_size=64 if batch is True else batch, max_delay=batch_delay, batch_call=batch_call,
+                )
+            else:
+                def function_runner(*args, **kwargs):
+                    return function_runner.dispatch_call(function_dispatch_proxy, *args, **kwargs)
+                function_runner.dispatch_call = kernel.dispatch_call
+            return function_runner
+
         def function_dispatch_proxy(*args, **kwargs):
+            if function_dispatch_proxy.kernel.terminated:
+                return function_runner_factory(*args, **kwargs)
             return function_dispatch_proxy.function_runner(*args, **kwargs)
+        function_dispatch_proxy.kernel = _UNRESOLVED_KERNEL
         function_dispatch_proxy.function_runner = function_runner_factory
+        result_cache = None
+        if cache:
+            result_cache = ResultCache(maxsize=128 if cache is True else cache, ttl=cache_ttl)
+        function_dispatch_proxy.cache = result_cache
 
         clone_function_meta(func, function_dispatch_proxy)
         return function_dispatch_proxy
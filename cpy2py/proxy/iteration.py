@@ -0,0 +1,102 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Iterating over objects in a twinterpreter in chunks
+
+Iterating over an object in another twinterpreter item by item requires a
+round trip per item. Instead, :py:func:`~.iter_chunks` keeps the iterator
+in the native twinterpreter and fetches several items per request.
+
+Chunks are adaptive: the first request only fetches a few items, in case
+iteration is stopped early. Every further request doubles the number of
+items, up to :py:data:`~.MAX_CHUNK_SIZE`.
+
+Proxies of :py:class:`~cpy2py.TwinObject` classes defining ``__iter__`` or
+``__getitem__`` use :py:func:`~.proxy_iter` for iteration, and fetch
+slices in a single request via :py:func:`~.proxy_getitem`. Slices are
+fetched in one request even if the class only supports integer indices.
+"""
+import itertools
+
+from cpy2py.kernel import state
+from cpy2py.proxy import writebehind
+from cpy2py.proxy.remote import pin
+
+#: number of items fetched by the first request
+MIN_CHUNK_SIZE = 16
+#: maximum number of items fetched per request
+MAX_CHUNK_SIZE = 4096
+
+
+# native side
+def next_chunk(iterator, size):
+    """Fetch the next `size` items of a native `iterator`"""
+    return list(itertools.islice(iterator, size))
+
+
+def first_chunk(iterable, size):
+    """Create an iterator and fetch its first `size` items, pinning the iterator if not exhausted"""
+    iterator = iter(iterable)
+    chunk = next_chunk(iterator, size)
+    if len(chunk) < size:
+        return None, chunk
+    return pin(iterator), chunk
+
+
+def get_slice(instance, key):
+    """Get a slice of a native `instance`, even if it only supports integer indices"""
+    try:
+        return instance[key]
+    except TypeError:
+        return [instance[index] for index in range(*key.indices(len(instance)))]
+
+
+# proxy side
+def iter_chunks(proxy, min_size=MIN_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+    """
+    Iterate over an object in a twinterpreter in chunks
+
+    :param proxy: proxy to an iterable object in another twinterpreter
+    :param min_size: number of items fetched by the first request
+    :type min_size: int
+    :param max_size: maximum number of items fetched per request
+    :type max_size: int
+    """
+    kernel = state.get_kernel(proxy.__twin_id__)
+    chunk_size = min_size
+    # the iterator arrives as a proxy, if any
+    iterator, chunk = kernel.dispatch_call(first_chunk, proxy, chunk_size)
+    while True:
+        for item in chunk:
+            yield item
+        if len(chunk) < chunk_size:
+            break
+        chunk_size = min(chunk_size * 2, max_size)
+        chunk = kernel.dispatch_call(next_chunk, iterator, chunk_size)
+
+
+def proxy_iter(self):
+    """`__iter__` for proxies, iterating in chunks"""
+    writebehind.flush(self)
+    return iter_chunks(self)
+
+
+def proxy_getitem(getitem):
+    """Create a `__getitem__` for proxies from `getitem`, fetching slices in one request"""
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            writebehind.flush(self)
+            return self.__kernel__.dispatch_call(get_slice, self, key)
+        return getitem.__get__(self, type(self))(key)
+    return __getitem__
@@ -15,7 +15,28 @@ from __future__ import print_function
 import types
 from cpy2py.kernel import state
 
-from cpy2py.proxy.proxy import InstanceProxy, UnboundedMethodProxy
+from cpy2py.proxy import coherence, iteration, snapshot
+
+from cpy2py.proxy.proxy import InstanceProxy, UnboundedMethodProxy, proxy_kernel
+
+
+def _normalize_caching(class_dict, bases):
+    """Normalize ``__twin_frozen__``, ``__twin_prefetch__`` and ``__twin_cached__`` of a class definition"""
+    for attribute in ('__twin_frozen__', '__twin_cached__'):
+        if attribute in class_dict and class_dict[attribute] is not True:
+            class_dict[attribute] = frozenset(class_dict[attribute] or ())
+    if '__twin_prefetch__' not in class_dict:
+        return
+    if class_dict['__twin_prefetch__'] is True:
+        try:
+            frozen = class_dict['__twin_frozen__']
+        except KeyError:
+            frozen = getattr(bases[0], '__twin_frozen__', frozenset()) if bases else frozenset()
+        if frozen is True:
+            raise TypeError("'__twin_prefetch__ = True' requires '__twin_frozen__' to name attributes")
+        class_dict['__twin_prefetch__'] = frozen
+    else:
+        class_dict['__twin_prefetch__'] = frozenset(class_dict['__twin_prefetch__'] or ())
 
 
 class TwinMeta(type):
@@ -31,6 +52,23 @@ class TwinMeta(type):
     This specifies which interpeter the class natively resides in. The default
     is always the main interpeter.
 
+    Setting ``__twin_frozen__`` declares attributes of instances as immutable.
+    It may be :py:const:`True` for all attributes, or a set of attribute
+    names. Proxies fetch each immutable attribute only once, and serve any
+    further reads locally. Setting ``__twin_prefetch__`` to a set of
+    immutable attribute names, or :py:const:`True` for all names in
+    ``__twin_frozen__``, fetches all of them in a single request on first
+    access to any of them.
+
+    Setting ``__twin_cached__`` declares attributes of instances as
+    cacheable. Like ``__twin_frozen__``, it may be :py:const:`True` or a set
+    of attribute names. Proxies keep values they have fetched until the
+    native instance is modified. See :py:mod:`~cpy2py.proxy.coherence`.
+
+    Setting ``__twin_by_value__`` to :py:const:`True` sends native instances
+    to other twinterpreters as copies instead of references. This is useful
+    for small, record-like classes. See :py:mod:`~cpy2py.proxy.snapshot`.
+
     :warning: When running code in both python 2.X and 3.X, the syntax for
               assigning metaclasses is not consistent. To circumvent this, classes
               may inherit from :py:class:`~cpy2py.proxy.proxy_object.TwinObject`,
@@ -51,6 +89,10 @@ class TwinMeta(type):
         '__metaclass__',  # internal
         '__import_mod_name__',  # non-pickle loading
         '__is_twin_proxy__',  # shortcut whether object is native or not
+        '__twin_frozen__',  # attributes cached by proxies
+        '__twin_prefetch__',  # attributes fetched together by proxies
+        '__twin_cached__',  # attributes cached coherently by proxies
+        '__twin_by_value__',  # instances are sent as snapshots
     ))
     #: name of attribute signaling to not wrap class members
     mark_localmember = "__local_member__"
@@ -69,6 +111,7 @@ class TwinMeta(type):
             else:
                 twin_id = state.MASTER_ID
             class_dict['__twin_id__'] = twin_id
+        _normalize_caching(class_dict, bases)
         # enable persistent dump/load without pickle
         class_dict['__import_mod_name__'] = (class_dict['__module__'], name)
         # consistently supply bases as real base classes
@@ -77,6 +120,11 @@ class TwinMeta(type):
         real_class = mcs.__new_real_class__(name, bases, class_dict)
         proxy_class = mcs.__get_proxy_class__(real_class=real_class)
         mcs.register_proxy(real_class=real_class, proxy_class=proxy_class)
+        # only the real class must detect modifications
+        if getattr(real_class, '__twin_cached__', False):
+            coherence.coherent_setters(real_class)
+        if class_dict.get('__twin_by_value__'):
+            type.__setattr__(real_class, '__reduce_ex__', snapshot.reduce_by_value)
         # return the appropriate object or proxy for the current twin
         if state.is_twinterpreter(class_dict['__twin_id__']):
             return real_class
@@ -99,7 +147,7 @@ class TwinMeta(type):
         for aname in class_dict:
             if getattr(proxy_dict[aname], mcs.mark_localmember, False):
                 continue
-            elif aname in ('__init__', '__new__'):
+            elif aname in ('__init__', '__new__', '__del__'):
                 del proxy_dict[aname]
             # methods must be proxy'd
             elif isinstance(proxy_dict[aname], types.FunctionType):
@@ -113,8 +161,23 @@ class TwinMeta(type):
             # remove non-magic attributes so they don't shadow the real ones
             elif aname not in mcs.__proxy_inherits_attributes__:
                 del proxy_dict[aname]
+        # iteration and slicing use bulk requests
+        if isinstance(proxy_dict.get('__getitem__'), UnboundedMethodProxy):
+            proxy_dict['__getitem__'] = iteration.proxy_getitem(proxy_dict['__getitem__'])
+            proxy_dict.setdefault('__iter__', iteration.proxy_iter)
+        if isinstance(proxy_dict.get('__iter__'), UnboundedMethodProxy):
+            proxy_dict['__iter__'] = iteration.proxy_iter
         # convert bases to proxies as well
         bases = tuple(mcs.__get_proxy_class__(base) for base in bases)
+        # proxies only store their identity, unless they must cache attributes
+        caching = any(
+            proxy_dict.get(attr) or any(getattr(base, attr, None) for base in bases)
+            for attr in ('__twin_frozen__', '__twin_cached__')
+        )
+        if caching and not any(base.__dictoffset__ for base in bases):
+            proxy_dict['__slots__'] = ('__dict__',)
+        else:
+            proxy_dict['__slots__'] = ()
         return type.__new__(mcs, name, bases, proxy_dict)
 
     @classmethod
@@ -155,24 +218,21 @@ class TwinMeta(type):
     # class attributes
     def __getattr__(cls, name):
         if cls.__is_twin_proxy__ and name not in TwinMeta.__proxy_inherits_attributes__:
-            kernel = state.get_kernel(cls.__twin_id__)
-            return kernel.get_attribute(cls, name)
+            return proxy_kernel(cls).get_attribute(cls, name)
         else:
-            type.__getattribute__(cls, name)
+            return type.__getattribute__(cls, name)
 
     def __setattr__(cls, name, value):
         if cls.__is_twin_proxy__ and name not in TwinMeta.__proxy_inherits_attributes__:
-            kernel = state.get_kernel(cls.__twin_id__)
-            return kernel.set_attribute(cls, name, value)
+            return proxy_kernel(cls).set_attribute(cls, name, value)
         else:
             type.__setattr__(cls, name, value)
 
     def __delattr__(cls, name):
         if cls.__is_twin_proxy__ and name not in TwinMeta.__proxy_inherits_attributes__:
-            kernel = state.get_kernel(cls.__twin_id__)
-            return kernel.del_attribute(cls, name)
+            return proxy_kernel(cls).del_attribute(cls, name)
         else:
-            type.__setattr__(cls, name)
+            type.__delattr__(cls, name)
 
 
 TwinMeta.register_proxy(object, InstanceProxy)
@@ -17,7 +17,7 @@ Proxies for entities in other twinterpreters
 from cpy2py.kernel.exceptions import TwinterpeterUnavailable
 from cpy2py.kernel import state
 
-from cpy2py.proxy import tracker
+from cpy2py.proxy import tracker, coherence, writebehind
 
 
 class UnboundedMethodProxy(object):
@@ -39,17 +39,79 @@ class UnboundedMethodProxy(object):
 
     def __get__(self, instance, owner):
         if instance is None:
-            subject = owner
-            kernel = state.get_kernel(subject.__twin_id__)
-        else:
-            subject = instance
-            kernel = subject.__kernel__
-        return lambda *args, **kwargs: kernel.dispatch_method_call(
-            subject,
-            self.__name__,
-            *args,
-            **kwargs
+            return BoundMethodProxy(owner, self.__name__, proxy_kernel(owner))
+        writebehind.flush(instance)
+        if instance.__twin_cached__:
+            return CoherentBoundMethodProxy(instance, self.__name__, instance.__kernel__)
+        return BoundMethodProxy(instance, self.__name__, instance.__kernel__)
+
+
+class BoundMethodProxy(object):
+    """
+    Proxy for methods bound to a class or instance
+
+    :param subject: the class or instance the method is bound to
+    :param name: name of the method
+    :type name: str
+    :param kernel: the kernel to dispatch calls to
+
+    :note: Bound methods are not cached by instances. Doing so would create
+           a reference cycle, delaying the release of the native instance
+           until the next garbage collection.
+    """
+    __slots__ = ('subject', 'name', 'kernel')
+
+    def __init__(self, subject, name, kernel):
+        self.subject = subject
+        self.name = name
+        self.kernel = kernel
+
+    def __call__(self, *args, **kwargs):
+        return self.kernel.dispatch_method_call(self.subject, self.name, *args, **kwargs)
+
+    def __repr__(self):
+        return '<bound method proxy %s of %r>' % (self.name, self.subject)
+
+
+class CoherentBoundMethodProxy(BoundMethodProxy):
+    """Proxy for methods that may modify cached attributes of an instance"""
+    __slots__ = ()
+
+    def __call__(self, *args, **kwargs):
+        try:
+            return self.kernel.dispatch_method_call(self.subject, self.name, *args, **kwargs)
+        finally:
+            coherence.clear_cached(self.subject)
+
+
+def proxy_kernel(proxy_class):
+    """Get the kernel of a proxy class, cached until the kernel terminates"""
+    kernel = proxy_class.__dict__.get('__proxy_kernel__')
+    if kernel is None or kernel.terminated:
+        kernel = state.get_kernel(proxy_class.__twin_id__)
+        # bypass TwinMeta.__setattr__, which forwards to the twin
+        type.__setattr__(proxy_class, '__proxy_kernel__', kernel)
+    return kernel
+
+
+def _fetch_frozen(proxy, name):
+    """Fetch an immutable attribute and store it on the `proxy`"""
+    kernel = proxy.__kernel__
+    if name in proxy.__twin_prefetch__:
+        attributes = kernel.get_attributes(
+            proxy, [attr_name for attr_name in proxy.__twin_prefetch__ if attr_name not in proxy.__dict__]
         )
+        proxy.__dict__.update(attributes)
+        if name in attributes:
+            return attributes[name]
+    value = kernel.get_attribute(proxy, name)
+    # regular attribute lookup finds the value before trying __getattr__
+    proxy.__dict__[name] = value
+    return value
+
+
+#: attributes always looked up on the proxy, never on the native instance
+_LOCAL_ATTRIBUTES = frozenset(('__kernel__', '__instance_id__', '__twin_pending__', '__weakref__', '__dict__'))
 
 
 class InstanceProxy(object):
@@ -61,15 +123,21 @@ class InstanceProxy(object):
     :warning: This class should never be instantiated or subclassed manually. It
               will be subclassed automatically by :py:class:`~.TwinMeta`.
     """
+    __slots__ = ('__kernel__', '__instance_id__', '__twin_pending__', '__weakref__')
     __twin_id__ = None  # to be set by metaclass
-    __instance_id__ = None  # to be set on __new__
-    __kernel__ = None  # to be set by metaclass
     __import_mod_name__ = (None, None)  # to be set by metaclass
     __is_twin_proxy__ = True  # recreated by metaclass
+    __twin_frozen__ = frozenset()  # inherited from real class
+    __twin_prefetch__ = frozenset()  # inherited from real class
+    __twin_cached__ = frozenset()  # inherited from real class
+    __twin_by_value__ = False  # inherited from real class
 
     def __new__(cls, *args, **kwargs):
         self = object.__new__(cls)
-        __kernel__ = state.get_kernel(self.__twin_id__)
+        # initialize all slots, a missing one would be looked up via __getattr__
+        object.__setattr__(self, '__instance_id__', None)
+        object.__setattr__(self, '__twin_pending__', None)
+        __kernel__ = proxy_kernel(cls)
         object.__setattr__(self, '__kernel__', __kernel__)
         try:
             # native instance exists, but no proxy yet
@@ -82,29 +150,59 @@ class InstanceProxy(object):
             )
             object.__setattr__(self, '__instance_id__', __instance_id__)
         else:
+            # the sender of the instance retained a reference for us
             object.__setattr__(self, '__instance_id__', __instance_id__)
-            __kernel__.increment_instance_ref(self)
         # store for later use without requiring explicit lookup/converter calls
-        tracker.__active_instances__[self.__twin_id__, self.__instance_id__] = self
+        tracker.register_instance(self)
         return self
 
     def __repr__(self):
         return '<%s.%s twin proxy object at %x>' % (self.__import_mod_name__[0], self.__import_mod_name__[1], id(self))
 
     def __getattr__(self, name):
+        if name in _LOCAL_ATTRIBUTES:
+            raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, name))
+        writebehind.flush(self)
+        if self.__twin_frozen__ is True or name in self.__twin_frozen__:
+            return _fetch_frozen(self, name)
+        if self.__twin_cached__ is True or name in self.__twin_cached__:
+            return coherence.fetch_cached(self, name)
         return self.__kernel__.get_attribute(self, name)
 
     def __setattr__(self, name, value):
+        if self.__twin_frozen__ is True or name in self.__twin_frozen__:
+            self.__dict__.pop(name, None)
+        if writebehind.queue_setattr(self, name, value):
+            if self.__twin_cached__:
+                coherence.clear_cached(self)
+            return
+        if self.__twin_cached__:
+            try:
+                return self.__kernel__.set_attribute(self, name, value)
+            finally:
+                coherence.clear_cached(self)
         return self.__kernel__.set_attribute(self, name, value)
 
     def __delattr__(self, name):
+        if self.__twin_frozen__ is True or name in self.__twin_frozen__:
+            self.__dict__.pop(name, None)
+        if writebehind.queue_delattr(self, name):
+            if self.__twin_cached__:
+                coherence.clear_cached(self)
+            return
+        if self.__twin_cached__:
+            try:
+                return self.__kernel__.del_attribute(self, name)
+            finally:
+                coherence.clear_cached(self)
         return self.__kernel__.del_attribute(self, name)
 
     def __del__(self):
-        if hasattr(self, '__instance_id__') and hasattr(self, '__twin_id__'):
+        if self.__instance_id__ is not None:
             # decrement the twin reference count
             try:
                 self.__kernel__.decrement_instance_ref(self)
-            except (TwinterpeterUnavailable, AttributeError):
+            except (TwinterpeterUnavailable, AttributeError, TypeError):
                 # twin already dead, doesn't care for us anymore
+                # or interpreter shutting down, modules are already gone
                 return
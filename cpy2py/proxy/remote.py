@@ -0,0 +1,164 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+References to arbitrary objects in a twinterpreter
+
+Any object can be kept in its twinterpreter and accessed via a
+:py:class:`~.RemoteObjectProxy`. The object is *pinned* in its native
+twinterpreter as long as any proxy to it exists. Item access, slicing,
+:py:func:`len` and iteration are forwarded to the native object; only
+their results are transmitted.
+
+.. code:: python
+
+    @twinfunction('pypy', return_proxy=True)
+    def compute():
+        return [complex_result(idx) for idx in range(10000000)]
+
+    result = compute()  # RemoteObjectProxy
+    head = result[:10]  # only transmits 10 items
+
+Passing a proxy back to its native twinterpreter passes the object itself,
+not a proxy. Like :py:class:`~cpy2py.TwinObject` instances, pinned objects
+are kept alive by a :py:class:`~cpy2py.kernel.lease.Lease` for every peer
+holding a proxy. The native twinterpreter takes the reference when it sends
+the object, and a proxy releases it along with the next message when it is
+deleted. Sending a proxy takes no reference and needs no extra message.
+"""
+import operator
+import weakref
+
+from cpy2py.kernel import state
+from cpy2py.proxy import tracker
+
+#: instance_id => pinned native object, alive while held by a lease
+_PINNED = weakref.WeakValueDictionary()
+
+
+# native side
+class PinnedObject(object):
+    """
+    Native object kept alive for proxies in other twinterpreters
+
+    :param value: the native object
+
+    Sending a :py:class:`~.PinnedObject` sends a proxy to its `value`,
+    which is kept alive until all proxies in the receiver are deleted.
+    """
+    __slots__ = ('value', '__instance_id__', '__weakref__')
+    __import_mod_name__ = (__name__, 'remote_object')
+    __is_twin_proxy__ = False
+
+    def __init__(self, value):
+        self.value = value
+        self.__instance_id__ = tracker.new_instance_id()
+        _PINNED[self.__instance_id__] = self
+
+    @property
+    def __twin_id__(self):
+        return state.TWIN_ID
+
+    def __repr__(self):
+        return '<%s %s of %r>' % (self.__class__.__name__, self.__instance_id__, self.value)
+
+
+def pin(value):
+    """Pin `value` for sending it as a proxy"""
+    return PinnedObject(value)
+
+
+def call_pinned(call, call_args, call_kwargs):
+    """Call ``call(*call_args, **call_kwargs)`` and pin the result"""
+    return PinnedObject(call(*call_args, **call_kwargs))
+
+
+def fetch(value):
+    """Identity for fetching the entire value of a proxy"""
+    return value
+
+
+def remote_object(__twin_id__, __instance_id__):
+    """Unpickle a remote object as the object itself in its native twinterpreter, or a proxy to it"""
+    if state.is_twinterpreter(__twin_id__):
+        try:
+            return _PINNED[__instance_id__].value
+        except KeyError:
+            raise ReferenceError('instance %d of %r has been released' % (__instance_id__, state.TWIN_ID))
+    # the new proxy owns the reference retained by the sender
+    return RemoteObjectProxy(__twin_id__, __instance_id__)
+
+
+# proxy side
+def call_by_reference(twin_id, call, *call_args, **call_kwargs):
+    """
+    Call a function in a twinterpreter and return a proxy to the result
+
+    :param twin_id: identifier of the twinterpreter to call `call` in
+    :type twin_id: str
+    :rtype: :py:class:`~.RemoteObjectProxy`
+    """
+    return state.get_kernel(twin_id).dispatch_call(call_pinned, call, call_args, call_kwargs)
+
+
+class RemoteObjectProxy(object):
+    """
+    Proxy to an arbitrary object pinned in a twinterpreter
+
+    :param twin_id: identifier of the twinterpreter owning the object
+    :type twin_id: str
+    :param instance_id: identifier of the pinned object
+    :type instance_id: int
+
+    :note: Proxies should not be created manually. Use
+           :py:func:`~.call_by_reference` or
+           :py:func:`~cpy2py.twinfunction` with ``return_proxy=True``.
+    """
+    __import_mod_name__ = PinnedObject.__import_mod_name__
+    __is_twin_proxy__ = True
+
+    def __init__(self, twin_id, instance_id):
+        self.__twin_id__ = twin_id
+        self.__instance_id__ = instance_id
+        self.__kernel__ = state.get_kernel(twin_id)
+        tracker.register_instance(self)
+
+    @property
+    def value(self):
+        """Fetch the entire object"""
+        return self.__kernel__.dispatch_call(fetch, self)
+
+    def __len__(self):
+        return self.__kernel__.dispatch_call(len, self)
+
+    def __getitem__(self, item):
+        return self.__kernel__.dispatch_call(operator.getitem, self, item)
+
+    def __contains__(self, item):
+        return self.__kernel__.dispatch_call(operator.contains, self, item)
+
+    def __iter__(self):
+        from cpy2py.proxy.iteration import iter_chunks  # circular import
+        return iter_chunks(self)
+
+    def __repr__(self):
+        return '<%s of %s object %s at %x>' % (
+            self.__class__.__name__, self.__twin_id__, self.__instance_id__, id(self)
+        )
+
+    def __del__(self):
+        try:
+            self.__kernel__.decrement_instance_ref(self)
+        except (AttributeError, TypeError):
+            # interpreter shutting down, modules are already gone
+            return
@@ -0,0 +1,168 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+:py:mod:`numpy` arrays shared between twinterpreters
+
+A :py:class:`~.TwinArray` is a :py:class:`numpy.ndarray` whose data lives in
+a named shared memory segment. When passed between twinterpreters, only the
+segment name and the array layout are transmitted - all twinterpreters map
+the same memory, so modifications are visible everywhere without copying.
+
+.. code:: python
+
+    frame = TwinArray((1080, 1920, 3), dtype='uint8')
+    frame[...] = camera.read()
+    pypy_filter(frame)  # operates on the same memory in the pypy twin
+
+Each segment is owned by a :py:class:`~.SharedSegment`, which is native to
+the master. Like any :py:class:`~cpy2py.TwinObject`, it is kept alive as
+long as any twinterpreter has a reference to it. Every
+:py:class:`~.TwinArray` holds such a reference, so the segment is released
+once no array using it exists anymore.
+
+:note: Only arrays whose data lies inside the segment are shared. Derived
+       arrays with their own memory, e.g. the result of ``frame + 1``, are
+       sent by value as usual.
+
+:note: This module requires :py:mod:`numpy` in every twinterpreter using it.
+"""
+import os
+import mmap
+import atexit
+import tempfile
+
+import numpy
+
+from cpy2py.kernel import state
+from cpy2py.proxy.baseclass import TwinObject
+
+
+#: directory to place segments in, preferring memory-backed storage
+SEGMENT_DIR = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+#: paths of segments still existing
+_LIVE_SEGMENTS = set()
+
+
+def _release_path(path):
+    """Remove the file backing a segment"""
+    _LIVE_SEGMENTS.discard(path)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@atexit.register
+def _release_all():
+    for path in list(_LIVE_SEGMENTS):
+        _release_path(path)
+
+
+class SharedSegment(TwinObject):
+    """
+    Named shared memory segment of a fixed size
+
+    :param size: size of the segment in bytes
+    :type size: int
+    """
+    __twin_id__ = state.MASTER_ID
+
+    def __init__(self, size):
+        file_descriptor, self.path = tempfile.mkstemp(prefix='cpy2py_shm_', dir=SEGMENT_DIR)
+        _LIVE_SEGMENTS.add(self.path)
+        try:
+            os.ftruncate(file_descriptor, size)
+        finally:
+            os.close(file_descriptor)
+        self.size = size
+
+    def __del__(self):
+        _release_path(self.path)
+
+
+def _map_segment(path, size):
+    """Map the memory of a segment"""
+    with open(path, 'r+b') as segment_file:
+        return mmap.mmap(segment_file.fileno(), size)
+
+
+def _view_segment(segment, path, size, dtype, shape, strides, offset, order='C'):
+    """Create a :py:class:`~.TwinArray` on the memory of a segment"""
+    array = numpy.ndarray.__new__(
+        TwinArray, shape, dtype, buffer=_map_segment(path, size), offset=offset, strides=strides, order=order
+    )
+    array.__twin_segment__ = (segment, path, size, array.__array_interface__['data'][0] - offset)
+    return array
+
+
+class TwinArray(numpy.ndarray):
+    """
+    :py:class:`numpy.ndarray` stored in shared memory
+
+    :param shape: shape of the array
+    :param dtype: data type of the array
+    :param order: memory layout of the array, see :py:class:`numpy.ndarray`
+
+    Arrays are created empty, like :py:func:`numpy.empty`. Use
+    :py:meth:`~.TwinArray.from_array` to create a shared copy of any array.
+    """
+    #: ``(segment, path, size, address)`` of the underlying segment
+    __twin_segment__ = None
+
+    def __new__(cls, shape, dtype=float, order='C'):
+        dtype = numpy.dtype(dtype)
+        size = max(int(numpy.prod(shape)) * dtype.itemsize, 1)
+        segment = SharedSegment(size)
+        # the size is known, but the path may require a lookup in the master
+        return _view_segment(segment, segment.path, size, dtype, shape, None, 0, order)
+
+    @classmethod
+    def from_array(cls, array):
+        """Create a shared copy of `array`"""
+        array = numpy.asanyarray(array)
+        shared = cls(array.shape, array.dtype)
+        shared[...] = array
+        return shared
+
+    def __array_finalize__(self, obj):
+        # views inherit the segment, results are validated when pickling
+        self.__twin_segment__ = getattr(obj, '__twin_segment__', None)
+
+    def _segment_offset(self):
+        """The offset of the data in the segment or :py:const:`None` if not in the segment"""
+        segment, _, size, address = self.__twin_segment__
+        offset = self.__array_interface__['data'][0] - address
+        low = high = offset
+        for extent, stride in zip(self.shape, self.strides):
+            if extent == 0:
+                return offset if 0 <= offset <= size else None
+            if stride < 0:
+                low += (extent - 1) * stride
+            else:
+                high += (extent - 1) * stride
+        if low < 0 or high + self.itemsize > size:
+            return None
+        return offset
+
+    def __reduce_ex__(self, protocol):
+        if self.__twin_segment__ is not None:
+            offset = self._segment_offset()
+            if offset is not None:
+                segment, path, size, _ = self.__twin_segment__
+                return _view_segment, (segment, path, size, self.dtype, self.shape, self.strides, offset)
+        # not in shared memory, send by value
+        return numpy.asarray(self).__reduce_ex__(protocol)
+
+    def __reduce__(self):
+        return self.__reduce_ex__(2)
@@ -0,0 +1,71 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Copies of twin objects independent of their native twinterpreter
+
+A snapshot is an instance of the real class of a twin object, holding a
+shallow copy of the object's attributes. It is a regular object in the
+interpreter it is created in: reading attributes and calling methods does
+not involve the native twinterpreter, and modifications do not affect the
+original object.
+
+Instances of classes with ``__twin_by_value__`` are always sent as
+snapshots when passed to another twinterpreter. Snapshots of any twin
+object can be created explicitly with :py:func:`~.snapshot`.
+
+:note: Only the instance ``__dict__`` is copied. Classes relying on
+       ``__slots__`` or external state cannot be snapshot.
+"""
+import sys
+
+from cpy2py.kernel import state
+
+
+def get_state(instance):
+    """Get the data required to recreate a native `instance`"""
+    return instance.__import_mod_name__, dict(instance.__dict__)
+
+
+def load_snapshot(import_mod_name, instance_dict):
+    """Recreate an instance of the real class of `import_mod_name` from its state"""
+    from cpy2py.proxy.metaclass import TwinMeta  # circular import
+    module_name, class_name = import_mod_name
+    __import__(module_name)
+    klass = getattr(sys.modules[module_name], class_name)
+    real_class = TwinMeta.__real_class_store__.get(klass, klass)
+    instance = object.__new__(real_class)
+    instance.__dict__.update(instance_dict)
+    return instance
+
+
+def reduce_by_value(self, protocol=None):  # pylint: disable=unused-argument
+    """`__reduce_ex__` for sending instances by value"""
+    return load_snapshot, get_state(self)
+
+
+def snapshot(instance):
+    """
+    Create a snapshot of a twin object in a single request
+
+    :param instance: a twin object or its proxy
+    :type instance: :py:class:`~cpy2py.TwinObject`
+    :returns: an instance of the real class with a copy of all attributes
+
+    :note: Sending a snapshot of an instance of a class without
+           ``__twin_by_value__`` to another twinterpreter sends a reference
+           to the original object.
+    """
+    if instance.__is_twin_proxy__:
+        return load_snapshot(*state.get_kernel(instance.__twin_id__).dispatch_call(get_state, instance))
+    return load_snapshot(*get_state(instance))
@@ -16,18 +16,54 @@ Registration, tracking and lookup tools matching instances of the same logical
 object in separate twinterpeters with each other.
 """
 import weakref
+import functools
+import itertools
 import sys
 
-from cpy2py.utility.compat import pickle
+from cpy2py.utility.compat import pickle, intern_str
 
-#: instances of twin objects or proxies currently alive in this twinterpeter
-__active_instances__ = weakref.WeakValueDictionary()
+#: twin_id => instance_id => instance of twin objects or proxies currently alive in this twinterpeter
+__active_instances__ = {}
 __active_classes__ = weakref.WeakValueDictionary()
+#: source of identifiers for native instances in this twinterpreter
+_INSTANCE_IDS = itertools.count(1)
+
+
+def new_instance_id():
+    """Create an identifier for a native instance, unique in this twinterpreter"""
+    return next(_INSTANCE_IDS)
+
+
+def register_instance(instance):
+    """Register a twin object or proxy for lookup by its identifiers"""
+    try:
+        instances = __active_instances__[instance.__twin_id__]
+    except KeyError:
+        instances = __active_instances__.setdefault(instance.__twin_id__, weakref.WeakValueDictionary())
+    instances[instance.__instance_id__] = instance
+
+
+def get_instance(twin_id, instance_id, default=None):
+    """Get a registered twin object or proxy, or `default` if it is not alive"""
+    try:
+        return __active_instances__[twin_id][instance_id]
+    except KeyError:
+        return default
+
+
+def forget_twin(twin_id):
+    """Remove all registered instances native to `twin_id`, e.g. after it terminated"""
+    __active_instances__.pop(twin_id, None)
 
 
 # pickling for inter-twinterpeter communication
-def persistent_twin_id(obj):
-    """Twin Pickler for inter-twinterpeter communication"""
+def persistent_twin_id(obj, retain=None):
+    """
+    Twin Pickler for inter-twinterpeter communication
+
+    If given, ``retain(obj)`` is called for every native twin object sent
+    by reference, to keep it alive until the receiver holds a proxy.
+    """
     try:
         # twin object or proxy
         __import_mod_name__ = obj.__import_mod_name__
@@ -37,9 +73,14 @@ def persistent_twin_id(obj):
     except AttributeError:
         # regular object, let pickle do the work
         return None
+    if getattr(obj, '__twin_by_value__', False) and not obj.__is_twin_proxy__:
+        # native object sent as a copy
+        return None
     else:
         # twin object, only send reference
-        return '%s\t%s\t%s\t%s' % (
+        if retain is not None and not obj.__is_twin_proxy__:
+            retain(obj)
+        return '%d\t%s\t%s\t%s' % (
             obj.__instance_id__,
             obj.__twin_id__,
             __import_mod_name__[0],
@@ -50,10 +91,12 @@ def persistent_twin_id(obj):
 def persistent_twin_load(persid):
     """Twin Loader for inter-twinterpeter communication"""
     instance_id, twin_id, module_name, class_name = persid.split('\t')
+    instance_id, twin_id = int(instance_id), intern_str(str(twin_id))
     try:
-        return __active_instances__[twin_id, instance_id]
+        instance = __active_instances__[twin_id][instance_id]
     except KeyError:
         # twin object always exists - persid is enough for creating new proxies
+        # the new proxy owns the reference retained by the sender
         try:
             return __active_classes__[module_name, class_name](__twin_id__=twin_id, __instance_id__=instance_id)
         except KeyError:
@@ -63,12 +106,20 @@ def persistent_twin_load(persid):
             klass = getattr(module, class_name)
             __active_classes__[module_name, class_name] = klass
             return klass(__twin_id__=twin_id, __instance_id__=instance_id)
+    if instance.__is_twin_proxy__:
+        # the existing proxy already holds a reference, release the one retained by the sender
+        instance.__kernel__.decrement_instance_ref(instance)
+    return instance
 
 
 def twin_pickler(*args, **kwargs):
-    """Create a Pickler capable of handling twins"""
+    """Create a Pickler capable of handling twins, optionally with a `retain` callback"""
+    retain = kwargs.pop('retain', None)
     pickler = pickle.Pickler(*args, **kwargs)
-    pickler.persistent_id = persistent_twin_id
+    if retain is None:
+        pickler.persistent_id = persistent_twin_id
+    else:
+        pickler.persistent_id = functools.partial(persistent_twin_id, retain=retain)
     return pickler
 
 
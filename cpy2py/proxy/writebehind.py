@@ -0,0 +1,99 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Deferring attribute assignments of proxies
+
+Every assignment to an attribute of a proxy is a round trip to the native
+twinterpreter. In write-behind mode, assignments and deletions are instead
+queued by the proxy and sent as a single request when the queue is flushed.
+
+.. code:: python
+
+    record = Record()
+    with write_behind(record):
+        record.name = 'foo'
+        record.size = 3
+        record.owner = owner
+    # all attributes have been set at this point
+
+The queue is flushed in order when
+
+* reading any attribute or method of the proxy,
+* calling :py:func:`~.flush`,
+* leaving the outermost :py:func:`~.write_behind` context of the proxy.
+
+Any error of a queued operation is raised at the flush point. Operations
+queued before the failing one have been applied; later ones are discarded.
+If the outermost context is left by an exception, all queued operations
+are discarded and the exception is propagated.
+"""
+#: marker for queued deletions
+_DELETE = object()
+
+
+def flush(proxy):
+    """Send all queued assignments of a `proxy`"""
+    pending = proxy.__twin_pending__
+    if not pending:
+        return
+    operations = pending[:]
+    del pending[:len(operations)]
+    proxy.__kernel__.set_attributes(
+        proxy, [(name,) if value is _DELETE else (name, value) for name, value in operations]
+    )
+
+
+def queue_setattr(proxy, name, value):
+    """Queue an assignment if the `proxy` is in write-behind mode, returning whether it was queued"""
+    pending = proxy.__twin_pending__
+    if pending is None:
+        return False
+    pending.append((name, value))
+    return True
+
+
+def queue_delattr(proxy, name):
+    """Queue a deletion if the `proxy` is in write-behind mode, returning whether it was queued"""
+    return queue_setattr(proxy, name, _DELETE)
+
+
+class write_behind(object):  # pylint: disable=invalid-name
+    """
+    Context in which assignments to a proxy are queued
+
+    :param proxy: proxy of a :py:class:`~cpy2py.TwinObject`
+
+    Contexts may be nested; the queue is flushed when leaving the outermost
+    context. Using this context on a native object has no effect.
+    """
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self._owner = False
+
+    def __enter__(self):
+        if getattr(self.proxy, '__is_twin_proxy__', False) and self.proxy.__twin_pending__ is None:
+            object.__setattr__(self.proxy, '__twin_pending__', [])
+            self._owner = True
+        return self.proxy
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._owner:
+            try:
+                # an error in the block must not be masked by errors of the operations
+                if exc_type is None:
+                    flush(self.proxy)
+            finally:
+                object.__setattr__(self.proxy, '__twin_pending__', None)
+                self._owner = False
+        return False
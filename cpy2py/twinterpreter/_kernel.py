@@ -1,7 +1,8 @@
 import threading
 
-from ..kernel.flavours import async, threaded, single
+from ..kernel.flavours import async, threaded, single, queued
 
+from ..ipyc.pool import PooledIPyC
 from . import bootstrap
 
 
@@ -10,6 +11,7 @@ class TwinKernelMaster(object):
         'single': single,
         'async': async,
         'multi': threaded,
+        'queued': queued,
     }
 
     @property
@@ -25,10 +27,23 @@ class TwinKernelMaster(object):
             '--kernel', bootstrap.dump_kernel(kernel_client=self._kernel_client, kernel_server=self._kernel_server),
         )
 
-    def __init__(self, twin_id, kernel, ipyc, protocol):
+    @property
+    def inherit_fds(self):
+        """File descriptors of the IPyCs the twinterpreter must inherit"""
+        return tuple(
+            fileno for ipyc in (self._client_ipyc, self._server_ipyc) for fileno in getattr(ipyc, 'inherit_fds', ())
+        )
+
+    def __init__(self, twin_id, kernel, ipyc, protocol, channels=1, busy_poll=None):
         self.twin_id = twin_id
-        self._client_ipyc = ipyc()
-        self._server_ipyc = ipyc()
+        # only pass on options actually used, so that custom IPyC types need not support them
+        ipyc_kwargs = {} if not busy_poll else {'busy_poll': busy_poll}
+        if channels > 1:
+            self._client_ipyc = PooledIPyC(ipyc, channels, ipyc_kwargs=ipyc_kwargs)
+            self._server_ipyc = PooledIPyC(ipyc, channels, ipyc_kwargs=ipyc_kwargs)
+        else:
+            self._client_ipyc = ipyc(**ipyc_kwargs)
+            self._server_ipyc = ipyc(**ipyc_kwargs)
         self._kernel_client, self._kernel_server = self._resolve_kernel_spec(kernel)
         self._protocol = protocol
         self._server_thread = None
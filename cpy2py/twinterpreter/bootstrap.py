@@ -15,6 +15,7 @@ import argparse
 import sys
 import base64
 import os
+import time
 import logging
 
 from cpy2py.meta import __version__ as cpy2py_version
@@ -22,6 +23,7 @@ from cpy2py.utility.compat import pickle, str_to_bytes
 from cpy2py.kernel import state
 from cpy2py.kernel.flavours import single
 from cpy2py.kernel.exceptions import TwinterpeterTerminated
+from cpy2py.twinterpreter.startup_profile import StartupProfile, BOOTSTRAP_PROFILE, callable_name
 
 
 DEFAULT_PKL_PROTO = 2  # prot2 is supported by all supported versions
@@ -69,12 +71,15 @@ def dump_initializer(initializers):
     return initializer_pkls
 
 
-def run_initializer(initializer_pkls):
-    """Run initializer functions"""
+def run_initializer(initializer_pkls, profile=None):
+    """Run initializer functions, optionally recording each in a :py:class:`~.StartupProfile`"""
+    profile = profile if profile is not None else StartupProfile()
     for initializer_pkl in initializer_pkls:
+        start = time.time()
         initializer = load_any(initializer_pkl)
         # run immediately in case there are dependencies during unpickling
         initializer()
+        profile.record('initializer:%s' % callable_name(initializer), start)
 
 
 def dump_main_def(main_def):
@@ -145,16 +150,19 @@ def bootstrap_kernel():
         help="base 64 encoded initialization functions",
         default=[],
     )
-    settings = parser.parse_args()
+    profile = BOOTSTRAP_PROFILE
+    with profile.timed('arguments'):
+        settings = parser.parse_args()
     assert state.TWIN_ID == settings.twin_id
     assert state.MASTER_ID == settings.master_id
     # setup parent environment/namespace first
     if settings.cwd:
         os.chdir(settings.cwd)
-    run_main_def(settings.main_def)
+    with profile.timed('main_def'):
+        run_main_def(settings.main_def)
     # run initializers before creating any resources
     # TwinMaster will run the finalizers directly
-    run_initializer(settings.initializer)
+    run_initializer(settings.initializer, profile=profile)
     logging.getLogger('__cpy2py__.kernel.%s_to_%s.bootstrap' % (state.TWIN_ID, settings.peer_id)).warning(
         '<%s> [%s] %s.bootstrap_kernel deploying cpy2py %s',
         state.TWIN_ID,
@@ -162,12 +170,17 @@ def bootstrap_kernel():
         'cpy2py.twinterpreter',
         cpy2py_version
     )
+    with profile.timed('kernel_arguments'):
+        kernel = load_kernel(settings.kernel)
+        client_ipyc = load_connector(settings.client_ipyc)
+        server_ipyc = load_connector(settings.server_ipyc)
     exit_code = run_kernel(
-        kernel=load_kernel(settings.kernel),
-        client_ipyc=load_connector(settings.client_ipyc),
-        server_ipyc=load_connector(settings.server_ipyc),
+        kernel=kernel,
+        client_ipyc=client_ipyc,
+        server_ipyc=server_ipyc,
         peer_id=settings.peer_id,
-        ipyc_pkl_protocol=settings.ipyc_pkl_protocol
+        ipyc_pkl_protocol=settings.ipyc_pkl_protocol,
+        profile=profile,
     )
     logging.getLogger('__cpy2py__.kernel.%s_to_%s.bootstrap' % (state.TWIN_ID, settings.peer_id)).warning(
         '<%s> [%s] %s.bootstrap_kernel exiting with %s',
@@ -179,22 +192,24 @@ def bootstrap_kernel():
     sys.exit(exit_code)
 
 
-def run_kernel(kernel, client_ipyc, server_ipyc, peer_id, ipyc_pkl_protocol):
+def run_kernel(kernel, client_ipyc, server_ipyc, peer_id, ipyc_pkl_protocol, profile=None):
+    profile = profile if profile is not None else StartupProfile()
     # start in opposite order as TwinMaster to avoid deadlocks
     if kernel:
         client, server = kernel
     else:
         client, server = single.CLIENT, single.SERVER
-    kernel_server = server(
-        peer_id=peer_id,
-        ipyc=server_ipyc,
-        pickle_protocol=ipyc_pkl_protocol,
-    )
-    kernel_client = client(
-        peer_id=peer_id,
-        ipyc=client_ipyc,
-        pickle_protocol=ipyc_pkl_protocol,
-    )
+    with profile.timed('kernel_connect'):
+        kernel_server = server(
+            peer_id=peer_id,
+            ipyc=server_ipyc,
+            pickle_protocol=ipyc_pkl_protocol,
+        )
+        kernel_client = client(
+            peer_id=peer_id,
+            ipyc=client_ipyc,
+            pickle_protocol=ipyc_pkl_protocol,
+        )
     exit_code = kernel_server.run()
     try:
         kernel_client.stop()
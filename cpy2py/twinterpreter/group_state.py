@@ -14,7 +14,9 @@
 from __future__ import print_function
 from cpy2py.proxy.baseclass import TwinObject, localmethod
 from cpy2py.kernel import state
+from cpy2py.twinterpreter.startup_profile import callable_name
 import threading
+import time
 
 
 class TwinInitDirective(object):
@@ -93,15 +95,20 @@ class TwinGroupState(TwinObject):
                         continue
                     client.dispatch_call(initializer.call, *initializer.args, **initializer.kwargs)
 
-    def run_finalizers(self, twin_id):
+    def run_finalizers(self, twin_id, profile=None):
         """
         Run all finalizers in a twinterpreter
 
         :param twin_id:
+        :param profile: profile in which to record each finalizer
+        :type profile: :py:class:`~cpy2py.twinterpreter.startup_profile.StartupProfile` or None
 
         :note: This function is called automatically when bootstrapping
                a twinterpreter. It is not intended for manual use.
         """
         client = state.get_kernel(twin_id)
         for finalizer in self.finalizers:
+            start = time.time()
             client.dispatch_call(finalizer)
+            if profile is not None:
+                profile.record('finalizer:%s' % callable_name(finalizer), start)
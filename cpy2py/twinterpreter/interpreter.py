@@ -82,7 +82,7 @@ class Interpreter(object):
             self.executable, self.python_implementation, '.'.join(str(field) for field in self.python_version_info)
         )
 
-    def spawn(self, arguments=None, environment=None):
+    def spawn(self, arguments=None, environment=None, pass_fds=()):
         """
         Spawn a new instance of this interpreter
 
@@ -90,12 +90,21 @@ class Interpreter(object):
         :type arguments: list[str] or None
         :param environment: environment in which to run the interpreter
         :type environment: dict or None
+        :param pass_fds: file descriptors to be inherited by the interpreter
+        :type pass_fds: tuple[int]
         :returns: the spawned process
         :rtype: :py:class:`subprocess.Popen`
 
         :note: This does not spawn a twinterpreter by itself.
                Supply the appropriate arguments and environment as required.
         """
+        if not pass_fds:
+            fd_kwargs = {}
+        elif sys.version_info >= (3, 2):
+            fd_kwargs = {'pass_fds': pass_fds}
+        else:
+            # descriptors are inheritable by default before Python 3.4
+            fd_kwargs = {'close_fds': False}
         return subprocess.Popen(
             args=[self.executable] + ([] or arguments),
             # do not redirect std streams
@@ -104,4 +113,5 @@ class Interpreter(object):
             stdout=None,
             stderr=None,
             env=environment,
+            **fd_kwargs
         )
@@ -19,7 +19,7 @@ import time
 import logging
 
 from cpy2py.kernel import state
-from cpy2py.twinterpreter import bootstrap
+from cpy2py.twinterpreter import bootstrap, startup_profile
 from cpy2py.ipyc import fifo_pipe
 
 from .main_module import TwinMainModule
@@ -40,8 +40,24 @@ class TwinMaster(object):
     :type executable: str or None
     :param twinterpreter_id: identified for the twinterpreter
     :type twinterpreter_id: str or None
-    :param kernel: the type of kernel to use to connect interpreters
+    :param kernel: the type of kernel to use to connect interpreters, e.g. ``'single'``, ``'async'``,
+                   ``'multi'`` or ``'queued'``
     :param ipyc: the type of interprocess communication to use
+    :param channels: the number of parallel connections of type `ipyc`
+    :type channels: int
+    :param busy_poll: seconds to poll connections for messages before blocking
+    :type busy_poll: float or None
+
+    Using several `channels` lets concurrent threads send requests without
+    contending for a single connection. Each thread uses one channel for
+    all its requests. This is most useful with a kernel serving requests in
+    parallel, e.g. ``kernel='multi'``.
+
+    Setting `busy_poll` makes both twinterpreters poll for messages before
+    waiting for them, which avoids the latency of waking up blocked threads.
+    Every thread receiving messages, e.g. the kernel server, keeps a CPU core
+    busy while polling. Use it for latency critical twinterpreters exchanging
+    messages frequently; a period of ``0.001`` covers most local round trips.
     """
     _initialized = False
 
@@ -51,7 +67,7 @@ class TwinMaster(object):
 
     def __init__(
             self, executable=None, twinterpreter_id=None, kernel=None, main_module=True, run_main=None,
-            restore_argv=False, ipyc=fifo_pipe.DuplexFifoIPyC
+            restore_argv=False, ipyc=fifo_pipe.DuplexFifoIPyC, channels=1, busy_poll=None
     ):
         # avoid duplicate initialisation of singleton
         with self._store_mutex:
@@ -65,7 +81,12 @@ class TwinMaster(object):
                 '__cpy2py__.twin.%s_to_%s.master' % (state.TWIN_ID, self.twinterpreter_id)
             )
             self._process = None
-            self._kernel_master = TwinKernelMaster(twin_id=self.twinterpreter_id, kernel=kernel, ipyc=ipyc, protocol=self._interpreter.pickle_protocol)
+            #: :py:class:`~cpy2py.twinterpreter.startup_profile.StartupProfile` of the last start
+            self.startup_profile = None
+            self._kernel_master = TwinKernelMaster(
+                twin_id=self.twinterpreter_id, kernel=kernel, ipyc=ipyc, protocol=self._interpreter.pickle_protocol,
+                channels=channels, busy_poll=busy_poll,
+            )
 
     @property
     def native(self):
@@ -104,18 +125,30 @@ class TwinMaster(object):
             raise RuntimeError("Attempt to start TwinMaster after destroying it")
         if not self.is_alive:
             self._logger.warning('<%s> Starting Twin [%s]', state.TWIN_ID, self.twinterpreter_id)
-            self._process = self._interpreter.spawn(
-                arguments=self._twin_args(),
-                environment=self._twin_env()
-            )
+            profile = startup_profile.StartupProfile()
+            with profile.timed('spawn'):
+                self._process = self._interpreter.spawn(
+                    arguments=self._twin_args(),
+                    environment=self._twin_env(),
+                    pass_fds=self._kernel_master.inherit_fds,
+                )
+            spawn_time = time.time()
             time.sleep(0.1)  # sleep while child initializes
             if self._process.poll() is not None:
                 raise exceptions.TwinterpreterProcessError(
                     'Twinterpreter process failed at start with %s' % self._process.poll()
                 )
-            self._kernel_master.accept()
+            with profile.timed('accept'):
+                self._kernel_master.accept()
+            twin_profile = self._kernel_master.client.request_dispatcher.dispatch_call(
+                startup_profile.get_bootstrap_profile
+            )
+            if twin_profile.phases:
+                profile.record('interpreter', spawn_time, twin_profile.start)
+            profile.extend(twin_profile)
             # finalize the twinterpreter
-            state.TWIN_GROUP_STATE.run_finalizers(self.twinterpreter_id)
+            state.TWIN_GROUP_STATE.run_finalizers(self.twinterpreter_id, profile=profile)
+            self.startup_profile = profile
             self._logger.info('<%s> Initialized Twin [%s]', state.TWIN_ID, self.twinterpreter_id)
         else:
             self._logger.warning('<%s> Reusing Twin [%s]', state.TWIN_ID, self.twinterpreter_id)
@@ -146,6 +179,8 @@ class TwinMaster(object):
         twin_env = os.environ.copy()
         twin_env['__CPY2PY_TWIN_ID__'] = self.twinterpreter_id
         twin_env['__CPY2PY_MASTER_ID__'] = state.MASTER_ID
+        if state.LEASE_TIME is not None:
+            twin_env['__CPY2PY_LEASE_TIME__'] = repr(float(state.LEASE_TIME))
         return twin_env
 
     def stop(self):
@@ -187,6 +222,20 @@ class TwinMaster(object):
             return call(*call_args, **call_kwargs)
         return self._kernel_master.client.request_dispatcher.dispatch_call(call, *call_args, **call_kwargs)
 
+    @classmethod
+    def aggregate_startup_profiles(cls):
+        """
+        Aggregate the startup phases of all twinterpreters started from this interpreter
+
+        :returns: ``(name, count, total, maximum)`` per phase, largest ``total`` first
+        :see: :py:func:`~cpy2py.twinterpreter.startup_profile.aggregate`
+        """
+        with cls._store_mutex:
+            return startup_profile.aggregate(
+                master.startup_profile for master in cls._master_store.values()
+                if master.startup_profile is not None
+            )
+
 
 class AutoTwinMaster(TwinMaster):
     """
@@ -0,0 +1,166 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Timing of the individual phases of starting a twinterpreter
+
+Both the :py:class:`~cpy2py.twinterpreter.master.TwinMaster` and the
+twinterpreter's :py:func:`~cpy2py.twinterpreter.bootstrap.bootstrap_kernel`
+record when each phase of the startup begins and ends. The twinterpreter
+side is fetched by the master once the kernel is connected, so that
+:py:attr:`~cpy2py.twinterpreter.master.TwinMaster.startup_profile` holds
+the entire startup in one :py:class:`~.StartupProfile`.
+
+The phases are, in order of appearance:
+
+``spawn``
+  creating the twinterpreter process (master)
+
+``interpreter``
+  from spawning until the bootstrap runs, i.e. interpreter startup and
+  importing :py:mod:`cpy2py` (twinterpreter)
+
+``arguments``
+  parsing of the bootstrap arguments (twinterpreter)
+
+``main_def``
+  unpickling and bootstrapping the ``__main__`` module (twinterpreter)
+
+``initializer:<name>``
+  unpickling and running each initializer (twinterpreter)
+
+``kernel_arguments``
+  unpickling the kernel and IPyC connectors (twinterpreter)
+
+``kernel_connect``
+  creating and connecting the kernel (twinterpreter)
+
+``accept``
+  creating and connecting the kernel (master)
+
+``finalizer:<name>``
+  each finalizer (master)
+
+Timestamps are taken from :py:func:`time.time`, which is consistent between
+processes on the same machine.
+"""
+import time
+
+
+class StartupProfile(object):
+    """
+    Timestamps of startup phases
+
+    :param phases: initial phases as ``(name, start, end)``
+    :type phases: list[tuple[str, float, float]]
+    """
+    def __init__(self, phases=None):
+        self.phases = list(phases or ())
+
+    @property
+    def start(self):
+        """Time at which the first phase started"""
+        return min(phase[1] for phase in self.phases) if self.phases else None
+
+    @property
+    def end(self):
+        """Time at which the last phase ended"""
+        return max(phase[2] for phase in self.phases) if self.phases else None
+
+    @property
+    def total(self):
+        """Time between the start of the first and end of the last phase"""
+        return self.end - self.start if self.phases else 0.0
+
+    def record(self, name, start, end=None):
+        """Add a phase from `start` until `end`, which defaults to now"""
+        self.phases.append((name, start, time.time() if end is None else end))
+
+    def timed(self, name):
+        """Context manager recording a phase for the duration of the context"""
+        return _PhaseTimer(self, name)
+
+    def extend(self, other):
+        """Add all phases of another profile"""
+        self.phases.extend(other.phases)
+        self.phases.sort(key=lambda phase: phase[1])
+
+    def durations(self):
+        """List of ``(name, duration)`` for all :py:attr:`phases`"""
+        return [(name, end - start) for name, start, end in self.phases]
+
+    def report(self):
+        """Format the profile as a human readable table"""
+        if not self.phases:
+            return 'no startup phases recorded'
+        start, width = self.start, max(len(phase[0]) for phase in self.phases)
+        lines = ['%s %10s %10s' % ('phase'.ljust(width), 'offset[s]', 'time[s]')]
+        for name, phase_start, phase_end in self.phases:
+            lines.append('%s %10.4f %10.4f' % (name.ljust(width), phase_start - start, phase_end - phase_start))
+        lines.append('%s %10s %10.4f' % ('total'.ljust(width), '', self.total))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return '<%s, %d phases, %.4fs>' % (self.__class__.__name__, len(self.phases), self.total)
+
+
+class _PhaseTimer(object):
+    """Context recording a phase of a profile"""
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.profile.record(self.name, self._start)
+        return False
+
+
+def aggregate(profiles):
+    """
+    Aggregate the phases of several profiles
+
+    :param profiles: the profiles to aggregate
+    :type profiles: iterable[StartupProfile]
+    :returns: ``(name, count, total, maximum)`` per phase, largest ``total`` first
+    :rtype: list[tuple[str, int, float, float]]
+    """
+    summary = {}
+    for profile in profiles:
+        for name, duration in profile.durations():
+            count, total, maximum = summary.get(name, (0, 0.0, 0.0))
+            summary[name] = (count + 1, total + duration, max(maximum, duration))
+    return sorted(
+        ((name,) + stats for name, stats in summary.items()),
+        key=lambda item: item[2],
+        reverse=True,
+    )
+
+
+def callable_name(call):
+    """Name of a callable for identifying its phase"""
+    call = getattr(call, 'call', call)  # unwrap TwinInitDirective
+    return '%s.%s' % (getattr(call, '__module__', '?'), getattr(call, '__name__', repr(call)))
+
+
+#: profile of bootstrapping this interpreter, if it is a twinterpreter
+BOOTSTRAP_PROFILE = StartupProfile()
+
+
+def get_bootstrap_profile():
+    """Get the profile of bootstrapping this interpreter"""
+    return BOOTSTRAP_PROFILE
@@ -419,57 +419,86 @@ class FifoQueue(object):
         :return: an item from the queue
         :raises: :py:exc:`~.ItemError` if no item could be retrieved
         """
-        with self._queue_mutex:
-            try:
-                # always try if anything is ready
-                return self._queue_content.pop()
-            except IndexError:
-                if not block:
-                    raise ItemError
-                # register ourselves as waiting for content
-                wait_mutex = Lock()
-                wait_mutex.acquire()  # lock mutex so we can wait for its release
-                self._waiters.append(wait_mutex)
-        try:
-            if not timeout or timeout <= 0 or timeout == inf:
-                with wait_mutex:
-                    with self._queue_mutex:
-                        return self._queue_content.pop()
-            else:
-                # in Py3, we can explicitly block for a specific time
+        deadline = None if not timeout or timeout <= 0 or timeout == inf else time.time() + timeout
+        while True:
+            with self._queue_mutex:
                 try:
-                    if wait_mutex.acquire(True, timeout):
-                        with self._queue_mutex:
-                            return self._queue_content.pop()
-                    else:
+                    # always try if anything is ready
+                    return self._queue_content.popleft()
+                except IndexError:
+                    if not block:
                         raise ItemError
-                except TypeError:
-                    # Replicate the diminishing wait behaviour of threading.Condition
-                    _w_min, _w_max, _w_fail, _w_order = (
-                        self.sleep_min, self.sleep_max, self.sleep_fail_penalty, self.sleep_order_penalty)
-                    _w_start, _w_now, _w_idx, _w_cnt = time.time(), _w_min / _w_fail, self._waiters.index(wait_mutex), 1
-                    while True:
-                        with self._queue_mutex:
-                            if wait_mutex.acquire(False):
-                                try:
-                                    return self._queue_content.pop()
-                                except IndexError:  # someone else beat us to it, continue waiting
-                                    pass
-                        _w_now = min(
-                            _w_now * _w_fail * (_w_order ** _w_idx),  # diminishing wake
-                            _w_start + timeout - time.time(),  # timeout
-                            _w_max  # minimum responsiveness
-                        )
-                        if _w_now < 0:
+                    # register ourselves as waiting for content
+                    wait_mutex = Lock()
+                    wait_mutex.acquire()  # lock mutex so we can wait for its release
+                    self._waiters.append(wait_mutex)
+            try:
+                if deadline is None:
+                    wait_mutex.acquire()
+                else:
+                    # in Py3, we can explicitly block for a specific time
+                    try:
+                        if not wait_mutex.acquire(True, max(deadline - time.time(), 0)):
                             raise ItemError
-                        time.sleep(_w_now)
-                        _w_cnt += 1
-        finally:
-            # always clean up
-            self._waiters.remove(wait_mutex)
+                    except TypeError:
+                        return self._poll_item(wait_mutex, deadline)
+            finally:
+                # always clean up
+                self._waiters.remove(wait_mutex)
+            # another thread may have taken the item before we woke up, then wait again
+
+    def _poll_item(self, wait_mutex, deadline):
+        """Replicate the diminishing wait behaviour of :py:class:`threading.Condition`"""
+        _w_min, _w_max, _w_fail, _w_order = (
+            self.sleep_min, self.sleep_max, self.sleep_fail_penalty, self.sleep_order_penalty)
+        _w_now, _w_idx, _w_cnt = _w_min / _w_fail, self._waiters.index(wait_mutex), 1
+        while True:
+            with self._queue_mutex:
+                if wait_mutex.acquire(False):
+                    try:
+                        return self._queue_content.popleft()
+                    except IndexError:  # someone else beat us to it, continue waiting
+                        pass
+            _w_now = min(
+                _w_now * _w_fail * (_w_order ** _w_idx),  # diminishing wake
+                deadline - time.time(),  # timeout
+                _w_max  # minimum responsiveness
+            )
+            if _w_now < 0:
+                raise ItemError
+            time.sleep(_w_now)
+            _w_cnt += 1
+
+
+class _Lanes(object):
+    """FIFO lanes of items ``(priority, ...)``, popping from the highest priority first"""
+    def __init__(self, levels):
+        self._lanes = [deque() for _ in range(levels)]
 
+    def __len__(self):
+        return sum(len(lane) for lane in self._lanes)
 
+    def append(self, item):
+        self._lanes[item[0]].append(item)
 
+    def popleft(self):
+        for lane in self._lanes:
+            if lane:
+                return lane.popleft()
+        raise IndexError('pop from an empty queue')
 
 
+class PriorityQueue(FifoQueue):
+    """
+    Lightweight Priority Queue
 
+    Items must be sequences starting with their priority, an integer from
+    ``0`` to ``levels - 1``. Items with a lower priority value are retrieved
+    first, items of the same priority in order of insertion.
+
+    :param levels: number of priorities
+    :type levels: int
+    """
+    def __init__(self, levels):
+        FifoQueue.__init__(self)
+        self._queue_content = _Lanes(levels)
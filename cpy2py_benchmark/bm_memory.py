@@ -0,0 +1,84 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Memory used per live proxy and native twin object
+
+Creates many twin objects and measures the memory allocated for them in
+the master, which holds the proxies, and in the twin, which holds the
+native objects. Requires :py:mod:`tracemalloc`, i.e. Python 3.4 or newer.
+"""
+from __future__ import print_function
+import argparse
+import gc
+import time
+
+import tracemalloc
+
+from cpy2py import TwinMaster, TwinObject, twinfunction
+
+
+class Payload(TwinObject):
+    """Minimal twin object"""
+    __twin_id__ = 'other'
+
+
+@twinfunction('other')
+def native_objects(count):
+    """Create native objects in the twin, returning the memory allocated for them"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [Payload() for _ in range(count)]
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, len(objects)
+    finally:
+        tracemalloc.stop()
+
+
+def proxy_objects(count):
+    """Create proxies in the master, returning the memory allocated for them"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        proxies = [Payload() for _ in range(count)]
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, len(proxies)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    cli = argparse.ArgumentParser("Measure memory used per twin object")
+    cli.add_argument('--count', type=int, default=20000, help='Number of objects to create. [%(default)s]')
+    cli.add_argument('--executable', default='python', help='Interpreter of the twin. [%(default)s]')
+    settings = cli.parse_args()
+    twinterpreter = TwinMaster(executable=settings.executable, twinterpreter_id='other')
+    twinterpreter.start()
+    try:
+        start_time = time.time()
+        proxy_bytes, count = proxy_objects(settings.count)
+        proxy_time = time.time() - start_time
+        native_bytes, _ = native_objects(settings.count)
+    finally:
+        twinterpreter.destroy()
+    print('%20s %15s %15s' % ('objects', 'bytes/object', 'total[MB]'))
+    print('%20s %15.1f %15.2f' % ('proxy (master)', proxy_bytes / count, proxy_bytes / 1E6))
+    print('%20s %15.1f %15.2f' % ('native (twin)', native_bytes / count, native_bytes / 1E6))
+    print('%d proxies created in %.2fs' % (count, proxy_time))
+
+
+if __name__ == "__main__":
+    main()
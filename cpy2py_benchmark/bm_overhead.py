@@ -23,11 +23,17 @@ from cpy2py.utility.compat import range
 from cpy2py.utility.twinspect import exepath
 import argparse
 
+from cpy2py_benchmark import results as bm_results
+
 
 class TimingVector(object):
     def __init__(self):
         self._values = []
 
+    @property
+    def values(self):
+        return self._values
+
     @property
     def average(self):
         if not self._values:
@@ -130,7 +136,11 @@ def main():
         '--kernels',
         nargs='+',
         help='Kernel modules to use as <module>[:<name>]. [%(default)s]',
-        default=['cpy2py.kernel.kernel_async:async', 'cpy2py.kernel.kernel_single:single']
+        default=['cpy2py.kernel.flavours.async:async', 'cpy2py.kernel.flavours.single:single']
+    )
+    cli.add_argument(
+        '--output',
+        help='File to write JSON results to. [none]',
     )
     settings = cli.parse_args()
     interpreters = []
@@ -188,6 +198,23 @@ def main():
             kernels=[kn[1] for kn in kernels],
             interpreters=interpreters,
         )
+    if settings.output:
+        bm_results.dump(bm_results.report('overhead', json_results(results)), settings.output)
+
+
+def json_results(results):
+    """Convert timings to results of :py:mod:`cpy2py_benchmark.results`"""
+    return [
+        {
+            'case': {'repeat': name, 'interpreter': interpreter, 'kernel': kname},
+            'latency': bm_results.summarize(total.values),
+            'call': bm_results.summarize(call.values),
+            'reply': bm_results.summarize(reply.values),
+        }
+        for name in results
+        for interpreter in results[name]
+        for kname, (total, call, reply) in results[name][interpreter].items()
+    ]
 
 
 def print_results(start_time, results, repeats=None, kernels=None, interpreters=None):
@@ -0,0 +1,203 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Latency and throughput of IPyC transports
+
+Sends payloads to a twinterpreter and back, sweeping over transports,
+payload sizes, payload shapes and the number of concurrent threads. Each
+combination is timed for a minimum duration and number of calls. Results
+are written as JSON, see :py:mod:`cpy2py_benchmark.results`, with the
+latency distribution in seconds and the throughput in calls and payload
+bytes per second.
+
+Payload shapes are
+
+``bytes``
+    a flat :py:class:`bytes` object of the given size
+
+``nested``
+    a list of small records, i.e. dictionaries of strings, numbers and lists,
+    whose pickle is about the given size
+
+``proxies``
+    a list of references to twin objects, one per 64 bytes of the given size
+"""
+from __future__ import print_function
+import argparse
+import functools
+import socket
+import sys
+import threading
+import time
+
+from cpy2py import TwinMaster, TwinObject, twinfunction
+from cpy2py.utility.compat import range, pickle
+from cpy2py.ipyc import fifo_pipe, duplex_socket, seqpacket
+
+from cpy2py_benchmark import results as bm_results
+
+
+#: IPyC factories by name
+TRANSPORTS = {
+    'fifo': fifo_pipe.DuplexFifoIPyC,
+    'unix': duplex_socket.DuplexSocketIPyC,
+    'tcp': functools.partial(duplex_socket.DuplexSocketIPyC, family=socket.AF_INET, address=('127.0.0.1', 0)),
+}
+if hasattr(socket, 'SOCK_SEQPACKET') and hasattr(socket, 'AF_UNIX'):
+    TRANSPORTS['seqpacket'] = seqpacket.SeqPacketIPyC
+
+#: approximate size of a reference to a twin object
+PROXY_SIZE = 64
+
+_SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+
+class Token(TwinObject):
+    """Twin object referenced by ``proxies`` payloads"""
+    __twin_id__ = 'other'
+
+
+@twinfunction('other')
+def echo(payload):
+    """Return `payload` to the caller"""
+    return payload
+
+
+def parse_size(size):
+    """Parse a size such as ``"512"``, ``"4k"`` or ``"100M"`` to bytes"""
+    size = size.strip().lower().rstrip('b')
+    number, unit = (size[:-1], size[-1]) if size[-1:] in _SIZE_UNITS else (size, '')
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def make_payload(shape, size):
+    """Create a payload of `shape` with approximately `size` bytes"""
+    if shape == 'bytes':
+        return b'x' * size
+    if shape == 'nested':
+        # records must be distinct objects, pickle sends repeated objects only once
+        sample = [_record(idx) for idx in range(100)]
+        record_size = len(pickle.dumps(sample, 2)) // len(sample)
+        return [_record(idx) for idx in range(max(1, size // record_size))]
+    if shape == 'proxies':
+        return [Token() for _ in range(max(1, size // PROXY_SIZE))]
+    raise ValueError('unknown payload shape %r' % shape)
+
+
+def _record(idx):
+    return {'name': 'record %d' % idx, 'tags': ['a', 'b', 'c'], 'values': [0.5 * idx] * 8, 'index': idx}
+
+
+def time_calls(payload, concurrency, duration, min_calls):
+    """
+    Echo `payload` from `concurrency` threads for at least `duration` seconds
+
+    :returns: latencies of all calls and the total wall time
+    """
+    latencies = []
+    deadline = time.time() + duration
+
+    def run():
+        calls = 0
+        while calls < min_calls or time.time() < deadline:
+            start_time = time.time()
+            echo(payload)
+            latencies.append(time.time() - start_time)
+            calls += 1
+
+    threads = [threading.Thread(target=run) for _ in range(concurrency)]
+    start_time = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.time() - start_time
+
+
+def measure(transport, shape, size, concurrency, duration, min_calls, samples=True):
+    """Time echoing one payload, returning a JSON-compatible result"""
+    payload = make_payload(shape, size)
+    # warm up connections, caches and the payload's proxies
+    echo(payload)
+    latencies, wall_time = time_calls(payload, concurrency, duration, min_calls)
+    return {
+        'case': {'transport': transport, 'shape': shape, 'size': size, 'concurrency': concurrency},
+        'latency': bm_results.summarize(latencies, samples=samples),
+        'throughput': {
+            'calls': len(latencies) / wall_time,
+            # the payload is sent in both directions
+            'bytes': 2.0 * size * len(latencies) / wall_time,
+        },
+    }
+
+
+def main():
+    cli = argparse.ArgumentParser("Measure latency and throughput of IPyC transports")
+    cli.add_argument(
+        '--transports', nargs='+', choices=sorted(TRANSPORTS), default=sorted(TRANSPORTS),
+        help='Transports to use. [%(default)s]',
+    )
+    cli.add_argument(
+        '--sizes', nargs='+', default=['16', '1k', '64k', '1M', '16M'],
+        help='Payload sizes in bytes, with optional k/M/G suffix. [%(default)s]',
+    )
+    cli.add_argument(
+        '--shapes', nargs='+', choices=['bytes', 'nested', 'proxies'], default=['bytes', 'nested', 'proxies'],
+        help='Payload shapes to use. [%(default)s]',
+    )
+    cli.add_argument(
+        '--concurrency', nargs='+', type=int, default=[1, 4],
+        help='Numbers of threads sending concurrently. [%(default)s]',
+    )
+    cli.add_argument('--duration', type=float, default=1.0, help='Minimum seconds per test. [%(default)s]')
+    cli.add_argument('--min-calls', type=int, default=5, help='Minimum calls per thread and test. [%(default)s]')
+    cli.add_argument('--executable', default='python', help='Interpreter of the twin. [%(default)s]')
+    cli.add_argument('--kernel', default='multi', help='Kernel of the twin. [%(default)s]')
+    cli.add_argument('--output', default='-', help='File to write JSON results to. [stdout]')
+    cli.add_argument('--no-samples', action='store_true', help='Omit individual timings from the results.')
+    settings = cli.parse_args()
+    results = []
+    for transport in settings.transports:
+        twinterpreter = TwinMaster(
+            executable=settings.executable, twinterpreter_id='other', kernel=settings.kernel,
+            ipyc=TRANSPORTS[transport],
+        )
+        twinterpreter.start()
+        try:
+            for shape in settings.shapes:
+                for size in settings.sizes:
+                    for concurrency in settings.concurrency:
+                        result = measure(
+                            transport, shape, parse_size(size), concurrency, settings.duration, settings.min_calls,
+                            samples=not settings.no_samples,
+                        )
+                        print(
+                            '%10s %8s %12s x%-3d p50 %.6fs p99 %.6fs %10.1f MB/s' % (
+                                transport, shape, size, concurrency,
+                                result['latency']['p50'], result['latency']['p99'],
+                                result['throughput']['bytes'] / 1E6,
+                            ),
+                            file=sys.stderr
+                        )
+                        results.append(result)
+        finally:
+            twinterpreter.destroy()
+    bm_results.dump(
+        bm_results.report('transport', results, twin_executable=settings.executable, kernel=settings.kernel),
+        settings.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
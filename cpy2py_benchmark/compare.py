@@ -0,0 +1,137 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Compare two benchmark reports and flag regressions
+
+.. code:: bash
+
+    python -m cpy2py_benchmark.compare baseline.json candidate.json
+
+Results of the same ``case`` are compared by their median latency. A
+result is a regression if the median is slower by more than a threshold
+and the difference is statistically significant. With samples in both
+reports, significance is tested with the Mann-Whitney U test, which makes
+no assumptions on the shape of latency distributions. Without samples,
+it falls back to Welch's test of the means.
+
+The exit code is ``1`` if there are any regressions, so that the command
+can gate upgrades.
+
+:note: With many samples, even small systematic differences between runs
+       are significant. Compare reports from the same, otherwise idle
+       host, and raise ``--threshold`` for hosts with noisy timings.
+"""
+from __future__ import print_function, division
+import argparse
+import math
+import sys
+
+from cpy2py_benchmark import results as bm_results
+
+
+def mann_whitney(before, after):
+    """Two-sided p-value of the Mann-Whitney U test, using the normal approximation"""
+    count_before, count_after = len(before), len(after)
+    ranked = sorted([(value, 0) for value in before] + [(value, 1) for value in after])
+    total = len(ranked)
+    rank_sum_after, ties = 0.0, 0.0
+    start = 0
+    while start < total:
+        end = start
+        while end + 1 < total and ranked[end + 1][0] == ranked[start][0]:
+            end += 1
+        # tied values share their average rank
+        rank = (start + end) / 2 + 1
+        rank_sum_after += rank * sum(group for _, group in ranked[start:end + 1])
+        ties += (end - start + 1) ** 3 - (end - start + 1)
+        start = end + 1
+    u_after = rank_sum_after - count_after * (count_after + 1) / 2
+    variance = count_before * count_after / 12 * ((total + 1) - ties / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+    deviation = max(abs(u_after - count_before * count_after / 2) - 0.5, 0)
+    return math.erfc(deviation / math.sqrt(variance) / math.sqrt(2))
+
+
+def welch(before, after):
+    """Two-sided p-value of Welch's test of two summaries, using the normal approximation"""
+    variance = before['stdev'] ** 2 / before['count'] + after['stdev'] ** 2 / after['count']
+    if variance <= 0:
+        return 1.0 if before['mean'] == after['mean'] else 0.0
+    return math.erfc(abs(after['mean'] - before['mean']) / math.sqrt(variance) / math.sqrt(2))
+
+
+def _case_key(result):
+    return tuple(sorted(result['case'].items()))
+
+
+def compare(baseline, candidate, metric='latency', threshold=0.05, alpha=0.01):
+    """
+    Compare the results of two reports
+
+    :param metric: name of the distribution to compare
+    :param threshold: relative slowdown of the median regarded as relevant
+    :param alpha: significance level of the test
+    :returns: ``(case, before, after, change, p_value, verdict)`` for every case in both reports
+    """
+    baseline_results = dict((_case_key(result), result) for result in baseline['results'])
+    comparisons = []
+    for result in candidate['results']:
+        key = _case_key(result)
+        if key not in baseline_results or metric not in result:
+            continue
+        before, after = baseline_results[key][metric], result[metric]
+        if 'samples' in before and 'samples' in after:
+            p_value = mann_whitney(before['samples'], after['samples'])
+        else:
+            p_value = welch(before, after)
+        change = (after['p50'] - before['p50']) / before['p50'] if before['p50'] else 0.0
+        if p_value >= alpha or abs(change) <= threshold:
+            verdict = 'same'
+        else:
+            verdict = 'slower' if change > 0 else 'faster'
+        comparisons.append((result['case'], before['p50'], after['p50'], change, p_value, verdict))
+    return comparisons
+
+
+def main():
+    cli = argparse.ArgumentParser("Compare two benchmark reports and flag regressions")
+    cli.add_argument('baseline', help='Report of the reference run.')
+    cli.add_argument('candidate', help='Report of the run to check.')
+    cli.add_argument('--metric', default='latency', help='Distribution to compare. [%(default)s]')
+    cli.add_argument(
+        '--threshold', type=float, default=0.05, help='Relative slowdown of the median to flag. [%(default)s]'
+    )
+    cli.add_argument('--alpha', type=float, default=0.01, help='Significance level. [%(default)s]')
+    settings = cli.parse_args()
+    baseline, candidate = bm_results.load(settings.baseline), bm_results.load(settings.candidate)
+    for name in ('cpy2py', 'python', 'implementation', 'hostname'):
+        if baseline['environment'].get(name) != candidate['environment'].get(name):
+            print('%-15s %s => %s' % (name, baseline['environment'].get(name), candidate['environment'].get(name)))
+    comparisons = compare(
+        baseline, candidate, metric=settings.metric, threshold=settings.threshold, alpha=settings.alpha
+    )
+    print('%12s %12s %8s %10s %7s  %s' % ('before[s]', 'after[s]', 'change', 'p-value', 'verdict', 'case'))
+    for case, before, after, change, p_value, verdict in comparisons:
+        print('%12.6f %12.6f %+7.1f%% %10.2g %7s  %s' % (
+            before, after, change * 100, p_value, verdict,
+            ' '.join('%s=%s' % item for item in sorted(case.items()))
+        ))
+    regressions = sum(1 for comparison in comparisons if comparison[-1] == 'slower')
+    print('%d of %d cases compared, %d regressions' % (len(comparisons), len(candidate['results']), regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# - # Copyright 2016 Max Fischer
+# - #
+# - # Licensed under the Apache License, Version 2.0 (the "License");
+# - # you may not use this file except in compliance with the License.
+# - # You may obtain a copy of the License at
+# - #
+# - #     http://www.apache.org/licenses/LICENSE-2.0
+# - #
+# - # Unless required by applicable law or agreed to in writing, software
+# - # distributed under the License is distributed on an "AS IS" BASIS,
+# - # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# - # See the License for the specific language governing permissions and
+# - # limitations under the License.
+"""
+Machine-readable results of benchmarks
+
+Benchmarks report their results as JSON documents of the form::
+
+    {
+        "benchmark": "transport",
+        "environment": {"cpy2py": "0.17.1", "python": "3.6.15", ...},
+        "results": [
+            {
+                "case": {"transport": "unix", "size": 1024, ...},
+                "latency": {"p50": 0.0002, "p99": 0.0004, ..., "samples": [...]},
+                ...
+            },
+            ...
+        ]
+    }
+
+The ``case`` identifies a result, so that results of different runs can
+be compared by :py:mod:`cpy2py_benchmark.compare`. Distributions of
+timings in seconds are stored by :py:func:`summarize`.
+"""
+from __future__ import division
+import json
+import math
+import multiprocessing
+import platform
+import socket
+import sys
+import time
+
+from cpy2py import __version__
+
+
+#: percentiles reported for every distribution
+PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p999', 0.999))
+
+
+def percentile(ordered, fraction):
+    """Value below which `fraction` of the `ordered` values lie"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(values, samples=True):
+    """
+    Summarize a distribution of `values`
+
+    :param samples: whether to include all values, for use in significance tests
+    :type samples: bool
+    :rtype: dict
+    """
+    ordered = sorted(values)
+    count = len(ordered)
+    mean = sum(ordered) / count
+    summary = {
+        'count': count,
+        'mean': mean,
+        'stdev': math.sqrt(sum((value - mean) ** 2 for value in ordered) / (count - 1)) if count > 1 else 0.0,
+        'min': ordered[0],
+        'max': ordered[-1],
+    }
+    for name, fraction in PERCENTILES:
+        summary[name] = percentile(ordered, fraction)
+    if samples:
+        summary['samples'] = list(values)
+    return summary
+
+
+def environment(**kwargs):
+    """Metadata on the environment of a benchmark, plus any `kwargs`"""
+    try:
+        cpu_count = multiprocessing.cpu_count()
+    except NotImplementedError:
+        cpu_count = None
+    metadata = {
+        'cpy2py': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'executable': sys.executable,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': cpu_count,
+        'hostname': socket.gethostname(),
+        'argv': sys.argv,
+        'time': time.time(),
+    }
+    metadata.update(kwargs)
+    return metadata
+
+
+def report(benchmark, results, **kwargs):
+    """Create the report of a `benchmark` from its `results`"""
+    return {'benchmark': benchmark, 'environment': environment(**kwargs), 'results': results}
+
+
+def dump(document, path='-'):
+    """Write a report to the file at `path`, or stdout for ``'-'``"""
+    if path == '-':
+        json.dump(document, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(path, 'w') as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+
+
+def load(path):
+    """Read a report from the file at `path`"""
+    with open(path) as source:
+        return json.load(source)
@@ -0,0 +1,53 @@
+import unittest
+import time
+
+from cpy2py import kernel_state, TwinMaster, TwinObject
+from cpy2py.kernel import accounting
+
+
+class Record(TwinObject):
+    __twin_id__ = 'pypy'
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TestAccounting(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_snapshot(self):
+        """Native, pinned and proxy objects are counted"""
+        records = [Record(idx) for idx in range(3)]
+        class_name = '%s.Record' % __name__
+        usage = accounting.take_snapshot().usage
+        self.assertEqual(usage['pypy', 'pinned', kernel_state.MASTER_ID, class_name].count, 3)
+        self.assertGreaterEqual(usage['pypy', 'pinned', kernel_state.MASTER_ID, class_name].oldest, 0.0)
+        self.assertEqual(usage['pypy', 'native', 'pypy', class_name].count, 3)
+        self.assertEqual(usage[kernel_state.MASTER_ID, 'proxy', 'pypy', class_name].count, 3)
+        self.assertIsNone(usage[kernel_state.MASTER_ID, 'proxy', 'pypy', class_name].oldest)
+        self.assertIn(class_name, accounting.take_snapshot().report())
+        del records
+
+    def test_diff(self):
+        """Snapshots show created and released objects"""
+        class_name = '%s.Record' % __name__
+        key = ('pypy', 'pinned', kernel_state.MASTER_ID, class_name)
+        before = accounting.take_snapshot()
+        records = [Record(idx) for idx in range(4)]
+        during = accounting.take_snapshot()
+        self.assertEqual(during.diff(before).usage[key].count, 4)
+        del records
+        # releases are sent along with the next message
+        accounting.take_snapshot()
+        after = accounting.take_snapshot()
+        self.assertNotIn(key, after.diff(before).usage)
+        self.assertEqual(after.diff(during).usage[key].count, -4)
+        self.assertEqual(after.diff(during).totals('proxy')[kernel_state.MASTER_ID].count, -4)
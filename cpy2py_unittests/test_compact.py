@@ -0,0 +1,78 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, TwinObject
+from cpy2py.proxy import tracker
+
+
+class Plain(TwinObject):
+    __twin_id__ = 'pypy'
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Mixin(TwinObject):
+    __twin_id__ = 'pypy'
+
+    def describe(self):
+        return 'mixin %s' % self.value
+
+
+class Frozen(TwinObject):
+    __twin_id__ = 'pypy'
+    __twin_frozen__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Combined(Plain, Mixin):
+    pass
+
+
+class FrozenCombined(Frozen, Mixin):
+    pass
+
+
+class TestCompactProxy(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_slots(self):
+        """Plain proxies carry no instance dictionary"""
+        instance = Plain(2)
+        self.assertFalse(hasattr(instance, '__dict__'))
+        self.assertEqual(instance.value, 2)
+        instance.value = 3
+        self.assertEqual(instance.value, 3)
+        self.assertIsInstance(instance.__instance_id__, int)
+
+    def test_frozen_dict(self):
+        """Proxies caching attributes keep an instance dictionary"""
+        instance = Frozen(2)
+        self.assertEqual(instance.value, 2)
+        self.assertEqual(instance.__dict__, {'value': 2})
+
+    def test_inheritance(self):
+        self.assertEqual(Combined(4).describe(), 'mixin 4')
+        instance = FrozenCombined(5)
+        self.assertEqual(instance.value, 5)
+        self.assertEqual(instance.describe(), 'mixin 5')
+        self.assertIn('value', instance.__dict__)
+
+    def test_registry(self):
+        """Proxies are registered and resolved per twin"""
+        instance = Plain(1)
+        self.assertIs(tracker.get_instance('pypy', instance.__instance_id__), instance)
+        self.assertIsNone(tracker.get_instance('pypy', -1))
+        self.assertEqual(
+            tracker.persistent_twin_id(instance).split('\t')[:2], [str(instance.__instance_id__), 'pypy']
+        )
@@ -1,9 +1,12 @@
 import unittest
 import time
+import socket
+import threading
 
 from cpy2py import kernel_state, TwinMaster, TwinObject
-from cpy2py.utility.compat import range
-from cpy2py.ipyc import fifo_pipe, duplex_socket
+from cpy2py.utility.compat import range, pickle, BytesFile
+from cpy2py.ipyc import fifo_pipe, duplex_socket, framing, seqpacket
+from cpy2py.kernel.flavours import async as async_flavour, threaded, queued
 
 
 class PrimitiveObject(TwinObject):
@@ -49,3 +52,315 @@ class TestIpycSocket(TestIpycDefault):
         )
         self.twinterpreter.start()
 
+
+class TestIpycPool(TestIpycDefault):
+    def setUp(self):
+        self.twinterpreter = TwinMaster(
+            executable='pypy', twinterpreter_id='pypy_multi', kernel='multi', ipyc=duplex_socket.DuplexSocketIPyC,
+            channels=3,
+        )
+        self.twinterpreter.start()
+
+    def test_threads(self):
+        """Concurrent threads use separate channels"""
+        results = []
+
+        def run():
+            my_instance = PrimitiveObject()
+            results.extend(my_instance.mod(num, 7) for num in range(20))
+
+        threads = [threading.Thread(target=run) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(results), sorted([(True, num % 7) for num in range(20)] * 6))
+
+
+class TestIpycQueued(TestIpycDefault):
+    def setUp(self):
+        self.twinterpreter = TwinMaster(executable='pypy', twinterpreter_id='pypy_multi', kernel='queued')
+        self.twinterpreter.start()
+
+
+class TestIpycBusyPollFifo(TestIpycDefault):
+    def setUp(self):
+        self.twinterpreter = TwinMaster(
+            executable='pypy', twinterpreter_id='pypy_multi', kernel='multi', ipyc=fifo_pipe.DuplexFifoIPyC,
+            busy_poll=0.001,
+        )
+        self.twinterpreter.start()
+
+
+class TestIpycBusyPollSocket(TestIpycDefault):
+    def setUp(self):
+        self.twinterpreter = TwinMaster(
+            executable='pypy', twinterpreter_id='pypy_multi', kernel='multi', ipyc=duplex_socket.DuplexSocketIPyC,
+            busy_poll=0.001,
+        )
+        self.twinterpreter.start()
+
+
+HAS_SEQPACKET = hasattr(socket, 'SOCK_SEQPACKET') and hasattr(socket, 'AF_UNIX')
+
+
+@unittest.skipUnless(HAS_SEQPACKET, 'requires SOCK_SEQPACKET unix sockets')
+class TestIpycSeqPacket(TestIpycDefault):
+    def setUp(self):
+        self.twinterpreter = TwinMaster(
+            executable='pypy', twinterpreter_id='pypy_multi', kernel='multi', ipyc=seqpacket.SeqPacketIPyC,
+            channels=2,
+        )
+        self.twinterpreter.start()
+
+
+class TestBufferedSocketFile(unittest.TestCase):
+    file_type = duplex_socket.BufferedSocketFile
+
+    def setUp(self):
+        self.sockets = self.socketpair()
+        self.writer = self.file_type(self.sockets[0])
+        self.reader = self.file_type(self.sockets[1])
+
+    @staticmethod
+    def socketpair():
+        return socket.socketpair()
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+
+    def test_messages(self):
+        """Several messages are received from one buffer"""
+        for idx in range(5):
+            pickle.dump({'idx': idx, 'line': 'a\nb'}, self.writer, 0)
+        for idx in range(5):
+            self.assertEqual(pickle.load(self.reader), {'idx': idx, 'line': 'a\nb'})
+
+    def test_large(self):
+        """Messages larger than the buffer are received whole"""
+        payload = [b'x' * 1024 * 1024, b'y' * 3, list(range(100))]
+        sender = threading.Thread(target=pickle.dump, args=(payload, self.writer, 2))
+        sender.start()
+        self.assertEqual(pickle.load(self.reader), payload)
+        sender.join()
+        pickle.dump('small', self.writer, 2)
+        self.assertEqual(pickle.load(self.reader), 'small')
+
+    def test_busy_poll(self):
+        """Polling readers receive messages sent before and while polling"""
+        reader = self.file_type(self.sockets[1], busy_poll=0.01)
+        pickle.dump('early', self.writer, 2)
+        self.assertEqual(pickle.load(reader), 'early')
+        sender = threading.Timer(0.05, pickle.dump, args=('late', self.writer, 2))
+        sender.start()
+        self.assertEqual(pickle.load(reader), 'late')
+        sender.join()
+
+    def test_eof(self):
+        """Closed connections raise EOFError"""
+        self.sockets[0].close()
+        with self.assertRaises(EOFError):
+            pickle.load(self.reader)
+
+
+@unittest.skipUnless(HAS_SEQPACKET, 'requires SOCK_SEQPACKET unix sockets')
+class TestPacketSocketFile(TestBufferedSocketFile):
+    file_type = seqpacket.PacketSocketFile
+
+    @staticmethod
+    def socketpair():
+        return socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+    def test_fragments(self):
+        """Writes larger than a packet are received as one message"""
+        self.writer._packet_size = 16
+        self.writer.write(b'0123456789' * 5)
+        self.writer.write(b'tail')
+        self.assertEqual(self.reader.read(), b'0123456789' * 5)
+        self.assertEqual(self.reader.read(), b'tail')
+
+
+class InterruptedFile(object):
+    """File that lets other threads send while the first frame is written"""
+    def __init__(self, *messages):
+        self.frames = []
+        self.frame_writer = None
+        self.messages = messages
+        self.threads = None
+
+    def write(self, frame):
+        self.frames.append(frame)
+        if self.threads is None:
+            self.threads = []
+            for message, priority in self.messages:
+                self.threads.append(threading.Thread(target=self.frame_writer.send, args=(message, priority)))
+                self.threads[-1].start()
+                while self.frame_writer._turn.waiting() < len(self.threads):
+                    time.sleep(0.001)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+
+class TestFraming(unittest.TestCase):
+    def test_roundtrip(self):
+        buffer = BytesFile()
+        frame_writer = framing.FrameWriter(buffer, chunk_size=16)
+        messages = [b'', b'x' * 15, b'y' * 16, b'z' * 100]
+        for message in messages:
+            frame_writer.send(message)
+        frame_reader = framing.FrameReader(BytesFile(buffer.getvalue()))
+        self.assertEqual([frame_reader.recv() for _ in messages], messages)
+        with self.assertRaises(EOFError):
+            frame_reader.recv()
+
+    def test_interleave(self):
+        """Small messages overtake large ones"""
+        target = InterruptedFile((b'small', 0))
+        target.frame_writer = framing.FrameWriter(target, chunk_size=16)
+        target.frame_writer.send(b'L' * 100)
+        target.join()
+        self.assertEqual(len(target.frames), 8)
+        frame_reader = framing.FrameReader(BytesFile(b''.join(target.frames)))
+        self.assertEqual(frame_reader.recv(), b'small')
+        self.assertEqual(frame_reader.recv(), b'L' * 100)
+
+    def test_priority(self):
+        """Messages of higher priority are sent first"""
+        target = InterruptedFile((b'bulk', 2), (b'normal', 1), (b'control', 0))
+        target.frame_writer = framing.FrameWriter(target, chunk_size=16, levels=3)
+        target.frame_writer.send(b'first', 1)
+        target.join()
+        frame_reader = framing.FrameReader(BytesFile(b''.join(target.frames)))
+        self.assertEqual([frame_reader.recv() for _ in range(4)], [b'first', b'control', b'normal', b'bulk'])
+
+
+class BlockingFile(object):
+    """File blocking the first write until released"""
+    def __init__(self):
+        self.frames = []
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, frame):
+        self.frames.append(frame)
+        self.writing.set()
+        self.release.wait()
+
+
+class FailingFile(object):
+    def write(self, frame):
+        raise IOError('closed')
+
+
+class TestQueuedFraming(unittest.TestCase):
+    def test_coalesce(self):
+        """Queued messages are written together, by priority and alternating between streams"""
+        target = BlockingFile()
+        frame_writer = framing.QueuedFrameWriter(target, chunk_size=16, levels=2)
+        frame_writer.send(b'first', 1)
+        target.writing.wait()
+        frame_writer.send(b'L' * 40, 1)
+        frame_writer.send(b'S' * 10, 0)
+        frame_writer.send(b'small', 1)
+        target.release.set()
+        while len(target.frames) < 2:
+            time.sleep(0.01)
+        self.assertEqual(len(target.frames), 2)
+        frame_reader = framing.FrameReader(BytesFile(b''.join(target.frames)))
+        self.assertEqual([frame_reader.recv() for _ in range(4)], [b'first', b'S' * 10, b'small', b'L' * 40])
+
+    def test_close(self):
+        """Closing waits for queued messages and the writer thread"""
+        target = BlockingFile()
+        frame_writer = framing.QueuedFrameWriter(target, chunk_size=16)
+        frame_writer.send(b'first')
+        target.writing.wait()
+        frame_writer.send(b'L' * 40)
+        writer_thread = frame_writer._thread
+        threading.Timer(0.05, target.release.set).start()
+        frame_writer.close()
+        self.assertIsNone(frame_writer._thread)
+        self.assertFalse(writer_thread.is_alive())
+        frame_reader = framing.FrameReader(BytesFile(b''.join(target.frames)))
+        self.assertEqual([frame_reader.recv() for _ in range(2)], [b'first', b'L' * 40])
+        # the writer is usable after closing
+        frame_writer.send(b'last')
+        frame_writer.close()
+        self.assertEqual(framing.FrameReader(BytesFile(target.frames[-1])).recv(), b'last')
+
+    def test_error(self):
+        """Errors of the writer thread are passed on and raised by the next send"""
+        errors = []
+        failed = threading.Event()
+        frame_writer = framing.QueuedFrameWriter(
+            FailingFile(), on_error=lambda err: (errors.append(err), failed.set())
+        )
+        frame_writer.send(b'lost')
+        failed.wait(1)
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], IOError)
+        with self.assertRaises(IOError):
+            frame_writer.send(b'next')
+        frame_writer.close()
+
+
+class ClosingFile(object):
+    """File reading nothing until closed"""
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def read(self, size):
+        self.closed.wait()
+        return b''
+
+
+class FailingIPyC(object):
+    """IPyC whose writes fail"""
+    def __init__(self):
+        self.reader = ClosingFile()
+        self.writer = FailingFile()
+
+    def open(self):
+        pass
+
+    def close(self):
+        self.reader.closed.set()
+
+
+class TestQueuedClient(unittest.TestCase):
+    def test_write_error(self):
+        """Errors of the writer thread release waiting requests"""
+        client = queued.CLIENT('queued_failing', FailingIPyC())
+        reply = client.run_request(('request', ))
+        self.assertEqual(reply, client.request_dispatcher.empty_reply)
+        self.assertTrue(client.request_dispatcher.terminated)
+        self.assertNotIn('queued_failing', kernel_state.KERNEL_CLIENTS)
+
+
+class SpinningClient(async_flavour.AsyncKernelClient):
+    spin_time = 0.001
+
+
+class TestIpycSpin(TestIpycDefault):
+    def setUp(self):
+        self.twinterpreter = TwinMaster(
+            executable='pypy', twinterpreter_id='pypy_multi', kernel=(SpinningClient, threaded.SERVER)
+        )
+        self.twinterpreter.start()
+
+
+class TestReplySlot(unittest.TestCase):
+    def test_deliver(self):
+        slot = async_flavour.ReplySlot()
+        slot.deliver('early')
+        self.assertEqual(slot.wait(), 'early')
+        delivery = threading.Timer(0.05, slot.deliver, args=('late',))
+        delivery.start()
+        self.assertEqual(slot.wait(spin_time=0.001), 'late')
+        delivery = threading.Timer(0.001, slot.deliver, args=('spun',))
+        delivery.start()
+        self.assertEqual(slot.wait(spin_time=0.5), 'spun')
+        self.assertFalse(slot.signal.acquire(False))
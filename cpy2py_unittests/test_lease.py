@@ -0,0 +1,103 @@
+import unittest
+import time
+import gc
+
+from cpy2py import kernel_state, TwinMaster, TwinObject, twinfunction
+from cpy2py.kernel import cycles
+
+
+class TwinNode(TwinObject):
+    __twin_id__ = 'pypy'
+
+    def __init__(self):
+        self.peer = None
+
+    def instance_id(self):
+        return self.__instance_id__
+
+
+class MasterNode(TwinObject):
+    __twin_id__ = kernel_state.MASTER_ID
+
+    def __init__(self):
+        self.peer = None
+
+
+@twinfunction('pypy')
+def held_ids():
+    from cpy2py.kernel import cycles
+    return sorted(cycles._held_instances())
+
+
+@twinfunction('pypy')
+def is_alive(instance_id):
+    from cpy2py.proxy import tracker
+    return tracker.get_instance('pypy', instance_id) is not None
+
+
+class TestLease(unittest.TestCase):
+    def setUp(self):
+        kernel_state.LEASE_TIME = 0.3
+        self.twinterpreter = TwinMaster('pypy')
+        self.twinterpreter.start()
+
+    def tearDown(self):
+        self.twinterpreter.destroy()
+        kernel_state.LEASE_TIME = None
+        time.sleep(0.1)
+
+    def test_renew(self):
+        """Leases of live proxies are renewed"""
+        instance = TwinNode()
+        time.sleep(1.0)
+        self.assertIn(instance.__instance_id__, held_ids())
+        self.assertEqual(instance.instance_id(), instance.__instance_id__)
+
+    def test_expire(self):
+        """Leases of proxies lost without release expire"""
+        instance = TwinNode()
+        instance_id = instance.__instance_id__
+        # emulate a proxy deleted without releasing its reference
+        object.__setattr__(instance, '__instance_id__', None)
+        del instance
+        gc.collect()
+        self.assertIn(instance_id, held_ids())
+        time.sleep(1.0)
+        self.assertNotIn(instance_id, held_ids())
+        self.assertFalse(is_alive(instance_id))
+
+
+class TestCycles(unittest.TestCase):
+    def setUp(self):
+        self.twinterpreter = TwinMaster('pypy')
+        self.twinterpreter.start()
+
+    def tearDown(self):
+        self.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_cycle(self):
+        """Cycles across twinterpreters are detected and released"""
+        master_node, twin_node = MasterNode(), TwinNode()
+        master_node.peer = twin_node
+        twin_node.peer = master_node
+        twin_id = twin_node.__instance_id__
+        self.assertEqual(cycles.find_cycles(), [])
+        del master_node, twin_node
+        gc.collect()
+        garbage = cycles.find_cycles()
+        self.assertIn(('pypy', twin_id), garbage)
+        self.assertEqual(len(garbage), 2)
+        self.assertEqual(cycles.collect_cycles(), garbage)
+        self.assertNotIn(twin_id, held_ids())
+        self.assertEqual(cycles.find_cycles(), [])
+
+    def test_rooted(self):
+        """Instances reachable from a root are no garbage"""
+        master_node, twin_node = MasterNode(), TwinNode()
+        master_node.peer = twin_node
+        twin_node.peer = master_node
+        del master_node
+        gc.collect()
+        self.assertEqual(cycles.find_cycles(), [])
+        self.assertIsNotNone(twin_node.peer)
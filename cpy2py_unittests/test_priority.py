@@ -0,0 +1,42 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, twinfunction
+from cpy2py.kernel import priority
+from cpy2py.kernel.priority import request_priority, BULK, CONTROL, INTERACTIVE
+
+
+@twinfunction('pypy')
+def served_priority():
+    from cpy2py.kernel import priority
+    return priority.current()
+
+
+class TestPriority(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy', kernel='multi')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_context(self):
+        self.assertEqual(priority.current(), INTERACTIVE)
+        with request_priority(BULK):
+            self.assertEqual(priority.current(), BULK)
+            with request_priority(CONTROL):
+                self.assertEqual(priority.current(), CONTROL)
+            self.assertEqual(priority.current(), BULK)
+        self.assertEqual(priority.current(), INTERACTIVE)
+        with self.assertRaises(ValueError):
+            request_priority(5)
+
+    def test_served(self):
+        """Requests are served at their priority"""
+        self.assertEqual(served_priority(), INTERACTIVE)
+        with request_priority(BULK):
+            self.assertEqual(served_priority(), BULK)
+        self.assertEqual(served_priority(), INTERACTIVE)
@@ -0,0 +1,90 @@
+import unittest
+import threading
+import time
+
+from cpy2py import TwinMaster, twinfunction
+from cpy2py.proxy.batching import run_batch
+
+BATCH_SIZES = []
+
+
+def square_batch(calls):
+    BATCH_SIZES.append(len(calls))
+    return [args[0] ** 2 for args, kwargs in calls]
+
+
+@twinfunction('pypy', batch=8, batch_delay=0.05)
+def batched_echo(arg):
+    if arg is None:
+        raise ValueError
+    return arg
+
+
+@twinfunction('pypy', batch=8, batch_delay=0.05, batch_call=square_batch)
+def batched_square(arg):
+    return arg ** 2
+
+
+@twinfunction('pypy')
+def get_batch_sizes():
+    return BATCH_SIZES
+
+
+def call_concurrently(func, args):
+    results = [None] * len(args)
+
+    def run(index):
+        try:
+            results[index] = func(args[index])
+        except Exception as err:
+            results[index] = err
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in range(len(args))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestBatching(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy', kernel='async')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_single(self):
+        """Lone calls are not delayed beyond the batch window"""
+        self.assertEqual(batched_echo(1), 1)
+        self.assertRaises(ValueError, batched_echo, None)
+
+    def test_concurrent(self):
+        """Concurrent calls receive their own results"""
+        args = list(range(20)) + [None]
+        results = call_concurrently(batched_echo, args)
+        self.assertEqual(results[:-1], args[:-1])
+        self.assertIsInstance(results[-1], ValueError)
+
+    def test_batch_call(self):
+        """Batches are executed by the batch implementation"""
+        results = call_concurrently(batched_square, list(range(16)))
+        self.assertEqual(results, [num ** 2 for num in range(16)])
+        batch_sizes = get_batch_sizes()
+        self.assertEqual(sum(batch_sizes), 16)
+        self.assertLess(len(batch_sizes), 16)
+        self.assertLessEqual(max(batch_sizes), 8)
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_result_count(self):
+        """A batch implementation must return one result per call"""
+        calls = [((num,), {}) for num in range(3)]
+        self.assertEqual(run_batch(None, calls, square_batch), [(True, 0), (True, 1), (True, 4)])
+        for results in ([1, 2], [1, 2, 3, 4]):
+            outcome = run_batch(None, calls, lambda _, results=results: results)
+            self.assertEqual([success for success, _ in outcome], [False] * 3)
+            self.assertIsInstance(outcome[0][1], ValueError)
@@ -0,0 +1,72 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, twinfunction
+from cpy2py.proxy.caching import ResultCache
+
+CALLS = []
+
+
+@twinfunction('pypy', cache=2)
+def lookup(key, default=None):
+    CALLS.append(key)
+    return key, default
+
+
+@twinfunction('pypy')
+def get_calls():
+    return list(CALLS)
+
+
+class TestCachedFunction(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_cached(self):
+        """Repeated calls are served locally"""
+        lookup.cache.clear()
+        calls = len(get_calls())
+        for _ in range(5):
+            self.assertEqual(lookup('foo'), ('foo', None))
+            self.assertEqual(lookup('foo', default=1), ('foo', 1))
+        self.assertEqual(len(get_calls()), calls + 2)
+        self.assertTrue(lookup.cache.invalidate('foo'))
+        self.assertEqual(lookup('foo'), ('foo', None))
+        self.assertEqual(len(get_calls()), calls + 3)
+
+    def test_unpicklable(self):
+        """Calls with unpicklable arguments bypass the cache"""
+        lookup.cache.clear()
+        with self.assertRaises(Exception):
+            lookup(lambda: None)
+        self.assertEqual(len(lookup.cache), 0)
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru(self):
+        cache = ResultCache(maxsize=2)
+        self.assertEqual(cache(abs, -1), 1)
+        self.assertEqual(cache(abs, -2), 2)
+        cache(abs, -1)
+        cache(abs, -3)
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.invalidate(-2))
+        self.assertTrue(cache.invalidate(-1))
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl(self):
+        cache = ResultCache(ttl=0.01)
+        cache(abs, -1)
+        cache(abs, -1)
+        time.sleep(0.02)
+        cache(abs, -1)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
@@ -0,0 +1,82 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, TwinObject, twinfunction
+
+READS = []
+
+
+class CachedObject(TwinObject):
+    __twin_id__ = 'pypy'
+    __twin_cached__ = True
+
+    def __init__(self, value):
+        self._value = value
+
+    @property
+    def value(self):
+        READS.append(self._value)
+        return self._value
+
+    def set_value(self, value):
+        self._value = value
+
+
+@twinfunction('pypy')
+def count_reads():
+    return len(READS)
+
+
+@twinfunction('pypy')
+def modify(instance, value):
+    instance._value = value
+
+
+class TestCoherentCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def assertEventually(self, instance, value):
+        for _ in range(100):
+            if instance.value == value:
+                return
+            time.sleep(0.01)
+        self.assertEqual(instance.value, value)
+
+    def test_cached(self):
+        """Repeated reads are served locally"""
+        instance = CachedObject(1)
+        reads = count_reads()
+        for _ in range(5):
+            self.assertEqual(instance.value, 1)
+        self.assertEqual(count_reads(), reads + 1)
+
+    def test_proxy_modification(self):
+        """Modifications via the proxy are visible immediately"""
+        instance = CachedObject(1)
+        self.assertEqual(instance.value, 1)
+        instance.set_value(2)
+        self.assertEqual(instance.value, 2)
+        instance._value = 3
+        self.assertEqual(instance.value, 3)
+        del instance._value
+        self.assertRaises(AttributeError, getattr, instance, 'value')
+
+    def test_native_modification(self):
+        """Native modifications invalidate cached values"""
+        instance = CachedObject(1)
+        self.assertEqual(instance.value, 1)
+        modify(instance, 2)
+        self.assertEventually(instance, 2)
+        reads = count_reads()
+        self.assertEqual(instance.value, 2)
+        self.assertEqual(count_reads(), reads)
+        modify(instance, 3)
+        self.assertEventually(instance, 3)
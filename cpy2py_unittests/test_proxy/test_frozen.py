@@ -0,0 +1,77 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, TwinObject
+
+
+class FrozenObject(TwinObject):
+    __twin_id__ = 'pypy'
+    __twin_frozen__ = True
+
+    def __init__(self, value):
+        self.value = value
+        self.reads = 0
+
+    @property
+    def counted(self):
+        self.reads += 1
+        return self.value
+
+    def get_reads(self):
+        return self.reads
+
+
+class PrefetchObject(TwinObject):
+    __twin_id__ = 'pypy'
+    __twin_frozen__ = ('name', 'size', 'missing')
+    __twin_prefetch__ = True
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.mutable = 0
+
+
+class TestFrozenObject(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_frozen(self):
+        """Immutable attributes are fetched once"""
+        instance = FrozenObject(3)
+        for _ in range(5):
+            self.assertEqual(instance.counted, 3)
+        self.assertEqual(instance.get_reads(), 1)
+        self.assertRaises(AttributeError, getattr, instance, 'undefined')
+
+    def test_frozen_assign(self):
+        """Assigning through the proxy replaces the cached value"""
+        instance = FrozenObject(3)
+        self.assertEqual(instance.value, 3)
+        instance.value = 4
+        self.assertEqual(instance.value, 4)
+        self.assertEqual(instance.counted, 4)
+
+    def test_prefetch(self):
+        """Prefetched attributes are fetched at once"""
+        instance = PrefetchObject('foo', 2)
+        self.assertEqual(PrefetchObject.__twin_prefetch__, frozenset(('name', 'size', 'missing')))
+        self.assertEqual(instance.name, 'foo')
+        self.assertEqual(instance.__dict__['size'], 2)
+        self.assertRaises(AttributeError, getattr, instance, 'missing')
+        instance.mutable = 1
+        self.assertEqual(instance.mutable, 1)
+        self.assertNotIn('mutable', instance.__dict__)
+
+    def test_prefetch_definition(self):
+        with self.assertRaises(TypeError):
+            class InvalidPrefetch(TwinObject):
+                __twin_frozen__ = True
+                __twin_prefetch__ = True
@@ -0,0 +1,81 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, TwinObject, kernel_state
+from cpy2py.proxy import iteration
+
+
+class Sequence(TwinObject):
+    __twin_id__ = 'pypy'
+
+    def __init__(self, length):
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, item):
+        if not isinstance(item, int):
+            raise TypeError('indices must be integers')
+        if item >= self.length:
+            raise IndexError
+        return item * 2
+
+
+class Generator(TwinObject):
+    __twin_id__ = 'pypy'
+
+    def __init__(self, length):
+        self.length = length
+
+    def __iter__(self):
+        for idx in range(self.length):
+            yield idx
+
+
+class TestChunkedIteration(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_getitem_iteration(self):
+        """Sequences are iterated in chunks"""
+        sequence = Sequence(5000)
+        self.assertEqual(list(sequence), [idx * 2 for idx in range(5000)])
+        self.assertEqual(sequence[3], 6)
+        self.assertEqual(len(sequence), 5000)
+
+    def test_generator_iteration(self):
+        """Generator methods are iterated in chunks"""
+        self.assertEqual(list(Generator(100)), list(range(100)))
+        self.assertEqual(list(Generator(0)), [])
+        self.assertEqual(list(Generator(iteration.MIN_CHUNK_SIZE)), list(range(iteration.MIN_CHUNK_SIZE)))
+
+    def test_slicing(self):
+        """Slices are fetched at once even without native support"""
+        sequence = Sequence(100)
+        self.assertEqual(sequence[10:15], [20, 22, 24, 26, 28])
+        self.assertEqual(sequence[-2:], [196, 198])
+
+    def test_adaptive(self):
+        """Chunks grow while iterating"""
+        sizes = []
+        kernel = kernel_state.get_kernel('pypy')
+        dispatch_call = kernel.dispatch_call
+
+        def record_chunks(call, *args):
+            if call is iteration.next_chunk:
+                sizes.append(args[-1])
+            return dispatch_call(call, *args)
+        kernel.dispatch_call = record_chunks
+        try:
+            self.assertEqual(len(list(iteration.iter_chunks(Generator(1000), min_size=4, max_size=64))), 1000)
+        finally:
+            del kernel.dispatch_call
+        self.assertEqual(sizes[:5], [8, 16, 32, 64, 64])
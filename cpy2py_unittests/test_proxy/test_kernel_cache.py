@@ -0,0 +1,53 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, TwinObject, twinfunction
+from cpy2py.proxy.proxy import BoundMethodProxy
+
+
+class Counter(TwinObject):
+    __twin_id__ = 'pypy'
+    count = 0
+
+    @classmethod
+    def increment(cls):
+        cls.count += 1
+        return cls.count
+
+    def double(self, value):
+        return 2 * value
+
+
+@twinfunction('pypy')
+def where():
+    from cpy2py import kernel_state
+    return kernel_state.TWIN_ID
+
+
+class TestKernelCache(unittest.TestCase):
+    def test_restart(self):
+        """Cached kernels are replaced after restarting a twin"""
+        for _ in range(2):
+            twinterpreter = TwinMaster('pypy')
+            twinterpreter.start()
+            try:
+                self.assertEqual(where(), 'pypy')
+                self.assertEqual(Counter.increment(), 1)
+                self.assertEqual(Counter.count, 1)
+                self.assertEqual(Counter().double(2), 4)
+            finally:
+                twinterpreter.destroy()
+                time.sleep(0.1)
+
+    def test_bound_method(self):
+        twinterpreter = TwinMaster('pypy')
+        twinterpreter.start()
+        try:
+            instance = Counter()
+            method = instance.double
+            self.assertIsInstance(method, BoundMethodProxy)
+            self.assertEqual(method(3), 6)
+            self.assertIsInstance(Counter.increment, BoundMethodProxy)
+        finally:
+            twinterpreter.destroy()
+            time.sleep(0.1)
@@ -0,0 +1,67 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, twinfunction, kernel_state
+
+RECEIVED = []
+ERRORS = []
+
+
+def record_error(peer_id, directive, exception):
+    ERRORS.append((peer_id, type(exception).__name__))
+
+
+@twinfunction('pypy', oneway=True)
+def oneway_sink(value):
+    if value is None:
+        raise ValueError
+    RECEIVED.append(value)
+    return value
+
+
+@twinfunction('pypy')
+def get_received():
+    return list(RECEIVED), list(ERRORS)
+
+
+@twinfunction('pypy')
+def set_error_hook():
+    kernel_state.ONEWAY_ERROR_HOOK = record_error
+
+
+class TestOneway(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+        set_error_hook()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_oneway(self):
+        """Oneway calls are executed without result"""
+        for value in range(10):
+            self.assertIsNone(oneway_sink(value))
+        received, _ = get_received()
+        self.assertEqual(received[-10:], list(range(10)))
+
+    def test_oneway_error(self):
+        """Oneway exceptions are passed to the hook"""
+        self.assertIsNone(oneway_sink(None))
+        oneway_sink(1)
+        _, errors = get_received()
+        self.assertIn((kernel_state.MASTER_ID, 'ValueError'), errors)
+
+    def test_nowait(self):
+        """Kernels dispatch calls without waiting"""
+        kernel = kernel_state.get_kernel('pypy')
+        self.assertIsNone(kernel.dispatch_call_nowait(oneway_sink, 'nowait'))
+        received, _ = get_received()
+        self.assertIn('nowait', received)
+
+    def test_exclusive(self):
+        with self.assertRaises(ValueError):
+            twinfunction('pypy', oneway=True, batch=True)
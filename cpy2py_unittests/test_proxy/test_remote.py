@@ -0,0 +1,121 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, twinfunction, kernel_state
+from cpy2py.kernel import accounting
+from cpy2py.proxy import remote
+from cpy2py.proxy.remote import RemoteObjectProxy
+
+
+@twinfunction('pypy', return_proxy=True)
+def make_range(count):
+    return list(range(count))
+
+
+@twinfunction('pypy', return_proxy=True)
+def make_mapping(count):
+    return dict((str(idx), idx) for idx in range(count))
+
+
+@twinfunction('pypy')
+def total(values):
+    return type(values).__name__, sum(values)
+
+
+@twinfunction('pypy')
+def count_pinned():
+    return len(remote._PINNED)
+
+
+@twinfunction('pypy')
+def count_references():
+    return sum(
+        lease.count
+        for server in kernel_state.KERNEL_SERVERS.values() for lease in server.request_handler.held_leases()
+        if isinstance(lease.instance, remote.PinnedObject)
+    )
+
+
+class TestRemoteObject(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_sequence(self):
+        """Sequences are accessed remotely"""
+        values = make_range(1000)
+        self.assertIsInstance(values, RemoteObjectProxy)
+        self.assertEqual(len(values), 1000)
+        self.assertEqual(values[5], 5)
+        self.assertEqual(values[10:13], [10, 11, 12])
+        self.assertIn(999, values)
+        self.assertEqual(list(values), list(range(1000)))
+        self.assertEqual(values.value, list(range(1000)))
+
+    def test_mapping(self):
+        """Mappings are accessed remotely"""
+        mapping = make_mapping(10)
+        self.assertEqual(mapping['3'], 3)
+        self.assertRaises(KeyError, lambda: mapping['foo'])
+        self.assertEqual(sorted(mapping), sorted(str(idx) for idx in range(10)))
+
+    def test_pass_back(self):
+        """Proxies resolve to the object in its native twin"""
+        pinned = count_pinned()
+        values = make_range(10)
+        self.assertEqual(total(values), ('list', 45))
+        self.assertEqual(count_pinned(), pinned + 1)
+        del values
+        self.assertEqual(count_pinned(), pinned)
+
+    def test_references(self):
+        """Using and passing back proxies takes no references"""
+        references = count_references()
+        values = make_range(100)
+        self.assertEqual(count_references(), references + 1)
+        self.assertEqual(len(values), 100)
+        self.assertEqual(total(values), ('list', 4950))
+        self.assertEqual(len(list(values)), 100)
+        self.assertEqual(count_references(), references + 1)
+        del values
+        self.assertEqual(count_references(), references)
+
+    def test_round_trips(self):
+        """Proxy operations take a single request"""
+        values = make_range(100)
+        kernel = kernel_state.get_kernel('pypy')
+        dispatch_request, requests = kernel._dispatch_request, []
+
+        def count_request(*args):
+            requests.append(args)
+            return dispatch_request(*args)
+        kernel._dispatch_request = count_request
+        try:
+            self.assertEqual(len(values), 100)
+            self.assertEqual(values[5], 5)
+        finally:
+            del kernel._dispatch_request
+        self.assertEqual(len(requests), 2)
+
+    def test_accounting(self):
+        """Pinned objects are reported by snapshots"""
+        before = accounting.take_snapshot()
+        values = make_range(10)
+        usage = accounting.take_snapshot().diff(before).usage
+        self.assertEqual(usage['pypy', 'pinned', kernel_state.TWIN_ID, 'cpy2py.proxy.remote.remote_object'].count, 1)
+        self.assertEqual(usage[kernel_state.TWIN_ID, 'proxy', 'pypy', 'cpy2py.proxy.remote.remote_object'].count, 1)
+        del values
+
+    def test_release(self):
+        """Objects are released with their proxies"""
+        pinned = count_pinned()
+        values = make_range(10)
+        self.assertEqual(count_pinned(), pinned + 1)
+        del values
+        self.assertEqual(count_pinned(), pinned)
@@ -0,0 +1,70 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, TwinObject, twinfunction, kernel_state
+from cpy2py.proxy.snapshot import snapshot
+
+
+class ValueRecord(TwinObject):
+    __twin_id__ = 'pypy'
+    __twin_by_value__ = True
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+    def where(self):
+        from cpy2py import kernel_state
+        return kernel_state.TWIN_ID
+
+
+class ReferenceRecord(TwinObject):
+    __twin_id__ = 'pypy'
+
+    def __init__(self, name):
+        self.name = name
+
+
+@twinfunction('pypy')
+def make_record(name, size):
+    return ValueRecord(name, size)
+
+
+@twinfunction('pypy')
+def record_size(record):
+    return record.size
+
+
+class TestSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_by_value(self):
+        """Native instances are sent by value"""
+        record = make_record('foo', 3)
+        self.assertFalse(record.__is_twin_proxy__)
+        self.assertEqual((record.name, record.size), ('foo', 3))
+        self.assertEqual(record.where(), kernel_state.TWIN_ID)
+        record.size = 4
+        self.assertEqual(record_size(record), 4)
+
+    def test_snapshot(self):
+        """Explicit snapshots copy the state"""
+        original = ReferenceRecord('foo')
+        self.assertTrue(original.__is_twin_proxy__)
+        copy = snapshot(original)
+        self.assertFalse(copy.__is_twin_proxy__)
+        self.assertEqual(copy.name, 'foo')
+        original.name = 'bar'
+        self.assertEqual(copy.name, 'foo')
+        self.assertEqual(snapshot(copy).name, 'foo')
+        proxy = ValueRecord('foo', 1)
+        self.assertTrue(proxy.__is_twin_proxy__)
+        self.assertEqual(snapshot(proxy).size, 1)
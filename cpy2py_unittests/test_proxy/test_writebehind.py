@@ -0,0 +1,83 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, TwinObject, twinfunction
+from cpy2py.proxy.writebehind import write_behind, flush
+
+
+class Record(TwinObject):
+    __twin_id__ = 'pypy'
+
+    @property
+    def fixed(self):
+        return 1
+
+    def get_fields(self):
+        return dict(self.__dict__)
+
+
+@twinfunction('pypy')
+def native_fields(instance):
+    return dict(instance.__dict__)
+
+
+class TestWriteBehind(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_context(self):
+        """Assignments are applied when leaving the context"""
+        record = Record()
+        with write_behind(record):
+            record.foo = 1
+            record.bar = 2
+            del record.foo
+            self.assertNotIn('bar', native_fields(record))
+        fields = native_fields(record)
+        self.assertEqual(fields.get('bar'), 2)
+        self.assertNotIn('foo', fields)
+
+    def test_flush_points(self):
+        """Assignments are applied before reads and method calls"""
+        record = Record()
+        with write_behind(record):
+            record.foo = 1
+            self.assertEqual(record.foo, 1)
+            record.bar = 2
+            self.assertEqual(record.get_fields().get('bar'), 2)
+            record.foo = 3
+            flush(record)
+            self.assertEqual(native_fields(record).get('foo'), 3)
+
+    def test_error(self):
+        """Errors are raised at the flush point"""
+        record = Record()
+        with self.assertRaises(AttributeError):
+            with write_behind(record):
+                record.foo = 1
+                record.fixed = 2
+                record.bar = 3
+        fields = native_fields(record)
+        self.assertEqual(fields.get('foo'), 1)
+        self.assertNotIn('bar', fields)
+        record.bar = 4
+        self.assertEqual(native_fields(record).get('bar'), 4)
+
+    def test_abort(self):
+        """Assignments are discarded if the context is left by an exception"""
+        record = Record()
+        with self.assertRaises(KeyError):
+            with write_behind(record):
+                record.foo = 1
+                record.fixed = 2
+                raise KeyError('abort')
+        self.assertNotIn('foo', native_fields(record))
+        record.bar = 3
+        self.assertEqual(native_fields(record).get('bar'), 3)
@@ -0,0 +1,67 @@
+import unittest
+import time
+
+from cpy2py import TwinMaster, twinfunction
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from cpy2py.proxy.shared_array import TwinArray
+
+
+@twinfunction('pypy')
+def fill(array, value):
+    array[...] = value
+    return type(array).__name__
+
+
+@twinfunction('pypy')
+def create(shape, value):
+    array = TwinArray(shape, dtype='int32')
+    array[...] = value
+    return array
+
+
+@unittest.skipIf(numpy is None, 'requires numpy')
+class TestSharedArray(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.twinterpreter = TwinMaster('pypy')
+        cls.twinterpreter.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_shared_write(self):
+        """Twin writes are visible locally"""
+        array = TwinArray((16, 8), dtype='float64')
+        array[...] = 0
+        self.assertEqual(fill(array, 2.5), 'TwinArray')
+        self.assertTrue(numpy.all(array == 2.5))
+
+    def test_shared_view(self):
+        """Views are shared relative to their segment"""
+        array = TwinArray.from_array(numpy.zeros((10, 10)))
+        fill(array[2:5, ::3], 1)
+        self.assertEqual(array.sum(), 3 * 4)
+        self.assertEqual(array[2:5, ::3].sum(), 3 * 4)
+
+    def test_shared_from_twin(self):
+        """Arrays created by the twin are shared"""
+        array = create((4, 4), 3)
+        self.assertIsInstance(array, TwinArray)
+        self.assertEqual(array.sum(), 3 * 16)
+        fill(array, 1)
+        self.assertEqual(array.sum(), 16)
+
+    def test_copy_by_value(self):
+        """Derived arrays are sent by value"""
+        array = TwinArray.from_array(numpy.zeros(5))
+        derived = array + 1
+        fill(derived, 5)
+        self.assertEqual(derived.sum(), 5)
+        self.assertEqual(array.sum(), 0)
@@ -0,0 +1,46 @@
+import unittest
+import time
+
+from cpy2py import kernel_state, TwinMaster
+from cpy2py.twinterpreter import startup_profile
+
+
+def finalize_nothing():
+    pass
+
+
+class TestStartupProfile(unittest.TestCase):
+    def setUp(self):
+        kernel_state.TWIN_GROUP_STATE.add_finalizer(finalize_nothing)
+        self.twinterpreter = TwinMaster('pypy')
+        self.twinterpreter.start()
+
+    def tearDown(self):
+        self.twinterpreter.destroy()
+        time.sleep(0.1)
+
+    def test_phases(self):
+        """All startup phases are recorded in order"""
+        profile = self.twinterpreter.startup_profile
+        names = [name for name, _ in profile.durations()]
+        for phase in ('spawn', 'interpreter', 'arguments', 'main_def', 'kernel_connect', 'accept'):
+            self.assertIn(phase, names)
+        self.assertIn('finalizer:%s.finalize_nothing' % __name__, names)
+        self.assertLess(names.index('spawn'), names.index('arguments'))
+        self.assertLess(names.index('arguments'), names.index('kernel_connect'))
+        for _, duration in profile.durations():
+            self.assertGreaterEqual(duration, 0)
+        self.assertGreater(profile.total, 0)
+        self.assertIn('total', profile.report())
+
+    def test_aggregate(self):
+        """Profiles of all twinterpreters are aggregated"""
+        summary = TwinMaster.aggregate_startup_profiles()
+        self.assertIn('spawn', [phase[0] for phase in summary])
+        totals = [phase[2] for phase in summary]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+
+    def test_aggregate_plain(self):
+        profile = startup_profile.StartupProfile([('a', 0.0, 1.0), ('b', 1.0, 1.5)])
+        summary = startup_profile.aggregate([profile, profile])
+        self.assertEqual(summary, [('a', 2, 2.0, 1.0), ('b', 2, 1.0, 0.5)])
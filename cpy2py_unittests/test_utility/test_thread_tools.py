@@ -2,9 +2,11 @@ from __future__ import print_function
 import random
 import unittest
 import operator
+import threading
+import time
 
 from cpy2py.utility.compat import range, unicode_str
-from cpy2py.utility.thread_tools import ThreadGuard
+from cpy2py.utility.thread_tools import ThreadGuard, PriorityQueue, ItemError
 
 
 class TestThreadGuard(unittest.TestCase):
@@ -78,3 +80,32 @@ class TestThreadGuard(unittest.TestCase):
         tg_counter = ThreadGuard(str(counter))
         for conversion in (float, int, complex, bool, round, str, hash, unicode_str):
             self.assertEqual(conversion(counter), conversion(tg_counter))
+
+
+class TestPriorityQueue(unittest.TestCase):
+    def test_order(self):
+        queue = PriorityQueue(3)
+        for item in ((2, 'a'), (1, 'b'), (2, 'c'), (0, 'd'), (1, 'e')):
+            queue.put(item)
+        self.assertEqual(queue.qsize(), 5)
+        self.assertEqual([queue.get()[1] for _ in range(5)], ['d', 'b', 'e', 'a', 'c'])
+        with self.assertRaises(ItemError):
+            queue.get(False)
+
+    def test_stolen_wakeup(self):
+        """Waiters keep waiting if another thread takes their item first"""
+        queue = PriorityQueue(1)
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(queue.get(True, 5)))
+        waiter.start()
+        while not queue._waiters:
+            time.sleep(0.001)
+        with queue._queue_mutex:
+            # wake up the waiter as put does, but take the item before it can
+            queue._queue_content.append((0, 'stolen'))
+            queue._waiters[0].release()
+            queue._queue_content.popleft()
+        time.sleep(0.01)
+        queue.put((0, 'item'))
+        waiter.join()
+        self.assertEqual(results, [(0, 'item')])